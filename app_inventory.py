@@ -0,0 +1,250 @@
+"""
+Per-Application Inventory Mode for OKTA to Entra ID Migration Calculator
+Streams a per-app Okta export (CSV or JSONL) into indexed aggregates by
+sign-on type, provisioning status and assigned-user band, with per-app effort
+and cost, and rolls them up into the regular estimate shape
+"""
+
+import os
+import csv
+import json
+from bisect import bisect_left
+from collections import namedtuple
+
+from estimation_modules import EstimationModules
+from input_schema import InputSchema
+from okta_constants import SIGN_ON_MODES, PROVISIONING_FEATURES
+from rate_card import RateCards
+
+# Sign-on type -> form_data count field and hours coefficient
+APP_TYPES = {
+    'saml': ('saml_apps_count', 'saml_hours'),
+    'oidc': ('oidc_apps_count', 'oidc_hours'),
+    'swa': ('swa_apps_count', 'swa_hours'),
+    'bookmark': ('bookmark_apps_count', 'bookmark_hours')
+}
+
+# Inventory column -> accepted export headers, normalized (lowercase, letters and digits only)
+COLUMN_ALIASES = {
+    'app_id': ('id', 'appid', 'applicationid'),
+    'label': ('label', 'name', 'appname', 'applicationname'),
+    'sign_on_mode': ('signonmode', 'signon', 'signontype', 'type'),
+    'provisioning': ('provisioning', 'provisioningenabled', 'provisioningstatus', 'features'),
+    'users': ('assignedusers', 'users', 'usercount', 'assignedusercount'),
+    'groups': ('assignedgroups', 'groups', 'groupcount', 'assignedgroupcount')
+}
+
+# Upper bounds of the assigned-user bands; the last band is open-ended
+USER_BANDS = (0, 10, 100, 1000, 10000)
+USER_BAND_LABELS = ('0', '1-10', '11-100', '101-1000', '1001-10000', '10000+')
+
+TRUE_VALUES = {'1', 'true', 'yes', 'y', 'enabled', 'on', 'active'}
+
+InventoryApp = namedtuple('InventoryApp', ['app_id', 'label', 'sign_on', 'provisioning', 'users', 'groups',
+                                           'hours', 'services_cost'])
+
+
+class AppInventory:
+    """
+    Indexed per-app inventory bound to one rate card
+    Every app carries its own effort hours (sign-on type hours plus
+    provisioning hours) and services cost. Apps are indexed by sign-on type,
+    provisioning status and user band, and each index bucket keeps running
+    totals. add() and remove() touch one record and a fixed number of
+    counters, so re-estimating after a change costs O(1) in the inventory size.
+    Apps whose sign-on mode has no estimator bucket (API services, ...) are
+    indexed as 'other' but add no effort or cost, matching the API collector.
+    tenant holds the tenant-level inputs (num_employees, okta_policies_count,
+    ...); its app count fields are ignored in favour of the inventory.
+    """
+    
+    def __init__(self, tenant=None, rate_card=None):
+        self.tenant = dict(tenant or {})
+        self.rates = RateCards.get(rate_card)
+        self.apps = {}
+        self.indexes = {
+            'sign_on': {kind: {} for kind in list(APP_TYPES) + ['other']},
+            'provisioning': {'enabled': {}, 'disabled': {}},
+            'users': {label: {} for label in USER_BAND_LABELS}
+        }
+        # index name -> bucket -> [apps, hours, services_cost, users, groups]
+        self.rollups = {
+            name: {bucket: [0, 0.0, 0.0, 0, 0] for bucket in buckets}
+            for name, buckets in self.indexes.items()
+        }
+        self.counts = {field: 0 for field, _ in APP_TYPES.values()}
+        self.counts['provisioning_enabled_apps'] = 0
+    
+    @staticmethod
+    def load(path, tenant=None, rate_card=None):
+        """Build an inventory from a .csv or .jsonl/.ndjson export, one row at a time"""
+        inventory = AppInventory(tenant, rate_card)
+        inventory.add_rows(AppInventory.read_rows(path))
+        return inventory
+    
+    @staticmethod
+    def read_rows(path):
+        """Yield raw app rows from a CSV or JSON Lines file without loading it whole"""
+        extension = os.path.splitext(path)[1].lower()
+        with open(path, newline='', encoding='utf-8-sig') as handle:
+            if extension == '.csv':
+                yield from csv.DictReader(handle)
+            elif extension in ('.jsonl', '.ndjson'):
+                for line in handle:
+                    if line.strip():
+                        yield json.loads(line)
+            else:
+                raise ValueError(f"Unsupported inventory format '{extension}' (expected .csv, .jsonl or .ndjson)")
+    
+    def add_rows(self, rows):
+        """Add (or replace) every row; returns the number of rows added"""
+        added = 0
+        for row in rows:
+            self.add(row)
+            added += 1
+        return added
+    
+    def add(self, row):
+        """
+        Add one app from a raw export row (or replace the app with the same id)
+        Returns the InventoryApp record.
+        """
+        app = self._parse(row)
+        if app.app_id in self.apps:
+            self.remove(app.app_id)
+        self.apps[app.app_id] = app
+        self._update(app, 1)
+        return app
+    
+    def remove(self, app_id):
+        """Remove one app by id; returns its record (KeyError when unknown)"""
+        app = self.apps.pop(app_id)
+        self._update(app, -1)
+        return app
+    
+    def __len__(self):
+        return len(self.apps)
+    
+    def __contains__(self, app_id):
+        return app_id in self.apps
+    
+    def _update(self, app, sign):
+        """Apply one app's contribution to the indexes, rollups and counts"""
+        for name, bucket in self._buckets(app):
+            members = self.indexes[name][bucket]
+            if sign > 0:
+                members[app.app_id] = None
+            else:
+                del members[app.app_id]
+            totals = self.rollups[name][bucket]
+            totals[0] += sign
+            totals[1] += sign * app.hours
+            totals[2] += sign * app.services_cost
+            totals[3] += sign * app.users
+            totals[4] += sign * app.groups
+        if app.sign_on in APP_TYPES:
+            self.counts[APP_TYPES[app.sign_on][0]] += sign
+            if app.provisioning:
+                self.counts['provisioning_enabled_apps'] += sign
+    
+    @staticmethod
+    def _buckets(app):
+        """(index name, bucket) pairs an app belongs to"""
+        return (
+            ('sign_on', app.sign_on),
+            ('provisioning', 'enabled' if app.provisioning else 'disabled'),
+            ('users', USER_BAND_LABELS[bisect_left(USER_BANDS, app.users)])
+        )
+    
+    def _parse(self, row):
+        """Normalize a raw export row into an InventoryApp with its effort and cost"""
+        values = {}
+        for key, value in row.items():
+            normalized = ''.join(character for character in str(key).lower() if character.isalnum())
+            values[normalized] = value
+        fields = {}
+        for column, aliases in COLUMN_ALIASES.items():
+            fields[column] = next((values[alias] for alias in aliases if values.get(alias) not in (None, '')), None)
+        
+        if fields['app_id'] is None:
+            raise ValueError(f"Inventory row has no app id: {row!r}")
+        mode = str(fields['sign_on_mode'] or '').strip()
+        sign_on = mode.lower() if mode.lower() in APP_TYPES else SIGN_ON_MODES.get(mode.upper(), 'other')
+        
+        c = self.rates.coefficients
+        provisioning = AppInventory._flag(fields['provisioning'])
+        if sign_on in APP_TYPES:
+            hours = getattr(c, APP_TYPES[sign_on][1]) + (c.provisioning_hours if provisioning else 0)
+            services_cost = c.app_services
+        else:
+            hours = services_cost = 0
+        return InventoryApp(
+            app_id=str(fields['app_id']),
+            label=fields['label'] or str(fields['app_id']),
+            sign_on=sign_on,
+            provisioning=provisioning,
+            users=AppInventory._count(fields['users']),
+            groups=AppInventory._count(fields['groups']),
+            hours=hours,
+            services_cost=services_cost
+        )
+    
+    @staticmethod
+    def _flag(value):
+        """Provisioning flag from a boolean, a yes/no string or an Okta features list"""
+        if isinstance(value, (list, tuple, set)):
+            return bool(set(value) & PROVISIONING_FEATURES)
+        if isinstance(value, str) and '|' in value:
+            return bool(set(value.split('|')) & PROVISIONING_FEATURES)
+        if isinstance(value, str):
+            return value.strip().lower() in TRUE_VALUES or value.strip() in PROVISIONING_FEATURES
+        return bool(value)
+    
+    @staticmethod
+    def _count(value):
+        """Assigned users / groups cell as a count, coerced like input_schema ("1,200" -> 1200; blank -> 0)"""
+        count = InputSchema.count_value(value)
+        if count is None:
+            if value is None or not str(value).strip():
+                return 0
+            raise ValueError(f'Invalid count in inventory row: {value!r}')
+        return count
+    
+    def form_data(self):
+        """The tenant inputs with the app counts taken from the inventory"""
+        form_data = dict(self.tenant)
+        form_data.update(self.counts)
+        return form_data
+    
+    def apps_where(self, sign_on=None, provisioning=None, users=None):
+        """
+        Apps matching every given index bucket (sign-on type, True/False, user
+        band label), intersecting from the smallest bucket
+        """
+        selected = []
+        if sign_on is not None:
+            selected.append(self.indexes['sign_on'][sign_on])
+        if provisioning is not None:
+            selected.append(self.indexes['provisioning']['enabled' if provisioning else 'disabled'])
+        if users is not None:
+            selected.append(self.indexes['users'][users])
+        if not selected:
+            return list(self.apps.values())
+        selected.sort(key=len)
+        smallest, others = selected[0], selected[1:]
+        return [self.apps[app_id] for app_id in smallest if all(app_id in members for members in others)]
+    
+    def summary(self):
+        """Per-bucket app counts, effort hours, services cost, users and groups for every index"""
+        names = ('apps', 'hours', 'services_cost', 'assigned_users', 'assigned_groups')
+        summary = {
+            name: {bucket: dict(zip(names, totals)) for bucket, totals in buckets.items() if totals[0]}
+            for name, buckets in self.rollups.items()
+        }
+        totals = [sum(values) for values in zip(*self.rollups['sign_on'].values())]
+        summary['total'] = dict(zip(names, totals))
+        return summary
+    
+    def estimate(self):
+        """Estimate in the regular result shape, plus the per-index rollups as 'inventory'"""
+        return EstimationModules.app_inventory_estimation(self)
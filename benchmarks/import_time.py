@@ -0,0 +1,77 @@
+"""
+Import-Time Benchmark for the fast-start path
+Imports each core module in a fresh interpreter under `python -X importtime`.
+Fails (exit status 1) if a module takes longer than its budget, or if it loads
+a heavy optional dependency that should only be imported on first use.
+
+Usage: python benchmarks/import_time.py [--repeat N]
+"""
+
+import os
+import sys
+import argparse
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cumulative import-time budgets in milliseconds (about 3x the measured cost;
+# importing pandas alone takes ~350 ms)
+IMPORT_BUDGETS = {
+    'rate_card': 40,
+    'estimation_modules': 80,
+    'estimate_cache': 100,
+    'estimate_records': 100,
+    'app_inventory': 100,
+    'portfolio_runner': 250
+}
+
+# Dependencies that must stay lazy on the fast-start path
+HEAVY_MODULES = ('numpy', 'pandas', 'openpyxl', 'yaml', 'aiohttp')
+
+
+def measure(module):
+    """
+    Cumulative import time of module in microseconds, plus the heavy
+    dependencies left in sys.modules afterwards
+    """
+    code = (
+        f'import sys, {module}; '
+        f'print(",".join(sorted(set({HEAVY_MODULES!r}) & set(sys.modules))))'
+    )
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    cumulative = None
+    for line in completed.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        parts = line.split('|')
+        if len(parts) == 3 and parts[2].strip() == module and not parts[2][1:].startswith(' '):
+            cumulative = int(parts[1])
+    loaded = [name for name in completed.stdout.strip().split(',') if name]
+    return cumulative, loaded
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Check module import times against their budgets.')
+    parser.add_argument('--repeat', type=int, default=5, help='fresh interpreters per module (best run counts)')
+    args = parser.parse_args(argv)
+    
+    failed = False
+    for module, budget in IMPORT_BUDGETS.items():
+        runs = [measure(module) for _ in range(args.repeat)]
+        best = min(cumulative for cumulative, _ in runs) / 1000
+        loaded = runs[-1][1]
+        status = 'ok'
+        if best > budget:
+            status = 'OVER BUDGET'
+            failed = True
+        if loaded:
+            status = f"loads {', '.join(loaded)}"
+            failed = True
+        print(f'{module:<22} {best:8.1f} ms  (budget {budget} ms)  {status}')
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
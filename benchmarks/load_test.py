@@ -0,0 +1,174 @@
+"""
+Load Test for the Local Estimation Service
+Fires concurrent single-estimate requests (and optionally one streamed batch)
+at estimation_service.py and reports p50/p99 latency and requests per second
+as JSON. Without --url a service is started on a free port with the offline
+stub Okta source and stopped afterwards.
+
+Usage:
+    python benchmarks/load_test.py [--url http://127.0.0.1:8080] [--requests 2000]
+                                   [--concurrency 64] [--endpoint manual|scenario|api|mixed]
+                                   [--batch-items 20000] [--processes N]
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import asyncio
+import argparse
+import subprocess
+
+import aiohttp
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from run_benchmarks import synthetic_tenants
+from estimation_modules import PREDEFINED_SCENARIOS
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(int(round(fraction * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def request_plan(endpoint, count):
+    """(path, json body) per request"""
+    tenants = synthetic_tenants(count)
+    scenarios = list(PREDEFINED_SCENARIOS)
+    plan = []
+    for index in range(count):
+        kind = endpoint if endpoint != 'mixed' else ('manual', 'manual', 'scenario', 'api')[index % 4]
+        if kind == 'scenario':
+            plan.append(('/estimate/scenario', {'scenario': scenarios[index % len(scenarios)]}))
+        elif kind == 'api':
+            plan.append(('/estimate/api', {'org_url': f'https://tenant-{index % 50}.okta.com'}))
+        else:
+            plan.append(('/estimate/manual', tenants[index]))
+    return plan
+
+
+async def run_requests(url, plan, concurrency):
+    """Send every planned request with at most concurrency in flight"""
+    latencies = []
+    statuses = {}
+    queue = iter(plan)
+    
+    async def worker(session):
+        for path, body in queue:
+            start = time.perf_counter()
+            async with session.post(url + path, json=body) as response:
+                await response.read()
+                statuses[response.status] = statuses.get(response.status, 0) + 1
+            latencies.append(time.perf_counter() - start)
+    
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(session) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'concurrency': concurrency,
+        'seconds': elapsed,
+        'requests_per_second': len(latencies) / elapsed,
+        'p50_ms': percentile(latencies, 0.50) * 1e3,
+        'p99_ms': percentile(latencies, 0.99) * 1e3,
+        'max_ms': latencies[-1] * 1e3,
+        'statuses': {str(status): count for status, count in sorted(statuses.items())}
+    }
+
+
+async def run_batch(url, items):
+    """Stream one NDJSON batch and time it"""
+    body = ''.join(json.dumps(item) + '\n' for item in synthetic_tenants(items, seed=1))
+    records = errors = 0
+    start = time.perf_counter()
+    first_record = None
+    async with aiohttp.ClientSession() as session:
+        async with session.post(url + '/estimate/batch?mode=manual', data=body,
+                                headers={'Content-Type': 'application/x-ndjson'}) as response:
+            async for line in response.content:
+                if not line.strip():
+                    continue
+                if first_record is None:
+                    first_record = time.perf_counter() - start
+                records += 1
+                errors += json.loads(line)['status'] != 'ok'
+    elapsed = time.perf_counter() - start
+    return {
+        'items': items,
+        'records': records,
+        'errors': errors,
+        'seconds': elapsed,
+        'items_per_second': records / elapsed,
+        'first_record_ms': (first_record or 0) * 1e3
+    }
+
+
+async def health(url):
+    async with aiohttp.ClientSession() as session:
+        async with session.get(url + '/health') as response:
+            return await response.json()
+
+
+def start_service(processes):
+    """Start estimation_service.py on a free port; returns (process, url)"""
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        port = probe.getsockname()[1]
+    command = [sys.executable, os.path.join(ROOT, 'estimation_service.py'), '--port', str(port)]
+    if processes:
+        command += ['--processes', str(processes)]
+    process = subprocess.Popen(command, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f'http://127.0.0.1:{port}'
+    
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            asyncio.run(health(url))
+            return process, url
+        except aiohttp.ClientError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError('estimation service did not start')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Load-test the local estimation service.')
+    parser.add_argument('--url', help='running service to test (default: start one)')
+    parser.add_argument('--requests', type=int, default=2000, help='single-estimate requests to send')
+    parser.add_argument('--concurrency', type=int, default=64, help='requests in flight')
+    parser.add_argument('--endpoint', choices=('manual', 'scenario', 'api', 'mixed'), default='manual')
+    parser.add_argument('--batch-items', type=int, default=20000, help='items in the streamed batch (0 skips it)')
+    parser.add_argument('--processes', type=int, default=None, help='worker processes for a started service')
+    args = parser.parse_args(argv)
+    
+    process, url = (None, args.url.rstrip('/')) if args.url else start_service(args.processes)
+    try:
+        report = {
+            'endpoint': args.endpoint,
+            'single': asyncio.run(run_requests(url, request_plan(args.endpoint, args.requests), args.concurrency))
+        }
+        if args.batch_items:
+            report['batch'] = asyncio.run(run_batch(url, args.batch_items))
+        report['service'] = asyncio.run(health(url))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+    
+    json.dump(report, sys.stdout, indent=2)
+    sys.stdout.write('\n')
+    return 0 if set(report['single']['statuses']) == {'200'} else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,385 @@
+"""
+Benchmark Suite for OKTA to Entra ID Migration Calculator
+Measures entry-point latency, per-calculator cost, bulk throughput, wave
+scheduling, report export, rate calibration, input validation, scenario
+matching, workbook ingestion and memory per estimate on the repo's own sample
+data (PREDEFINED_SCENARIOS, Okta_Input_Sample_*.xlsx) and synthetic tenants.
+Results are written as JSON and compared against a stored baseline.
+
+Usage:
+    python benchmarks/run_benchmarks.py [-o results.json] [--baseline benchmarks/baseline.json]
+                                        [--save-baseline] [--tolerance 0.25] [-k group ...]
+                                        [--max-rows 1000000]
+"""
+
+import os
+import sys
+import json
+import glob
+import time
+import timeit
+import random
+import argparse
+import platform
+import tempfile
+import itertools
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from estimation_modules import EstimationModules, PREDEFINED_SCENARIOS, CALCULATOR_INPUT_FIELDS
+from estimate_records import EstimateResult, EstimateTable, deep_sizeof
+from migration_scheduler import MigrationScheduler
+from okta_workbook_loader import OktaWorkbookLoader
+from portfolio_runner import PortfolioRunner
+from report_exporter import ReportExporter
+from rate_card import RateCards
+from rate_calibration import RateCalibrator
+from input_schema import FORM_SCHEMA
+from scenario_library import ScenarioLibrary
+
+DEFAULT_BASELINE = os.path.join(ROOT, 'benchmarks', 'baseline.json')
+SAMPLE_WORKBOOKS = os.path.join(ROOT, 'Okta_Input_Sample_*.xlsx')
+
+# Sub-millisecond timings move by tens of percent between runs on the same
+# machine (timer, cache and CPU frequency jitter): they take the best of more
+# repeats and are compared with at least this tolerance
+MICRO_REPEAT = 15
+MICRO_TOLERANCE = 0.6
+
+# Synthetic tenant ranges per input field: (low, high) inclusive
+SYNTHETIC_RANGES = {
+    'num_employees': (50, 20000),
+    'num_it_staff': (1, 200),
+    'num_locations': (1, 40),
+    'saml_apps_count': (0, 120),
+    'bookmark_apps_count': (0, 200),
+    'swa_apps_count': (0, 80),
+    'oidc_apps_count': (0, 80),
+    'okta_policies_count': (0, 40),
+    'okta_ad_agents_count': (0, 8),
+    'okta_radius_agents_count': (0, 4),
+    'provisioning_enabled_apps': (0, 60),
+    'federated_domains_count': (0, 12),
+    'workflow_automations_count': (0, 40),
+    'groups_recreate_count': (0, 800)
+}
+
+
+def synthetic_tenants(count, seed=0):
+    """count reproducible random form_data dicts"""
+    generator = random.Random(seed)
+    return [
+        {field: generator.randint(*SYNTHETIC_RANGES[field]) for field in CALCULATOR_INPUT_FIELDS}
+        for _ in range(count)
+    ]
+
+
+def synthetic_frame(rows, seed=0):
+    """rows reproducible random tenants as a DataFrame"""
+    import numpy as np
+    import pandas as pd
+    
+    generator = np.random.default_rng(seed)
+    return pd.DataFrame({
+        field: generator.integers(low, high + 1, rows)
+        for field, (low, high) in SYNTHETIC_RANGES.items()
+    })
+
+
+def per_call(fn, repeat=5):
+    """Best-of-repeat seconds per call, with the loop count picked by timeit.autorange"""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def best_of(fn, repeat=3):
+    """Best-of-repeat wall time of one call, for runs too long for autorange"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def result(name, value, unit, better='lower', **context):
+    return {'name': name, 'value': value, 'unit': unit, 'better': better, **context}
+
+
+def micro_result(name, fn, unit='us', scale=1e6, per=1, **context):
+    """result() for a sub-millisecond per-call timing of fn (divided by per), with the MICRO_* settings"""
+    return result(name, per_call(fn, MICRO_REPEAT) / per * scale, unit, tolerance=MICRO_TOLERANCE, **context)
+
+
+# --- Benchmarks -------------------------------------------------------------
+
+def bench_entry_points(options):
+    """Single-call latency of each EstimationModules entry point"""
+    medium = PREDEFINED_SCENARIOS['medium']['data']
+    calls = {
+        'scenario_based_estimation': lambda: EstimationModules.scenario_based_estimation('medium'),
+        'manual_input_estimation': lambda: EstimationModules.manual_input_estimation(medium),
+        'okta_api_estimation': lambda: EstimationModules.okta_api_estimation(None)
+    }
+    for entry_point, call in calls.items():
+        yield micro_result(f'latency.{entry_point}', call)
+    
+    EstimationModules.enable_estimate_cache()
+    try:
+        yield micro_result('latency.manual_input_estimation.cached',
+                           lambda: EstimationModules.manual_input_estimation(medium))
+    finally:
+        EstimationModules.disable_estimate_cache()
+    
+    EstimationModules.enable_instrumentation()
+    try:
+        yield micro_result('latency.manual_input_estimation.instrumented',
+                           lambda: EstimationModules.manual_input_estimation(medium))
+    finally:
+        EstimationModules.disable_instrumentation()
+
+
+def bench_calculators(options):
+    """Per-calculator cost on every predefined scenario"""
+    rates = RateCards.get()
+    calculators = {
+        'migration_effort': lambda data: EstimationModules._calculate_migration_effort(data, rates),
+        'licensing_cost': lambda data: EstimationModules._calculate_licensing_cost(data, rates),
+        'infrastructure_cost': lambda data: EstimationModules._calculate_infrastructure_cost(data, rates),
+        'professional_services_cost':
+            lambda data: EstimationModules._calculate_professional_services_cost(data, rates),
+        'complexity_score': lambda data: EstimationModules._calculate_complexity_score(data, rates),
+        'timeline': lambda data: EstimationModules._calculate_timeline(data, 200.0, rates),
+        'migration_phases': lambda data: EstimationModules._get_migration_phases(23, rates),
+        'assess_risks': lambda data: EstimationModules._assess_risks(data, 80),
+        'recommendations': lambda data: EstimationModules._generate_recommendations(data, 80),
+        'critical_path': lambda data: EstimationModules._get_critical_path_items(data)
+    }
+    scenarios = [scenario['data'] for scenario in PREDEFINED_SCENARIOS.values()]
+    for calculator, call in calculators.items():
+        yield micro_result(f'calculator.{calculator}', lambda: [call(data) for data in scenarios], 'ns', 1e9,
+                           len(scenarios))
+
+
+def bench_bulk(options):
+    """Throughput of the scalar loop, the portfolio runner and estimate_batch"""
+    tenants = synthetic_tenants(10000)
+    seconds = best_of(lambda: [EstimationModules.manual_input_estimation(data) for data in tenants])
+    yield result('throughput.manual_input_estimation', len(tenants) / seconds, 'rows/s', 'higher',
+                 rows=len(tenants))
+    
+    seconds = best_of(lambda: list(PortfolioRunner.run(tenants, 'manual', processes=1)))
+    yield result('throughput.portfolio_runner.in_process', len(tenants) / seconds, 'rows/s', 'higher',
+                 rows=len(tenants))
+    
+    rows = 1000
+    while rows <= options.max_rows:
+        frame = synthetic_frame(rows)
+        seconds = best_of(lambda: EstimationModules.estimate_batch(frame))
+        yield result(f'throughput.estimate_batch.{rows}', rows / seconds, 'rows/s', 'higher', rows=rows)
+        rows *= 10
+
+
+def bench_scheduler(options):
+    """Wave scheduling latency for tenants with hundreds to thousands of apps"""
+    enterprise = PREDEFINED_SCENARIOS['enterprise']['data']
+    for scale in (1, 10, 50):
+        data = dict(enterprise, **{
+            field: enterprise[field] * scale
+            for field in ('saml_apps_count', 'oidc_apps_count', 'swa_apps_count', 'bookmark_apps_count',
+                          'provisioning_enabled_apps', 'groups_recreate_count')
+        })
+        apps = sum(data[field] for field in ('saml_apps_count', 'oidc_apps_count', 'swa_apps_count',
+                                             'bookmark_apps_count'))
+        seconds = best_of(lambda: MigrationScheduler.schedule(data))
+        yield result(f'scheduler.schedule.{apps}_apps', seconds * 1e3, 'ms', apps=apps)
+
+
+def bench_ingestion(options):
+    """Workbook ingestion speed over the Okta_Input_Sample_* workbooks"""
+    paths = sorted(glob.glob(SAMPLE_WORKBOOKS))
+    if not paths:
+        return
+    seconds = best_of(lambda: [OktaWorkbookLoader.load_form_data(path) for path in paths])
+    yield result('ingestion.load_form_data', seconds / len(paths) * 1e3, 'ms/workbook', workbooks=len(paths))
+
+
+def bench_export(options):
+    """Report export throughput per format, streaming (form_data, result) pairs from a generator"""
+    tenants = synthetic_tenants(1000)
+    pairs = [(data, EstimationModules.manual_input_estimation(data)) for data in tenants]
+    formats = {'csv': 20000, 'ndjson': 20000, 'parquet': 20000, 'arrow': 20000, 'xlsx': 2000}
+    with tempfile.TemporaryDirectory() as directory:
+        for fmt, rows in formats.items():
+            rows = min(rows, options.max_rows)
+            path = os.path.join(directory, f'report.{fmt}')
+            try:
+                seconds = best_of(lambda: ReportExporter.export(itertools.islice(itertools.cycle(pairs), rows), path),
+                                  repeat=1)
+            except ImportError:
+                continue  # pyarrow is optional
+            yield result(f'export.{fmt}', rows / seconds, 'rows/s', 'higher', rows=rows)
+
+
+def bench_calibration(options):
+    """Rate card fitting speed on synthetic historical actuals (default-card estimates with noise)"""
+    import numpy as np
+    
+    rows = min(50000, options.max_rows)
+    frame = synthetic_frame(rows)
+    estimates = EstimationModules.estimate_batch(frame)
+    generator = np.random.default_rng(0)
+    frame['actual_hours'] = estimates['effort_hours'] * generator.lognormal(0, 0.1, rows)
+    frame['actual_cost'] = estimates['total_cost'] * generator.lognormal(0, 0.05, rows)
+    actuals = RateCalibrator.load_actuals(frame)
+    yield result(f'calibration.fit.{rows}', best_of(lambda: RateCalibrator.fit(actuals)) * 1e3, 'ms', rows=rows)
+    yield result(f'calibration.cross_validate.{rows}',
+                 best_of(lambda: RateCalibrator.cross_validate(actuals), repeat=1) * 1e3, 'ms', rows=rows, folds=5)
+
+
+def bench_validation(options):
+    """Input schema cost per record (clean and spreadsheet-style text) and per DataFrame row"""
+    tenants = synthetic_tenants(1000)
+    text = [{key: f'{value:,}' for key, value in data.items()} for data in tenants]
+    yield micro_result('validation.validate', lambda: FORM_SCHEMA.validate_batch(tenants), 'us/record', per=1000)
+    yield micro_result('validation.validate.text', lambda: FORM_SCHEMA.validate_batch(text), 'us/record', per=1000)
+    
+    rows = min(100000, options.max_rows)
+    frame = synthetic_frame(rows)
+    text_frame = frame.astype(str)
+    yield result(f'validation.frame.{rows}', rows / best_of(lambda: FORM_SCHEMA.validate_frame(frame)), 'rows/s',
+                 'higher', rows=rows)
+    yield result(f'validation.frame.text.{rows}', rows / best_of(lambda: FORM_SCHEMA.validate_frame(text_frame)),
+                 'rows/s', 'higher', rows=rows)
+
+
+def bench_scenario_match(options):
+    """Nearest-scenario lookup and blended estimate latency on the default library and a large synthetic one"""
+    partial = {'num_employees': '2,500', 'saml_apps_count': 40, 'okta_policies_count': 12}
+    library = ScenarioLibrary.default()
+    library.blended_estimate(partial)
+    yield micro_result('scenario_match.nearest', lambda: library.nearest(partial), scenarios=len(library))
+    yield micro_result('scenario_match.blended_estimate', lambda: library.blended_estimate(partial),
+                       scenarios=len(library))
+    
+    tenants = synthetic_tenants(10000)
+    large = ScenarioLibrary({
+        f'synthetic_{index}': {'name': f'Synthetic {index}', 'description': '', 'characteristics': {}, 'data': data}
+        for index, data in enumerate(tenants)
+    })
+    yield micro_result('scenario_match.nearest.10000', lambda: large.nearest(partial, k=5), scenarios=len(large))
+
+
+def bench_memory(options):
+    """Memory per estimate as result dicts, EstimateResult records, an EstimateTable and estimate_batch"""
+    results = [EstimationModules.manual_input_estimation(data) for data in synthetic_tenants(5000)]
+    records = [EstimateResult.from_dict(estimate) for estimate in results]
+    table = EstimateTable.from_results(records)
+    yield result('memory.result_dict', deep_sizeof(results) / len(results), 'bytes/estimate')
+    yield result('memory.estimate_result', deep_sizeof(records) / len(records), 'bytes/estimate')
+    yield result('memory.estimate_table', table.nbytes / len(table), 'bytes/estimate')
+    
+    rows = min(100000, options.max_rows)
+    frame = synthetic_frame(rows)
+    tracemalloc.start()
+    try:
+        EstimationModules.estimate_batch(frame)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    yield result(f'memory.estimate_batch.peak.{rows}', peak / rows, 'bytes/row', rows=rows)
+
+
+# Benchmark groups by result-name prefix
+BENCHMARKS = {
+    'latency': bench_entry_points,
+    'calculator': bench_calculators,
+    'throughput': bench_bulk,
+    'scheduler': bench_scheduler,
+    'export': bench_export,
+    'calibration': bench_calibration,
+    'validation': bench_validation,
+    'scenario_match': bench_scenario_match,
+    'ingestion': bench_ingestion,
+    'memory': bench_memory
+}
+
+
+# --- Baseline comparison ----------------------------------------------------
+
+def compare(results, baseline, tolerance):
+    """
+    Regressions against a baseline, plus the results it has no value for
+    A result regresses when it is worse than the baseline value by more than
+    tolerance (a fraction, in the result's 'better' direction), or by more
+    than the result's own 'tolerance' when that is wider.
+    Returns (regressions, missing).
+    """
+    previous = {entry['name']: entry for entry in baseline.get('results', [])}
+    regressions = []
+    missing = []
+    for entry in results:
+        before = previous.get(entry['name'])
+        if before is None or not before['value']:
+            missing.append(entry)
+            continue
+        change = (entry['value'] - before['value']) / before['value']
+        if entry['better'] == 'higher':
+            change = -change
+        entry['change'] = round(change, 4)
+        if change > max(tolerance, entry.get('tolerance', 0)):
+            regressions.append(entry)
+    return regressions, missing
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run the estimation benchmark suite.')
+    parser.add_argument('-o', '--output', help='write JSON results to this file (default: stdout)')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='baseline JSON to compare against')
+    parser.add_argument('--save-baseline', action='store_true', help='overwrite the baseline with these results')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed slowdown before failing (default: 0.25)')
+    parser.add_argument('-k', dest='groups', action='append', choices=sorted(BENCHMARKS),
+                        help='only run this benchmark group (repeatable)')
+    parser.add_argument('--max-rows', type=int, default=1000000, help='largest synthetic estimate_batch size')
+    args = parser.parse_args(argv)
+    
+    results = []
+    for group in args.groups or BENCHMARKS:
+        for entry in BENCHMARKS[group](args):
+            results.append(entry)
+            print(f"{entry['name']:<48} {entry['value']:>14,.1f} {entry['unit']}", file=sys.stderr)
+    
+    report = {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'results': results
+    }
+    
+    regressions = missing = []
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as handle:
+            json.dump(report, handle, indent=2)
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as handle:
+            regressions, missing = compare(results, json.load(handle), args.tolerance)
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as handle:
+            json.dump(report, handle, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+    
+    for entry in missing:
+        print(f"NO BASELINE {entry['name']}: not compared", file=sys.stderr)
+    for entry in regressions:
+        print(f"REGRESSION {entry['name']}: {entry['change']:+.0%} vs baseline", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
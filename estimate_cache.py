@@ -0,0 +1,100 @@
+"""
+Memoized Estimate Cache for OKTA to Entra ID Migration Calculator
+Bounded LRU + TTL cache in front of EstimationModules._calculate_comprehensive_estimate
+"""
+
+import copy
+import time
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+from estimation_modules import CALCULATOR_INPUT_FIELDS
+
+
+class EstimateCache:
+    """
+    Thread-safe LRU cache of comprehensive estimates
+    Entries are keyed by rate card id plus the calculator input values and their
+    types (missing fields count as 0, so {} and {'swa_apps_count': 0} share an
+    entry, while 1200 and 1200.0 do not). Every read returns fresh copies of
+    the result's dicts and lists, sharing the immutable leaves, so callers may
+    mutate it freely. calculation_date is stamped per call, never cached.
+    """
+    
+    def __init__(self, maxsize=1024, ttl_seconds=300):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0}
+    
+    @staticmethod
+    def key_for(data):
+        """Canonical cache key for an input dict"""
+        values = tuple(data.get(field, 0) for field in CALCULATOR_INPUT_FIELDS)
+        return values + tuple(map(type, values))
+    
+    @staticmethod
+    def copy_result(cached):
+        """Copy of a result dict: every dict and list is new, numbers and strings are shared"""
+        result = cached.copy()
+        for key, value in cached.items():
+            if key in ('executive_summary', 'migration_effort', 'cost_breakdown'):
+                result[key] = value.copy()
+            elif key == 'timeline_estimation':
+                timeline = result[key] = value.copy()
+                timeline['phases'] = [phase.copy() for phase in value['phases']]
+                timeline['critical_path'] = value['critical_path'][:]
+            elif key in ('risk_assessment', 'recommendations'):
+                result[key] = [entry.copy() for entry in value]
+            elif isinstance(value, (dict, list)):
+                result[key] = copy.deepcopy(value)
+        return result
+    
+    def get_or_compute(self, data, compute, rates):
+        """Return a copy of the cached estimate for data under a compiled rate card"""
+        key = (rates.card_id,) + EstimateCache.key_for(data)
+        try:
+            hash(key)
+        except TypeError:
+            # Unhashable field values can't be cached; let the calculators handle them
+            return compute(data, rates)
+        
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, cached = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.stats['hits'] += 1
+                    result = EstimateCache.copy_result(cached)
+                    result['calculation_date'] = datetime.now().isoformat()
+                    return result
+                del self._entries[key]
+                self.stats['expirations'] += 1
+            self.stats['misses'] += 1
+        
+        result = compute(data, rates)
+        cached = EstimateCache.copy_result(result)
+        cached.pop('calculation_date', None)
+        
+        with self._lock:
+            self._entries[key] = (now + self.ttl_seconds, cached)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.stats['evictions'] += 1
+        return result
+    
+    def clear(self):
+        """Drop every entry (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+    
+    def info(self):
+        """Counters plus current size, for dashboards and logs"""
+        with self._lock:
+            return dict(self.stats, size=len(self._entries), maxsize=self.maxsize,
+                        ttl_seconds=self.ttl_seconds)
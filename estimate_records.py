@@ -0,0 +1,497 @@
+"""
+Compact Estimate Records for OKTA to Entra ID Migration Calculator
+Slotted TenantProfile / EstimateResult records and a columnar EstimateTable
+for holding many estimates in memory (e.g. portfolio dashboards)
+NumPy and pandas are only imported when an EstimateTable is built or exported.
+"""
+
+import sys
+import math
+from numbers import Integral
+from datetime import datetime, timedelta
+
+from estimation_modules import (
+    EstimationModules, CALCULATOR_INPUT_FIELDS, MIGRATION_RISKS, RECOMMENDATIONS, CRITICAL_PATH_ITEMS
+)
+
+# Top-level keys produced by EstimationModules._compute_comprehensive_estimate;
+# anything else in a result dict (estimation_type, scenario, ...) is metadata
+CORE_RESULT_KEYS = (
+    'executive_summary', 'migration_effort', 'cost_breakdown', 'timeline_estimation',
+    'risk_assessment', 'recommendations', 'rate_card', 'calculation_date'
+)
+
+_FIELD_SET = frozenset(CALCULATOR_INPUT_FIELDS)
+
+
+def _entry_key(entry):
+    """Hashable key for a risk / recommendation dict"""
+    return tuple(sorted(entry.items()))
+
+
+_RISK_ENTRIES = tuple(MIGRATION_RISKS.values())
+_RISK_CODES = {_entry_key(entry): code for code, entry in enumerate(_RISK_ENTRIES)}
+_RECOMMENDATION_ENTRIES = tuple(RECOMMENDATIONS.values())
+_RECOMMENDATION_CODES = {_entry_key(entry): code for code, entry in enumerate(_RECOMMENDATION_ENTRIES)}
+_CRITICAL_PATH_CODES = {item: code for code, item in enumerate(CRITICAL_PATH_ITEMS)}
+
+# critical_path_mask flag: the path is the critical chain of the stored migration_schedule
+SCHEDULED_CRITICAL_PATH = 1 << 7
+
+# Shared phase-name tuples, one per rate card layout
+_PHASE_LAYOUTS = {}
+
+
+def _encode_mask(entries, codes, key, label):
+    """
+    Bitmask of catalogue codes for a list of engine entries
+    The engine emits entries in catalogue order, so the mask is lossless;
+    anything else is rejected rather than silently reordered.
+    """
+    mask = 0
+    last = -1
+    for entry in entries:
+        code = codes.get(key(entry))
+        if code is None:
+            raise ValueError(f'Unknown {label} entry: {entry!r}')
+        if code <= last:
+            raise ValueError(f'{label.capitalize()} entries are not in catalogue order')
+        mask |= 1 << code
+        last = code
+    return mask
+
+
+def _decode_mask(mask, entries):
+    return [entries[code] for code in range(len(entries)) if mask >> code & 1]
+
+
+def _expect_keys(section, name, keys):
+    """Reject nested sections that would not survive the round trip"""
+    if set(section) != set(keys):
+        raise ValueError(f"'{name}' must have exactly the keys {', '.join(keys)}")
+
+
+def _freeze(value):
+    """Hashable stand-in for a metadata value, or None when it can't be shared"""
+    try:
+        if isinstance(value, dict):
+            key = ('dict', tuple(value.items()))
+        elif isinstance(value, list):
+            key = ('list', tuple(value))
+        else:
+            key = ('value', type(value), value)
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+def deep_sizeof(obj, _seen=None):
+    """Approximate deep memory footprint of a Python object in bytes"""
+    seen = set() if _seen is None else _seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    numpy = sys.modules.get('numpy')
+    if numpy is not None and isinstance(obj, numpy.ndarray):
+        size = sys.getsizeof(obj)
+        if obj.dtype == object:
+            size += sum(deep_sizeof(item, seen) for item in obj.ravel())
+        return size
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(key, seen) + deep_sizeof(value, seen) for key, value in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    slots = getattr(type(obj), '__slots__', ())
+    size += sum(deep_sizeof(getattr(obj, slot), seen) for slot in slots if hasattr(obj, slot))
+    return size
+
+
+class TenantProfile:
+    """
+    Validated calculator input for one tenant
+    The calculator fields are slots checked once at construction (numbers >= 0,
+    missing or None means 0); any other keys (company_name, regulatory_requirements,
+    ...) are kept in extras. Exposes get() so it can be passed wherever the
+    estimators expect a form_data dict.
+    """
+    
+    __slots__ = CALCULATOR_INPUT_FIELDS + ('extras',)
+    
+    def __init__(self, **fields):
+        for field in CALCULATOR_INPUT_FIELDS:
+            value = fields.pop(field, 0)
+            if value is None:
+                value = 0
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise ValueError(f"'{field}' must be a number, got {value!r}")
+            if not math.isfinite(value) or value < 0:
+                raise ValueError(f"'{field}' must be a finite number >= 0, got {value!r}")
+            setattr(self, field, value)
+        self.extras = fields or None
+    
+    @staticmethod
+    def from_dict(data):
+        """Build a profile from a form_data dict"""
+        return TenantProfile(**data)
+    
+    def get(self, key, default=None):
+        """dict.get() over calculator fields and extras"""
+        if key in _FIELD_SET:
+            return getattr(self, key)
+        if self.extras is None:
+            return default
+        return self.extras.get(key, default)
+    
+    def to_dict(self):
+        """Today's form_data dict shape (every calculator field, then extras)"""
+        data = {field: getattr(self, field) for field in CALCULATOR_INPUT_FIELDS}
+        if self.extras:
+            data.update(self.extras)
+        return data
+    
+    def estimate(self, rate_card=None):
+        """Manual input estimate for this profile as an EstimateResult"""
+        return EstimateResult.from_dict(EstimationModules.manual_input_estimation(self, rate_card))
+    
+    def __eq__(self, other):
+        if not isinstance(other, TenantProfile):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+    
+    def __repr__(self):
+        return f'<TenantProfile {self.get("company_name", "N/A")}>'
+
+
+class EstimateResult:
+    """
+    Slotted form of one comprehensive estimate
+    Risks, recommendations and critical path items are stored as bitmasks over
+    the engine catalogues (estimation_modules.MIGRATION_RISKS, RECOMMENDATIONS,
+    CRITICAL_PATH_ITEMS); a wave-scheduled critical path is flagged and rebuilt
+    from the stored migration_schedule. from_dict() validates the dict once;
+    to_dict() rebuilds it exactly, including key order.
+    """
+    
+    __slots__ = (
+        'total_cost', 'timeline_weeks', 'complexity_score', 'total_apps', 'total_users',
+        'effort_hours', 'effort_days', 'complexity_level',
+        'licensing', 'professional_services', 'infrastructure', 'support',
+        'phase_names', 'phase_weeks', 'critical_path_mask', 'risk_mask', 'recommendation_mask',
+        'rate_card', 'calculation_date', 'metadata'
+    )
+    
+    def __init__(self, **fields):
+        missing = set(EstimateResult.__slots__) - set(fields)
+        if missing:
+            raise ValueError(f"EstimateResult is missing {', '.join(sorted(missing))}")
+        for name, value in fields.items():
+            setattr(self, name, value)
+    
+    @staticmethod
+    def from_dict(results):
+        """Validate and compact a result dict from any estimation module"""
+        summary = results['executive_summary']
+        effort = results['migration_effort']
+        costs = results['cost_breakdown']
+        timeline = results['timeline_estimation']
+        _expect_keys(summary, 'executive_summary',
+                     ('total_cost', 'timeline_weeks', 'complexity_score', 'total_apps', 'total_users'))
+        _expect_keys(effort, 'migration_effort', ('hours', 'days', 'complexity_level'))
+        _expect_keys(costs, 'cost_breakdown',
+                     ('licensing', 'professional_services', 'infrastructure', 'support', 'total'))
+        _expect_keys(timeline, 'timeline_estimation', ('weeks', 'phases', 'critical_path'))
+        if costs['total'] != summary['total_cost'] or timeline['weeks'] != summary['timeline_weeks']:
+            raise ValueError('cost_breakdown / timeline_estimation disagree with executive_summary')
+        
+        names = tuple(phase['phase'] for phase in timeline['phases'])
+        phase_names = _PHASE_LAYOUTS.setdefault(names, names)
+        metadata = {key: value for key, value in results.items() if key not in CORE_RESULT_KEYS}
+        schedule = metadata.get('migration_schedule')
+        if schedule is not None and \
+                timeline['critical_path'] == EstimationModules._get_schedule_critical_path(schedule):
+            critical_path_mask = SCHEDULED_CRITICAL_PATH
+        else:
+            critical_path_mask = _encode_mask(timeline['critical_path'], _CRITICAL_PATH_CODES,
+                                              lambda item: item, 'critical path')
+        
+        return EstimateResult(
+            total_cost=summary['total_cost'],
+            timeline_weeks=summary['timeline_weeks'],
+            complexity_score=summary['complexity_score'],
+            total_apps=summary['total_apps'],
+            total_users=summary['total_users'],
+            effort_hours=effort['hours'],
+            effort_days=effort['days'],
+            complexity_level=sys.intern(effort['complexity_level']),
+            licensing=costs['licensing'],
+            professional_services=costs['professional_services'],
+            infrastructure=costs['infrastructure'],
+            support=costs['support'],
+            phase_names=phase_names,
+            phase_weeks=tuple(phase['weeks'] for phase in timeline['phases']),
+            critical_path_mask=critical_path_mask,
+            risk_mask=_encode_mask(results['risk_assessment'], _RISK_CODES, _entry_key, 'risk'),
+            recommendation_mask=_encode_mask(results['recommendations'], _RECOMMENDATION_CODES,
+                                             _entry_key, 'recommendation'),
+            rate_card=sys.intern(results['rate_card']) if 'rate_card' in results else None,
+            calculation_date=results.get('calculation_date'),
+            metadata=metadata or None
+        )
+    
+    @property
+    def risks(self):
+        return [dict(entry) for entry in _decode_mask(self.risk_mask, _RISK_ENTRIES)]
+    
+    @property
+    def recommendations(self):
+        return [dict(entry) for entry in _decode_mask(self.recommendation_mask, _RECOMMENDATION_ENTRIES)]
+    
+    @property
+    def critical_path(self):
+        if self.critical_path_mask == SCHEDULED_CRITICAL_PATH:
+            return EstimationModules._get_schedule_critical_path(self.metadata['migration_schedule'])
+        return _decode_mask(self.critical_path_mask, CRITICAL_PATH_ITEMS)
+    
+    def to_dict(self):
+        """Today's result dict shape"""
+        results = {
+            'executive_summary': {
+                'total_cost': self.total_cost,
+                'timeline_weeks': self.timeline_weeks,
+                'complexity_score': self.complexity_score,
+                'total_apps': self.total_apps,
+                'total_users': self.total_users
+            },
+            'migration_effort': {
+                'hours': self.effort_hours,
+                'days': self.effort_days,
+                'complexity_level': self.complexity_level
+            },
+            'cost_breakdown': {
+                'licensing': self.licensing,
+                'professional_services': self.professional_services,
+                'infrastructure': self.infrastructure,
+                'support': self.support,
+                'total': self.total_cost
+            },
+            'timeline_estimation': {
+                'weeks': self.timeline_weeks,
+                'phases': [{'phase': name, 'weeks': weeks} for name, weeks in zip(self.phase_names, self.phase_weeks)],
+                'critical_path': self.critical_path
+            },
+            'risk_assessment': self.risks,
+            'recommendations': self.recommendations
+        }
+        if self.rate_card is not None:
+            results['rate_card'] = self.rate_card
+        if self.calculation_date is not None:
+            results['calculation_date'] = self.calculation_date
+        if self.metadata:
+            results.update(self.metadata)
+        return results
+    
+    def __eq__(self, other):
+        if not isinstance(other, EstimateResult):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in EstimateResult.__slots__)
+    
+    def __repr__(self):
+        return f'<EstimateResult total_cost={self.total_cost} timeline_weeks={self.timeline_weeks}>'
+
+
+# EstimateTable numeric columns: (EstimateResult attribute, dtype)
+TABLE_COLUMNS = (
+    ('total_cost', 'float64'),
+    ('timeline_weeks', 'int32'),
+    ('complexity_score', 'int32'),
+    ('total_apps', 'float64'),
+    ('total_users', 'float64'),
+    ('effort_hours', 'int64'),
+    ('effort_days', 'float64'),
+    ('licensing', 'float64'),
+    ('professional_services', 'float64'),
+    ('infrastructure', 'float64'),
+    ('support', 'float64'),
+    ('critical_path_mask', 'uint8'),
+    ('risk_mask', 'uint8'),
+    ('recommendation_mask', 'uint8')
+)
+
+# Float columns whose original Python value may have been an int (one uint8 flag bit each)
+_INT_FLAG_COLUMNS = tuple(name for name, dtype in TABLE_COLUMNS if dtype == 'float64')
+
+# Integer columns, which only accept whole numbers
+_WHOLE_COLUMNS = tuple(name for name, dtype in TABLE_COLUMNS if dtype != 'float64')
+
+# Labels stored as per-table codes
+_LABEL_COLUMNS = ('complexity_level', 'phase_names', 'rate_card')
+
+_NO_DATE = -2 ** 63
+_EPOCH = datetime(1970, 1, 1)
+
+
+class _Codebook:
+    """Interns repeated labels as small integer codes"""
+    
+    __slots__ = ('values', '_codes')
+    
+    def __init__(self):
+        self.values = []
+        self._codes = {}
+    
+    def code(self, value):
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class EstimateTable:
+    """
+    Columnar store for many estimates
+    Numbers live in typed NumPy arrays, labels (complexity level, phase layout,
+    rate card, estimation type, metadata key layout) as uint8 codes into
+    per-table codebooks, and risks / recommendations / critical path items as
+    catalogue bitmasks. Remaining metadata values are kept per row as tuples
+    with equal values shared between rows.
+    Rows convert back to the exact result dicts via row() / to_dicts().
+    """
+    
+    def __init__(self, columns, codebooks, phase_weeks, int_flags, dates, metadata):
+        self.columns = columns
+        self.codebooks = codebooks
+        self.phase_weeks = phase_weeks
+        self.int_flags = int_flags
+        self.dates = dates
+        self.metadata = metadata
+    
+    @staticmethod
+    def from_results(results):
+        """Build a table from result dicts and/or EstimateResult records"""
+        import numpy as np
+        
+        values = {name: [] for name, _ in TABLE_COLUMNS}
+        codebooks = {name: _Codebook() for name in _LABEL_COLUMNS + ('estimation_type', 'metadata_keys')}
+        codes = {name: [] for name in codebooks}
+        phase_weeks, int_flags, dates, metadata = [], [], [], []
+        shared = {}
+        
+        for result in results:
+            record = result if isinstance(result, EstimateResult) else EstimateResult.from_dict(result)
+            for name in values:
+                values[name].append(getattr(record, name))
+            for name in _LABEL_COLUMNS:
+                codes[name].append(codebooks[name].code(getattr(record, name)))
+            
+            extra = record.metadata or {}
+            codes['estimation_type'].append(codebooks['estimation_type'].code(extra.get('estimation_type')))
+            codes['metadata_keys'].append(codebooks['metadata_keys'].code(tuple(extra)))
+            row_values = []
+            for key, value in extra.items():
+                if key != 'estimation_type':
+                    frozen = _freeze(value)
+                    row_values.append(value if frozen is None else shared.setdefault(frozen, value))
+            metadata.append(tuple(row_values) if row_values else None)
+            
+            phase_weeks.append(record.phase_weeks)
+            int_flags.append(sum(1 << bit for bit, name in enumerate(_INT_FLAG_COLUMNS)
+                                 if not isinstance(getattr(record, name), float)))
+            dates.append(EstimateTable._encode_date(record.calculation_date))
+        
+        if any(len(book.values) > 256 for book in codebooks.values()):
+            raise ValueError('Too many distinct labels for uint8 codes')
+        for name in _WHOLE_COLUMNS:
+            for value in values[name]:
+                if not isinstance(value, Integral):
+                    raise ValueError(f"'{name}' must be a whole number to be stored exactly, got {value!r}")
+        
+        width = max((len(weeks) for weeks in phase_weeks), default=0)
+        weeks = np.zeros((len(phase_weeks), width), dtype=np.int32)
+        for row, row_weeks in enumerate(phase_weeks):
+            weeks[row, :len(row_weeks)] = row_weeks
+        
+        columns = {name: np.asarray(values[name], dtype=dtype) for name, dtype in TABLE_COLUMNS}
+        columns.update((name, np.asarray(codes[name], dtype=np.uint8)) for name in codebooks)
+        objects = np.empty(len(metadata), dtype=object)
+        objects[:] = metadata
+        return EstimateTable(
+            columns, {name: book.values for name, book in codebooks.items()}, weeks,
+            np.asarray(int_flags, dtype=np.uint8), np.asarray(dates, dtype=np.int64), objects
+        )
+    
+    def __len__(self):
+        return len(self.dates)
+    
+    def __iter__(self):
+        return (self.record(index) for index in range(len(self)))
+    
+    def record(self, index):
+        """Row as an EstimateResult"""
+        fields = {}
+        flags = int(self.int_flags[index])
+        for name, _ in TABLE_COLUMNS:
+            value = self.columns[name][index].item()
+            if name in _INT_FLAG_COLUMNS and flags >> _INT_FLAG_COLUMNS.index(name) & 1:
+                value = int(value)
+            fields[name] = value
+        for name in _LABEL_COLUMNS:
+            fields[name] = self.codebooks[name][self.columns[name][index]]
+        
+        phase_names = fields['phase_names']
+        fields['phase_weeks'] = tuple(self.phase_weeks[index, :len(phase_names)].tolist())
+        fields['calculation_date'] = EstimateTable._decode_date(int(self.dates[index]))
+        
+        metadata = {}
+        row_values = iter(self.metadata[index] or ())
+        for key in self.codebooks['metadata_keys'][self.columns['metadata_keys'][index]]:
+            if key == 'estimation_type':
+                metadata[key] = self.codebooks['estimation_type'][self.columns['estimation_type'][index]]
+            else:
+                # Shared values are copied so callers can't mutate other rows
+                value = next(row_values)
+                metadata[key] = value.copy() if isinstance(value, (dict, list)) else value
+        fields['metadata'] = metadata or None
+        return EstimateResult(**fields)
+    
+    def row(self, index):
+        """Row as today's result dict"""
+        return self.record(index).to_dict()
+    
+    def to_dicts(self):
+        """Every row as a result dict, lazily"""
+        return (self.row(index) for index in range(len(self)))
+    
+    def to_frame(self):
+        """Numeric columns plus decoded labels as a DataFrame"""
+        import pandas as pd
+        
+        frame = pd.DataFrame({name: self.columns[name] for name, _ in TABLE_COLUMNS})
+        for name in ('complexity_level', 'rate_card', 'estimation_type'):
+            frame[name] = pd.Categorical.from_codes(self.columns[name], self.codebooks[name])
+        return frame
+    
+    @property
+    def nbytes(self):
+        """Approximate memory held by the table"""
+        arrays = list(self.columns.values()) + [self.phase_weeks, self.int_flags, self.dates]
+        return (sum(array.nbytes for array in arrays) + deep_sizeof(self.metadata)
+                + deep_sizeof(self.codebooks))
+    
+    @staticmethod
+    def _encode_date(value):
+        """calculation_date isoformat string as microseconds since the epoch"""
+        if value is None:
+            return _NO_DATE
+        moment = datetime.fromisoformat(value)
+        if moment.tzinfo is not None or moment.isoformat() != value:
+            raise ValueError(f'Unsupported calculation_date format: {value!r}')
+        return (moment - _EPOCH) // timedelta(microseconds=1)
+    
+    @staticmethod
+    def _decode_date(value):
+        if value == _NO_DATE:
+            return None
+        return (_EPOCH + timedelta(microseconds=value)).isoformat()
@@ -1,11 +1,32 @@
 """
 Core Estimation Modules for OKTA to Entra ID Migration Calculator
 Implements the three main estimation approaches
+The scalar calculators need only the standard library; NumPy and pandas are
+imported on first use of the batch path (estimate_batch / _estimate_columns).
 """
 
 import json
 from datetime import datetime
-import pandas as pd
+
+from rate_card import RateCards
+
+# Every input field the calculators read
+CALCULATOR_INPUT_FIELDS = (
+    'num_employees',
+    'num_it_staff',
+    'num_locations',
+    'saml_apps_count',
+    'bookmark_apps_count',
+    'swa_apps_count',
+    'oidc_apps_count',
+    'okta_policies_count',
+    'okta_ad_agents_count',
+    'okta_radius_agents_count',
+    'provisioning_enabled_apps',
+    'federated_domains_count',
+    'workflow_automations_count',
+    'groups_recreate_count'
+)
 
 # Predefined Scenarios
 PREDEFINED_SCENARIOS = {
@@ -98,22 +119,108 @@ PREDEFINED_SCENARIOS = {
     }
 }
 
+# Risk, recommendation and critical path entries the engine can emit
+# (insertion order is stable; estimate_records interns them as small codes)
+MIGRATION_RISKS = {
+    'complexity': {
+        'level': 'High',
+        'category': 'Complexity',
+        'description': 'High complexity migration with many applications and integrations',
+        'mitigation': 'Implement phased approach with extensive testing'
+    },
+    'automation': {
+        'level': 'Medium',
+        'category': 'Automation',
+        'description': 'Many workflow automations need recreation',
+        'mitigation': 'Map workflows early and consider Power Automate alternatives'
+    },
+    'provisioning': {
+        'level': 'Medium',
+        'category': 'Provisioning',
+        'description': 'Complex provisioning setup',
+        'mitigation': 'Plan for extensive provisioning testing and rollback procedures'
+    },
+    'general': {
+        'level': 'Low',
+        'category': 'General',
+        'description': 'Standard migration complexity expected',
+        'mitigation': 'Follow standard migration best practices'
+    }
+}
+
+RECOMMENDATIONS = {
+    'phased_approach': {
+        'category': 'Approach',
+        'recommendation': 'Consider phased migration approach to reduce risk',
+        'priority': 'High'
+    },
+    'power_automate': {
+        'category': 'Automation',
+        'recommendation': 'Evaluate Power Automate for workflow replacement',
+        'priority': 'Medium'
+    },
+    'pilot': {
+        'category': 'Planning',
+        'recommendation': 'Conduct pilot migration with small user group first',
+        'priority': 'High'
+    },
+    'monitoring': {
+        'category': 'Best Practice',
+        'recommendation': 'Implement comprehensive monitoring and alerting',
+        'priority': 'Medium'
+    },
+    'training': {
+        'category': 'Support',
+        'recommendation': 'Plan for user training and communication throughout migration',
+        'priority': 'Medium'
+    }
+}
+
+CRITICAL_PATH_ITEMS = (
+    'Workflow Automations Recreation',
+    'SWA Applications Migration',
+    'Domain Federation Setup',
+    'Provisioning Configuration',
+    'Standard Application Migration'
+)
+
 class EstimationModules:
     
+    # Optional estimate_cache.EstimateCache consulted by _calculate_comprehensive_estimate
+    estimate_cache = None
+    
+    # Optional instrumentation.StageRegistry timing the estimation stages
+    instrumentation = None
+    
+    # Optional MigrationScheduler.schedule options; when set, estimates carry a
+    # resource-constrained wave schedule instead of the fixed phase split
+    wave_scheduling = None
+    
+    # Optional input_schema.InputSchema; when set, manual inputs are normalized
+    # and invalid ones raise InputValidationError before any calculation
+    input_schema = None
+    
+    # Optional scenario_library.ScenarioLibrary; scenario_based_estimation falls
+    # back to it for keys outside PREDEFINED_SCENARIOS
+    scenario_library = None
+    
     @staticmethod
-    def scenario_based_estimation(scenario_type):
+    def scenario_based_estimation(scenario_type, rate_card=None):
         """
         Module 1: Scenario-Based Estimation
         Uses predefined scenarios for quick estimates
         """
         if scenario_type not in PREDEFINED_SCENARIOS:
-            return None
+            library = EstimationModules.scenario_library
+            if library is None:
+                return None
+            return library.estimate(scenario_type, rate_card)
         
         scenario = PREDEFINED_SCENARIOS[scenario_type]
         data = scenario['data']
         
         # Calculate estimates based on scenario data
-        results = EstimationModules._calculate_comprehensive_estimate(data)
+        results = EstimationModules._calculate_comprehensive_estimate(data, rate_card)
         
         # Add scenario-specific metadata
         results['estimation_type'] = 'Scenario-Based'
@@ -124,7 +231,7 @@ class EstimationModules:
         return results
     
     @staticmethod
-    def manual_input_estimation(form_data):
+    def manual_input_estimation(form_data, rate_card=None):
         """
         Module 2: Manual Input-Based Estimation
         Uses user-provided detailed data
@@ -132,10 +239,72 @@ class EstimationModules:
         # Validate input data
         if not form_data:
             return None
+        if EstimationModules.input_schema is not None:
+            form_data = EstimationModules.input_schema.normalize(form_data)
         
         # Calculate comprehensive estimate
-        results = EstimationModules._calculate_comprehensive_estimate(form_data)
+        results = EstimationModules._calculate_comprehensive_estimate(form_data, rate_card)
         
+        return EstimationModules._add_manual_metadata(results, form_data)
+    
+    @staticmethod
+    def manual_input_estimation_batch(items, rate_card=None):
+        """
+        Module 2 over many form_data dicts in one vectorized evaluation
+        Costs, effort, score and timeline come from _estimate_columns; the
+        rest of each result is assembled by the same helpers as the scalar
+        path, and int/float types follow the inputs like they do there, so the
+        results equal manual_input_estimation's. Falsy items give None, like
+        manual_input_estimation. Pays off from a few dozen items upwards.
+        """
+        import numpy as np
+        
+        rates = RateCards.get(rate_card)
+        if EstimationModules.input_schema is not None:
+            items = EstimationModules.input_schema.normalize_batch(items)
+        present = [index for index, item in enumerate(items) if item]
+        inputs = [[items[index].get(key, 0) for key in CALCULATOR_INPUT_FIELDS] for index in present]
+        matrix = np.array(inputs, dtype=np.float64).reshape(len(present), len(CALCULATOR_INPUT_FIELDS))
+        outputs = EstimationModules._estimate_columns(dict(zip(CALCULATOR_INPUT_FIELDS, matrix.T)), rates)
+        names = [name for name in outputs if name != 'complexity_level']
+        rows = zip(*(outputs[name].tolist() for name in names))
+        
+        # Which inputs must be ints for an output to be an int on the scalar path
+        c = rates.coefficients
+        int_licensing = all(isinstance(value, int) for value in (c.e3_user_month, c.p1_user_month, c.license_months))
+        int_infrastructure = all(isinstance(value, int) for value in (
+            c.base_infrastructure, c.agent_infrastructure, c.domain_infrastructure,
+            c.monitoring_large, c.monitoring_small
+        ))
+        
+        results = [None] * len(items)
+        for index, values, row in zip(present, inputs, rows):
+            data = items[index]
+            figures = dict(zip(names, row))
+            # Pass-through totals are taken from the raw inputs
+            figures['total_users'] = data.get('num_employees', 0)
+            figures['total_apps'] = (
+                data.get('saml_apps_count', 0) +
+                data.get('bookmark_apps_count', 0) +
+                data.get('swa_apps_count', 0) +
+                data.get('oidc_apps_count', 0)
+            )
+            is_int = dict(zip(CALCULATOR_INPUT_FIELDS, (isinstance(value, int) for value in values)))
+            if is_int['num_employees']:
+                if int_licensing:
+                    figures['licensing'] = int(figures['licensing'])
+            if int_infrastructure and is_int['okta_ad_agents_count'] and is_int['okta_radius_agents_count'] \
+                    and is_int['federated_domains_count']:
+                figures['infrastructure'] = int(figures['infrastructure'])
+            if type(figures['licensing']) is int and type(figures['infrastructure']) is int:
+                figures['total_cost'] = int(figures['total_cost'])
+            estimate = EstimationModules._assemble_estimate(data, figures, rates)
+            results[index] = EstimationModules._add_manual_metadata(estimate, data)
+        return results
+    
+    @staticmethod
+    def _add_manual_metadata(results, form_data):
+        """Manual input metadata shared by the scalar and batch paths"""
         # Add input-specific metadata
         results['estimation_type'] = 'Manual Input-Based'
         results['company_name'] = form_data.get('company_name', 'N/A')
@@ -147,13 +316,12 @@ class EstimationModules:
         return results
     
     @staticmethod
-    def okta_api_estimation(api_data):
+    def okta_api_estimation(api_data, rate_card=None):
         """
         Module 3: Automated Estimation via OKTA API
-        Uses data fetched from OKTA API (simulated for now)
+        Uses data fetched from OKTA API (see okta_api_collector.OktaApiCollector)
         """
-        # This would connect to actual OKTA API in production
-        # For now, we'll simulate API response structure
+        # Without collected tenant data, fall back to a simulated API response
         
         if not api_data:
             # Simulate API data structure
@@ -177,19 +345,303 @@ class EstimationModules:
         converted_data = EstimationModules._convert_api_data(api_data)
         
         # Calculate estimates
-        results = EstimationModules._calculate_comprehensive_estimate(converted_data)
+        results = EstimationModules._calculate_comprehensive_estimate(converted_data, rate_card)
         
         # Add API-specific metadata
         results['estimation_type'] = 'OKTA API-Based'
         results['api_data_source'] = 'OKTA Tenant Analysis'
         results['data_accuracy'] = 'High (Real-time data)'
+        if 'snapshot_cache' in api_data:
+            results['snapshot_cache'] = api_data['snapshot_cache']
         
         return results
     
     @staticmethod
-    def _calculate_comprehensive_estimate(data):
+    def app_inventory_estimation(inventory, rate_card=None):
+        """
+        Module 4: Per-Application Inventory Estimation
+        Uses an app_inventory.AppInventory (or the path of a CSV/JSONL app
+        export) for the app counts and its tenant dict for everything else
+        """
+        if isinstance(inventory, str):
+            from app_inventory import AppInventory
+            
+            inventory = AppInventory.load(inventory, rate_card=rate_card)
+        
+        form_data = inventory.form_data()
+        results = EstimationModules._calculate_comprehensive_estimate(form_data, rate_card or inventory.rates)
+        results = EstimationModules._add_manual_metadata(results, form_data)
+        
+        # Add inventory-specific metadata
+        results['estimation_type'] = 'App Inventory-Based'
+        results['inventory'] = inventory.summary()
+        
+        return results
+    
+    @staticmethod
+    def scenario_match_estimation(partial_data, k=3, rate_card=None):
+        """
+        Module 5: Scenario Match Estimation
+        Blends the estimates of the k reference scenarios nearest to a partial
+        input, for a ballpark figure before the full manual input exists
+        """
+        from scenario_library import ScenarioLibrary
+        
+        if not partial_data:
+            return None
+        
+        library = EstimationModules.scenario_library or ScenarioLibrary.default()
+        results = library.blended_estimate(partial_data, k, rate_card)
+        
+        # Add match-specific metadata
+        results['estimation_type'] = 'Scenario Match'
+        results['company_name'] = partial_data.get('company_name', 'N/A')
+        results['project_name'] = partial_data.get('project_name', 'N/A')
+        
+        return results
+    
+    @staticmethod
+    def estimate_batch(df, rate_card=None):
+        """
+        Batch Estimation over a DataFrame of tenants
+        One row per tenant, columns named like PREDEFINED_SCENARIOS[...]['data'].
+        Computes every numeric output column-wise and matches the scalar path.
+        """
+        import pandas as pd
+        
+        if EstimationModules.input_schema is not None:
+            df, errors = EstimationModules.input_schema.validate_frame(df)
+            if errors:
+                from input_schema import InputValidationError
+                
+                raise InputValidationError(errors)
+        columns = {key: EstimationModules._batch_column(df, key) for key in CALCULATOR_INPUT_FIELDS}
+        return pd.DataFrame(EstimationModules._estimate_columns(columns, rate_card), index=df.index)
+    
+    @staticmethod
+    def _estimate_columns(columns, rate_card=None):
+        """
+        Vectorized core behind estimate_batch
+        columns maps input keys to float64 arrays or scalars (missing keys are 0);
+        returns a dict of equally shaped output arrays.
+        """
+        import numpy as np
+        
+        rates = RateCards.get(rate_card)
+        c = rates.coefficients
+        col = lambda key: np.asarray(columns.get(key, 0), dtype=np.float64)
+        steps = lambda table: sum(np.where(col(step.field) > step.above, step.add, 0.0) for step in table)
+        
+        num_employees = col('num_employees')
+        saml = col('saml_apps_count')
+        bookmark = col('bookmark_apps_count')
+        swa = col('swa_apps_count')
+        oidc = col('oidc_apps_count')
+        policies = col('okta_policies_count')
+        agents = col('okta_ad_agents_count') + col('okta_radius_agents_count')
+        workflows = col('workflow_automations_count')
+        provisioning = col('provisioning_enabled_apps')
+        domains = col('federated_domains_count')
+        groups = col('groups_recreate_count')
+        it_staff = col('num_it_staff')
+        locations = col('num_locations')
+        
+        total_apps = saml + bookmark + swa + oidc
+        
+        # Migration effort (see _calculate_migration_effort)
+        total_hours = (
+            c.base_hours +
+            (saml * c.saml_hours + oidc * c.oidc_hours + swa * c.swa_hours + bookmark * c.bookmark_hours) +
+            policies * c.policy_hours +
+            agents * c.agent_hours +
+            workflows * c.workflow_hours +
+            provisioning * c.provisioning_hours +
+            groups * c.group_hours
+        )
+        effort_multiplier = 1.0 + steps(rates.effort_multipliers)
+        effort_hours = np.trunc(total_hours * effort_multiplier)
+        effort_days = effort_hours / c.hours_per_day
+        
+        # Licensing (see _calculate_licensing_cost)
+        licensing_cost = (
+            num_employees * c.e3_user_month * c.license_months +
+            np.where(policies > c.p1_policies_above, num_employees * c.p1_user_month * c.license_months, 0)
+        )
+        
+        # Infrastructure (see _calculate_infrastructure_cost)
+        infrastructure_cost = (
+            c.base_infrastructure +
+            agents * c.agent_infrastructure +
+            domains * c.domain_infrastructure +
+            np.where(num_employees > c.monitoring_employees_above, c.monitoring_large, c.monitoring_small)
+        )
+        
+        # Professional services (see _calculate_professional_services_cost)
+        total_services = (
+            c.base_services +
+            total_apps * c.app_services +
+            policies * c.policy_services +
+            workflows * c.workflow_services +
+            it_staff * c.training_per_staff
+        )
+        services_multiplier = 1.0 + steps(rates.services_multipliers)
+        professional_services_cost = np.trunc(total_services * services_multiplier)
+        
+        # Complexity score (see _calculate_complexity_score)
+        score = (
+            np.minimum(total_apps * c.app_points, c.app_points_cap) +
+            np.minimum(policies * c.policy_points, c.policy_points_cap) +
+            np.minimum(workflows * c.workflow_points, c.workflow_points_cap) +
+            np.minimum(provisioning * c.provisioning_points, c.provisioning_points_cap) +
+            np.minimum(domains * c.domain_points, c.domain_points_cap)
+        )
+        for field, tiers in rates.complexity_steps:
+            score = score + np.select([col(field) > step.above for step in tiers], [step.add for step in tiers], 0)
+        complexity_score = np.minimum(np.trunc(score), c.max_score)
+        
+        # Timeline (see _calculate_timeline)
+        complexity_weeks = steps(rates.timeline_adders)
+        total_weeks = c.base_weeks + ((effort_days / c.days_per_week) * c.effort_factor) + complexity_weeks
+        timeline_weeks = np.maximum(np.trunc(total_weeks), c.min_weeks)
+        
+        total_cost = licensing_cost + infrastructure_cost + professional_services_cost
+        
+        outputs = {
+            'total_apps': total_apps,
+            'total_users': num_employees,
+            'effort_hours': effort_hours.astype(np.int64),
+            'effort_days': effort_days,
+            'complexity_score': complexity_score.astype(np.int64),
+            'complexity_level': np.select(
+                [complexity_score <= 30, complexity_score <= 60], ['Low', 'Medium'], 'High'
+            ),
+            'licensing': licensing_cost,
+            'professional_services': professional_services_cost.astype(np.int64),
+            'infrastructure': infrastructure_cost,
+            'support': professional_services_cost * c.support_rate,
+            'total_cost': total_cost,
+            'timeline_weeks': timeline_weeks.astype(np.int64)
+        }
+        shaped = np.broadcast_arrays(*outputs.values())
+        return dict(zip(outputs, shaped))
+    
+    @staticmethod
+    def _batch_column(df, key):
+        """Read one input column as float64, treating missing values like data.get(key, 0)"""
+        import numpy as np
+        import pandas as pd
+        
+        if key not in df:
+            return np.zeros(len(df))
+        return pd.to_numeric(df[key]).fillna(0).to_numpy(dtype=np.float64)
+    
+    @staticmethod
+    def enable_estimate_cache(maxsize=1024, ttl_seconds=300):
+        """Put a bounded LRU/TTL EstimateCache in front of the core calculation engine"""
+        from estimate_cache import EstimateCache
+        
+        EstimationModules.estimate_cache = EstimateCache(maxsize, ttl_seconds)
+        return EstimationModules.estimate_cache
+    
+    @staticmethod
+    def disable_estimate_cache():
+        """Remove the estimate cache"""
+        EstimationModules.estimate_cache = None
+    
+    @staticmethod
+    def enable_instrumentation(track_allocations=False):
+        """Record per-stage wall time, calls and (optionally) allocations into a StageRegistry"""
+        from instrumentation import StageRegistry
+        
+        EstimationModules.disable_instrumentation()
+        registry = StageRegistry(track_allocations)
+        registry.install()
+        EstimationModules.instrumentation = registry
+        return registry
+    
+    @staticmethod
+    def disable_instrumentation():
+        """Remove the stage timing wrappers (the registry keeps its stats)"""
+        if EstimationModules.instrumentation is not None:
+            EstimationModules.instrumentation.uninstall()
+            EstimationModules.instrumentation = None
+    
+    @staticmethod
+    def enable_wave_scheduling(capacity=None, wave_weeks=2):
+        """
+        Replace the fixed phase split with a migration_scheduler wave schedule
+        timeline_estimation.phases then lists the scheduled phase windows and
+        the full week-by-week plan is added as 'migration_schedule'. The
+        timeline is the longer of the rate card timeline and the schedule's
+        makespan, so staffing can extend it but never cut it below the card.
+        capacity defaults to each tenant's num_it_staff.
+        """
+        EstimationModules.wave_scheduling = {'capacity': capacity, 'wave_weeks': wave_weeks}
+        if EstimationModules.estimate_cache is not None:
+            EstimationModules.estimate_cache.clear()
+    
+    @staticmethod
+    def disable_wave_scheduling():
+        """Go back to the rate card's fixed phase split"""
+        EstimationModules.wave_scheduling = None
+        if EstimationModules.estimate_cache is not None:
+            EstimationModules.estimate_cache.clear()
+    
+    @staticmethod
+    def enable_input_validation(schema=None):
+        """
+        Normalize manual inputs with an InputSchema (default: input_schema.FORM_SCHEMA)
+        Spreadsheet strings like "1,200" are coerced, blanks take the field
+        default and invalid fields raise InputValidationError with a per-field report.
+        """
+        from input_schema import FORM_SCHEMA
+        
+        EstimationModules.input_schema = schema or FORM_SCHEMA
+        return EstimationModules.input_schema
+    
+    @staticmethod
+    def disable_input_validation():
+        """Pass manual inputs to the calculators unchecked again"""
+        EstimationModules.input_schema = None
+    
+    @staticmethod
+    def enable_scenario_library(*sources, include_predefined=True):
+        """
+        Load a ScenarioLibrary from scenario files, workbooks or directories
+        Its scenarios become available to scenario_based_estimation by key and
+        scenario_match_estimation matches against it. With no sources the repo's
+        sample workbooks are used.
+        """
+        from scenario_library import ScenarioLibrary
+        
+        if sources:
+            library = ScenarioLibrary.load(*sources, include_predefined=include_predefined)
+        else:
+            library = ScenarioLibrary.default()
+        EstimationModules.scenario_library = library
+        return library
+    
+    @staticmethod
+    def disable_scenario_library():
+        """Only PREDEFINED_SCENARIOS are available by key again"""
+        EstimationModules.scenario_library = None
+    
+    @staticmethod
+    def _calculate_comprehensive_estimate(data, rate_card=None):
         """
         Core calculation engine for all estimation modules
+        Served from estimate_cache when one is enabled
+        """
+        rates = RateCards.get(rate_card)
+        cache = EstimationModules.estimate_cache
+        if cache is None:
+            return EstimationModules._compute_comprehensive_estimate(data, rates)
+        return cache.get_or_compute(data, EstimationModules._compute_comprehensive_estimate, rates)
+    
+    @staticmethod
+    def _compute_comprehensive_estimate(data, rates):
+        """
+        Uncached comprehensive estimate against a compiled rate card
         """
         # Calculate basic metrics
         total_apps = (
@@ -202,129 +654,178 @@ class EstimationModules:
         num_employees = data.get('num_employees', 0)
         
         # Migration Effort Calculation (hours/days)
-        effort_hours = EstimationModules._calculate_migration_effort(data)
-        effort_days = effort_hours / 8  # 8 hours per day
+        effort_hours = EstimationModules._calculate_migration_effort(data, rates)
+        effort_days = effort_hours / rates.coefficients.hours_per_day
         
         # Licensing Cost Calculation
-        licensing_cost = EstimationModules._calculate_licensing_cost(data)
+        licensing_cost = EstimationModules._calculate_licensing_cost(data, rates)
         
         # Infrastructure Cost Calculation
-        infrastructure_cost = EstimationModules._calculate_infrastructure_cost(data)
+        infrastructure_cost = EstimationModules._calculate_infrastructure_cost(data, rates)
         
         # Professional Services Cost Calculation
-        professional_services_cost = EstimationModules._calculate_professional_services_cost(data)
+        professional_services_cost = EstimationModules._calculate_professional_services_cost(data, rates)
         
         # Risk and Complexity Score (0-100)
-        complexity_score = EstimationModules._calculate_complexity_score(data)
+        complexity_score = EstimationModules._calculate_complexity_score(data, rates)
         
         # Timeline Estimation
-        timeline_weeks = EstimationModules._calculate_timeline(data, effort_days)
+        timeline_weeks = EstimationModules._calculate_timeline(data, effort_days, rates)
+        
+        # Total Cost
+        total_cost = licensing_cost + infrastructure_cost + professional_services_cost
+        
+        figures = {
+            'total_apps': total_apps,
+            'total_users': num_employees,
+            'effort_hours': effort_hours,
+            'effort_days': effort_days,
+            'complexity_score': complexity_score,
+            'licensing': licensing_cost,
+            'professional_services': professional_services_cost,
+            'infrastructure': infrastructure_cost,
+            'support': professional_services_cost * rates.coefficients.support_rate,
+            'total_cost': total_cost,
+            'timeline_weeks': timeline_weeks
+        }
+        return EstimationModules._assemble_estimate(data, figures, rates)
+    
+    @staticmethod
+    def _assemble_estimate(data, figures, rates):
+        """
+        Build the comprehensive result dict from calculated figures
+        figures has the numeric outputs named like the estimate_batch columns.
+        """
+        complexity_score = figures['complexity_score']
+        timeline_weeks = figures['timeline_weeks']
         
         # Risk Assessment
         risk_assessment = EstimationModules._assess_risks(data, complexity_score)
         
-        # Total Cost
-        total_cost = licensing_cost + infrastructure_cost + professional_services_cost
+        schedule = None
+        if EstimationModules.wave_scheduling is not None:
+            from migration_scheduler import MigrationScheduler
+            
+            schedule = MigrationScheduler.schedule(data, rates, **EstimationModules.wave_scheduling)
+            timeline_weeks = max(timeline_weeks, schedule['weeks'])
+            phases = [{'phase': phase['phase'], 'weeks': phase['weeks']} for phase in schedule['phases']]
+            critical_path = EstimationModules._get_schedule_critical_path(schedule)
+        else:
+            phases = EstimationModules._get_migration_phases(timeline_weeks, rates)
+            critical_path = EstimationModules._get_critical_path_items(data)
         
-        return {
+        results = {
             'executive_summary': {
-                'total_cost': total_cost,
+                'total_cost': figures['total_cost'],
                 'timeline_weeks': timeline_weeks,
                 'complexity_score': complexity_score,
-                'total_apps': total_apps,
-                'total_users': num_employees
+                'total_apps': figures['total_apps'],
+                'total_users': figures['total_users']
             },
             'migration_effort': {
-                'hours': effort_hours,
-                'days': effort_days,
+                'hours': figures['effort_hours'],
+                'days': figures['effort_days'],
                 'complexity_level': EstimationModules._get_complexity_level(complexity_score)
             },
             'cost_breakdown': {
-                'licensing': licensing_cost,
-                'professional_services': professional_services_cost,
-                'infrastructure': infrastructure_cost,
-                'support': professional_services_cost * 0.2,  # 20% of services cost
-                'total': total_cost
+                'licensing': figures['licensing'],
+                'professional_services': figures['professional_services'],
+                'infrastructure': figures['infrastructure'],
+                'support': figures['support'],
+                'total': figures['total_cost']
             },
             'timeline_estimation': {
                 'weeks': timeline_weeks,
-                'phases': EstimationModules._get_migration_phases(timeline_weeks),
-                'critical_path': EstimationModules._get_critical_path_items(data)
+                'phases': phases,
+                'critical_path': critical_path
             },
             'risk_assessment': risk_assessment,
             'recommendations': EstimationModules._generate_recommendations(data, complexity_score),
+            'rate_card': rates.card_id,
             'calculation_date': datetime.now().isoformat()
         }
+        if schedule is not None:
+            results['migration_schedule'] = schedule
+        return results
     
     @staticmethod
-    def _calculate_migration_effort(data):
+    def _calculate_migration_effort(data, rates=None):
         """Calculate total migration effort in hours"""
-        base_hours = 160  # Base project hours
+        rates = RateCards.get(rates)
+        c = rates.coefficients
+        base_hours = c.base_hours  # Base project hours
         
         # Application migration hours
         app_hours = (
-            data.get('saml_apps_count', 0) * 8 +
-            data.get('oidc_apps_count', 0) * 6 +
-            data.get('swa_apps_count', 0) * 16 +
-            data.get('bookmark_apps_count', 0) * 2
+            data.get('saml_apps_count', 0) * c.saml_hours +
+            data.get('oidc_apps_count', 0) * c.oidc_hours +
+            data.get('swa_apps_count', 0) * c.swa_hours +
+            data.get('bookmark_apps_count', 0) * c.bookmark_hours
         )
         
         # Policy and configuration hours
-        policy_hours = data.get('okta_policies_count', 0) * 12
-        agent_hours = (data.get('okta_ad_agents_count', 0) + data.get('okta_radius_agents_count', 0)) * 24
-        workflow_hours = data.get('workflow_automations_count', 0) * 32
-        provisioning_hours = data.get('provisioning_enabled_apps', 0) * 16
+        policy_hours = data.get('okta_policies_count', 0) * c.policy_hours
+        agent_hours = (data.get('okta_ad_agents_count', 0) + data.get('okta_radius_agents_count', 0)) * c.agent_hours
+        workflow_hours = data.get('workflow_automations_count', 0) * c.workflow_hours
+        provisioning_hours = data.get('provisioning_enabled_apps', 0) * c.provisioning_hours
         
         # Group migration hours
-        group_hours = data.get('groups_recreate_count', 0) * 2
+        group_hours = data.get('groups_recreate_count', 0) * c.group_hours
         
         total_hours = base_hours + app_hours + policy_hours + agent_hours + workflow_hours + provisioning_hours + group_hours
         
         # Apply complexity multipliers
         complexity_multiplier = 1.0
-        if data.get('num_employees', 0) > 5000:
-            complexity_multiplier += 0.3
-        if data.get('federated_domains_count', 0) > 5:
-            complexity_multiplier += 0.2
+        for step in rates.effort_multipliers:
+            if data.get(step.field, 0) > step.above:
+                complexity_multiplier += step.add
         
         return int(total_hours * complexity_multiplier)
     
     @staticmethod
-    def _calculate_licensing_cost(data):
+    def _calculate_licensing_cost(data, rates=None):
         """Calculate Microsoft licensing costs"""
+        c = RateCards.get(rates).coefficients
         num_employees = data.get('num_employees', 0)
         
-        # Assume E3 licensing at $22/user/month for 12 months
-        base_licensing = num_employees * 22 * 12
+        # E3 licensing per user per month for the licensing term
+        base_licensing = num_employees * c.e3_user_month * c.license_months
         
         # Additional licensing for premium features
         premium_features = 0
-        if data.get('okta_policies_count', 0) > 10:
-            premium_features += num_employees * 5 * 12  # P1 add-on
+        if data.get('okta_policies_count', 0) > c.p1_policies_above:
+            premium_features += num_employees * c.p1_user_month * c.license_months  # P1 add-on
         
         return base_licensing + premium_features
     
     @staticmethod
-    def _calculate_infrastructure_cost(data):
+    def _calculate_infrastructure_cost(data, rates=None):
         """Calculate infrastructure and setup costs"""
-        base_infrastructure = 25000  # Base setup cost
+        c = RateCards.get(rates).coefficients
+        base_infrastructure = c.base_infrastructure  # Base setup cost
         
         # Agents and connectors
-        agent_costs = (data.get('okta_ad_agents_count', 0) + data.get('okta_radius_agents_count', 0)) * 5000
+        agent_costs = (data.get('okta_ad_agents_count', 0) + data.get('okta_radius_agents_count', 0)) * c.agent_infrastructure
         
         # Domain federation setup
-        domain_costs = data.get('federated_domains_count', 0) * 2500
+        domain_costs = data.get('federated_domains_count', 0) * c.domain_infrastructure
         
         # Monitoring and logging
-        monitoring_costs = 15000 if data.get('num_employees', 0) > 1000 else 5000
+        if data.get('num_employees', 0) > c.monitoring_employees_above:
+            monitoring_costs = c.monitoring_large
+        else:
+            monitoring_costs = c.monitoring_small
         
         return base_infrastructure + agent_costs + domain_costs + monitoring_costs
     
     @staticmethod
-    def _calculate_professional_services_cost(data):
+    def _calculate_professional_services_cost(data, rates=None):
         """Calculate professional services costs"""
+        rates = RateCards.get(rates)
+        c = rates.coefficients
+        
         # Base consulting cost
-        base_cost = 50000
+        base_cost = c.base_services
         
         # Application migration services
         total_apps = (
@@ -334,29 +835,30 @@ class EstimationModules:
             data.get('oidc_apps_count', 0)
         )
         
-        app_services = total_apps * 750  # $750 per app
+        app_services = total_apps * c.app_services
         
         # Policy and workflow services
-        policy_services = data.get('okta_policies_count', 0) * 1500
-        workflow_services = data.get('workflow_automations_count', 0) * 2500
+        policy_services = data.get('okta_policies_count', 0) * c.policy_services
+        workflow_services = data.get('workflow_automations_count', 0) * c.workflow_services
         
         # Training and knowledge transfer
-        training_cost = data.get('num_it_staff', 0) * 500
+        training_cost = data.get('num_it_staff', 0) * c.training_per_staff
         
         total_services = base_cost + app_services + policy_services + workflow_services + training_cost
         
         # Apply complexity multiplier
         complexity_multiplier = 1.0
-        if data.get('workflow_automations_count', 0) > 20:
-            complexity_multiplier += 0.4
-        if data.get('provisioning_enabled_apps', 0) > 30:
-            complexity_multiplier += 0.3
+        for step in rates.services_multipliers:
+            if data.get(step.field, 0) > step.above:
+                complexity_multiplier += step.add
         
         return int(total_services * complexity_multiplier)
     
     @staticmethod
-    def _calculate_complexity_score(data):
+    def _calculate_complexity_score(data, rates=None):
         """Calculate migration complexity score (0-100)"""
+        rates = RateCards.get(rates)
+        c = rates.coefficients
         score = 0
         
         # Application complexity
@@ -366,51 +868,49 @@ class EstimationModules:
             data.get('swa_apps_count', 0) +
             data.get('oidc_apps_count', 0)
         )
-        score += min(total_apps * 0.5, 25)  # Max 25 points
+        score += min(total_apps * c.app_points, c.app_points_cap)
         
         # Policy complexity
-        score += min(data.get('okta_policies_count', 0) * 2, 20)  # Max 20 points
+        score += min(data.get('okta_policies_count', 0) * c.policy_points, c.policy_points_cap)
         
         # Integration complexity
-        score += min(data.get('workflow_automations_count', 0) * 1.5, 15)  # Max 15 points
-        score += min(data.get('provisioning_enabled_apps', 0) * 1, 15)  # Max 15 points
+        score += min(data.get('workflow_automations_count', 0) * c.workflow_points, c.workflow_points_cap)
+        score += min(data.get('provisioning_enabled_apps', 0) * c.provisioning_points, c.provisioning_points_cap)
         
         # Infrastructure complexity
-        score += min(data.get('federated_domains_count', 0) * 2, 10)  # Max 10 points
-        
-        # Organization complexity
-        if data.get('num_employees', 0) > 5000:
-            score += 10
-        elif data.get('num_employees', 0) > 1000:
-            score += 5
+        score += min(data.get('federated_domains_count', 0) * c.domain_points, c.domain_points_cap)
         
-        # Locations complexity
-        if data.get('num_locations', 0) > 10:
-            score += 5
+        # Organization and locations complexity (first matching tier per field)
+        for field, tiers in rates.complexity_steps:
+            value = data.get(field, 0)
+            for step in tiers:
+                if value > step.above:
+                    score += step.add
+                    break
         
-        return min(int(score), 100)
+        return min(int(score), c.max_score)
     
     @staticmethod
-    def _calculate_timeline(data, effort_days):
+    def _calculate_timeline(data, effort_days, rates=None):
         """Calculate migration timeline in weeks"""
+        rates = RateCards.get(rates)
+        c = rates.coefficients
+        
         # Base timeline calculation
-        base_weeks = 12
+        base_weeks = c.base_weeks
         
         # Add weeks based on effort
-        effort_weeks = effort_days / 5  # 5 working days per week
+        effort_weeks = effort_days / c.days_per_week
         
         # Add complexity factors
         complexity_weeks = 0
-        if data.get('workflow_automations_count', 0) > 15:
-            complexity_weeks += 4
-        if data.get('provisioning_enabled_apps', 0) > 25:
-            complexity_weeks += 3
-        if data.get('federated_domains_count', 0) > 5:
-            complexity_weeks += 2
+        for step in rates.timeline_adders:
+            if data.get(step.field, 0) > step.above:
+                complexity_weeks += step.add
         
-        total_weeks = base_weeks + (effort_weeks * 0.3) + complexity_weeks
+        total_weeks = base_weeks + (effort_weeks * c.effort_factor) + complexity_weeks
         
-        return max(int(total_weeks), 8)  # Minimum 8 weeks
+        return max(int(total_weeks), c.min_weeks)
     
     @staticmethod
     def _assess_risks(data, complexity_score):
@@ -418,36 +918,16 @@ class EstimationModules:
         risks = []
         
         if complexity_score > 75:
-            risks.append({
-                'level': 'High',
-                'category': 'Complexity',
-                'description': 'High complexity migration with many applications and integrations',
-                'mitigation': 'Implement phased approach with extensive testing'
-            })
+            risks.append(dict(MIGRATION_RISKS['complexity']))
         
         if data.get('workflow_automations_count', 0) > 20:
-            risks.append({
-                'level': 'Medium',
-                'category': 'Automation',
-                'description': 'Many workflow automations need recreation',
-                'mitigation': 'Map workflows early and consider Power Automate alternatives'
-            })
+            risks.append(dict(MIGRATION_RISKS['automation']))
         
         if data.get('provisioning_enabled_apps', 0) > 30:
-            risks.append({
-                'level': 'Medium',
-                'category': 'Provisioning',
-                'description': 'Complex provisioning setup',
-                'mitigation': 'Plan for extensive provisioning testing and rollback procedures'
-            })
+            risks.append(dict(MIGRATION_RISKS['provisioning']))
         
         if not risks:
-            risks.append({
-                'level': 'Low',
-                'category': 'General',
-                'description': 'Standard migration complexity expected',
-                'mitigation': 'Follow standard migration best practices'
-            })
+            risks.append(dict(MIGRATION_RISKS['general']))
         
         return risks
     
@@ -462,15 +942,11 @@ class EstimationModules:
             return 'High'
     
     @staticmethod
-    def _get_migration_phases(timeline_weeks):
+    def _get_migration_phases(timeline_weeks, rates=None):
         """Get migration phases breakdown"""
         return [
-            {'phase': 'Planning & Assessment', 'weeks': max(2, int(timeline_weeks * 0.15))},
-            {'phase': 'Environment Setup', 'weeks': max(1, int(timeline_weeks * 0.1))},
-            {'phase': 'User Migration', 'weeks': max(2, int(timeline_weeks * 0.2))},
-            {'phase': 'Application Migration', 'weeks': max(3, int(timeline_weeks * 0.35))},
-            {'phase': 'Testing & Validation', 'weeks': max(2, int(timeline_weeks * 0.15))},
-            {'phase': 'Cutover & Support', 'weeks': max(1, int(timeline_weeks * 0.05))}
+            {'phase': phase.phase, 'weeks': max(phase.min_weeks, int(timeline_weeks * phase.share))}
+            for phase in RateCards.get(rates).phases
         ]
     
     @staticmethod
@@ -479,66 +955,57 @@ class EstimationModules:
         critical_items = []
         
         if data.get('workflow_automations_count', 0) > 10:
-            critical_items.append('Workflow Automations Recreation')
+            critical_items.append(CRITICAL_PATH_ITEMS[0])
         
         if data.get('swa_apps_count', 0) > 20:
-            critical_items.append('SWA Applications Migration')
+            critical_items.append(CRITICAL_PATH_ITEMS[1])
         
         if data.get('federated_domains_count', 0) > 3:
-            critical_items.append('Domain Federation Setup')
+            critical_items.append(CRITICAL_PATH_ITEMS[2])
         
         if data.get('provisioning_enabled_apps', 0) > 20:
-            critical_items.append('Provisioning Configuration')
+            critical_items.append(CRITICAL_PATH_ITEMS[3])
         
         if not critical_items:
-            critical_items.append('Standard Application Migration')
+            critical_items.append(CRITICAL_PATH_ITEMS[4])
         
         return critical_items
     
+    @staticmethod
+    def _get_schedule_critical_path(schedule):
+        """Critical path items from a wave schedule's critical chain segments"""
+        return [
+            f"{segment['phase']} (week {segment['start_week']})" if segment['start_week'] == segment['end_week']
+            else f"{segment['phase']} (weeks {segment['start_week']}-{segment['end_week']})"
+            for segment in schedule['critical_path']
+        ]
+    
     @staticmethod
     def _generate_recommendations(data, complexity_score):
         """Generate recommendations based on analysis"""
         recommendations = []
         
         if complexity_score > 70:
-            recommendations.append({
-                'category': 'Approach',
-                'recommendation': 'Consider phased migration approach to reduce risk',
-                'priority': 'High'
-            })
+            recommendations.append(dict(RECOMMENDATIONS['phased_approach']))
         
         if data.get('workflow_automations_count', 0) > 15:
-            recommendations.append({
-                'category': 'Automation',
-                'recommendation': 'Evaluate Power Automate for workflow replacement',
-                'priority': 'Medium'
-            })
+            recommendations.append(dict(RECOMMENDATIONS['power_automate']))
         
         if data.get('num_employees', 0) > 2000:
-            recommendations.append({
-                'category': 'Planning',
-                'recommendation': 'Conduct pilot migration with small user group first',
-                'priority': 'High'
-            })
-        
-        recommendations.append({
-            'category': 'Best Practice',
-            'recommendation': 'Implement comprehensive monitoring and alerting',
-            'priority': 'Medium'
-        })
-        
-        recommendations.append({
-            'category': 'Support',
-            'recommendation': 'Plan for user training and communication throughout migration',
-            'priority': 'Medium'
-        })
+            recommendations.append(dict(RECOMMENDATIONS['pilot']))
+        
+        recommendations.append(dict(RECOMMENDATIONS['monitoring']))
+        
+        recommendations.append(dict(RECOMMENDATIONS['training']))
         
         return recommendations
     
     @staticmethod
     def _convert_api_data(api_data):
         """Convert OKTA API data to internal format"""
-        # This would handle real API data structure
+        # Counts collected by OktaApiCollector are used as-is; the estimates
+        # and defaults below only apply to simulated or partial payloads
+        sso_integrations = api_data.get('sso_integrations', 0)
         return {
             'num_employees': api_data.get('users_count', 0),
             'saml_apps_count': api_data.get('applications', {}).get('saml', 0),
@@ -548,11 +1015,11 @@ class EstimationModules:
             'okta_policies_count': api_data.get('policies_count', 0),
             'groups_recreate_count': api_data.get('groups_count', 0),
             'workflow_automations_count': api_data.get('custom_integrations', 0),
-            'provisioning_enabled_apps': api_data.get('sso_integrations', 0) // 2,  # Estimate
-            'federated_domains_count': 1,  # Default
-            'okta_ad_agents_count': 1,  # Default
-            'okta_radius_agents_count': 0,  # Default
-            'push_groups_apps_count': api_data.get('sso_integrations', 0) // 3,  # Estimate
+            'provisioning_enabled_apps': api_data.get('provisioning_apps_count', sso_integrations // 2),  # Estimate
+            'federated_domains_count': api_data.get('federated_domains_count', 1),  # Default
+            'okta_ad_agents_count': api_data.get('ad_agents_count', 1),  # Default
+            'okta_radius_agents_count': api_data.get('radius_agents_count', 0),  # Default
+            'push_groups_apps_count': api_data.get('push_groups_apps_count', sso_integrations // 3),  # Estimate
             'total_push_groups_count': api_data.get('groups_count', 0),
             'annual_okta_cost': api_data.get('users_count', 0) * 48  # Estimate $4/user/month
         }
@@ -0,0 +1,438 @@
+"""
+Local Estimation Service for OKTA to Entra ID Migration Calculator
+asyncio HTTP/JSON front end for the three estimation modules plus a streaming
+batch endpoint. CPU work runs in a process pool; concurrent single estimates
+are micro-batched into one worker call (one vectorized evaluation for manual
+inputs), and pending work is bounded so overload turns into fast 503s.
+
+Endpoints (every estimate endpoint takes an optional ?rate_card=<name>):
+    GET  /health                  liveness plus queue and batching counters
+    GET  /scenarios               PREDEFINED_SCENARIOS
+    POST /estimate/scenario       {"scenario": "medium"}
+    POST /estimate/manual         form_data
+    POST /estimate/api            {"org_url", "api_token"}, {"api_data": {...}} or {} (simulated)
+    POST /estimate/batch?mode=    NDJSON or JSON array of items in, NDJSON records out
+
+Usage:
+    python estimation_service.py [--host 127.0.0.1] [--port 8080] [--processes N]
+                                 [--okta-source stub|live] [--rate-card PATH ...]
+"""
+
+import os
+import sys
+import json
+import random
+import asyncio
+import argparse
+from functools import partial
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from aiohttp import web
+
+from estimation_modules import EstimationModules, get_predefined_scenarios
+from okta_api_collector import OktaApiCollector, OktaApiError
+from rate_card import RateCards
+
+MODES = ('manual', 'scenario', 'api')
+
+# Micro-batches of manual inputs at least this large use the vectorized path
+VECTORIZE_MIN_BATCH = 32
+
+NO_ESTIMATE = 'no estimate produced for this input'
+
+_dumps = partial(json.dumps, default=str)
+
+
+class ServiceBusy(Exception):
+    """Raised when accepting more work would exceed the back-pressure limits"""
+
+
+class StubOktaSource:
+    """
+    Offline stand-in for the OKTA API
+    Returns a deterministic api_data payload per org_url, shaped like
+    OktaApiCollector.collect(), so the API endpoint works without a tenant.
+    """
+    
+    async def collect(self, org_url, api_token=None):
+        generator = random.Random(org_url)
+        applications = {
+            'saml': generator.randint(5, 120),
+            'bookmark': generator.randint(5, 150),
+            'swa': generator.randint(0, 60),
+            'oidc': generator.randint(0, 60)
+        }
+        sso_integrations = sum(applications.values())
+        policies = generator.randint(3, 30)
+        return {
+            'users_count': generator.randint(100, 20000),
+            'groups_count': generator.randint(20, 1500),
+            'applications': applications,
+            'policies_count': policies,
+            'mfa_policies': generator.randint(1, policies),
+            'custom_integrations': generator.randint(0, 30),
+            'sso_integrations': sso_integrations,
+            'provisioning_apps_count': generator.randint(0, sso_integrations // 2),
+            'push_groups_apps_count': generator.randint(0, sso_integrations // 3),
+            'federated_domains_count': generator.randint(1, 8),
+            'ad_agents_count': generator.randint(1, 6),
+            'radius_agents_count': generator.randint(0, 3)
+        }
+
+
+class LiveOktaSource:
+    """Collects api_data from a real tenant with OktaApiCollector"""
+    
+    def __init__(self, **collector_options):
+        self.collector_options = collector_options
+    
+    async def collect(self, org_url, api_token=None):
+        return await OktaApiCollector(org_url, api_token, **self.collector_options).collect()
+
+
+def _init_worker(rate_card_paths):
+    """Worker initializer: register the service's rate cards in each process"""
+    for path in rate_card_paths:
+        RateCards.load(path)
+
+
+def _estimate_one(mode, item, rate_card):
+    if mode == 'scenario':
+        scenario_type = item.get('scenario') if isinstance(item, dict) else item
+        return EstimationModules.scenario_based_estimation(scenario_type, rate_card)
+    if mode == 'api':
+        return EstimationModules.okta_api_estimation(item, rate_card)
+    return EstimationModules.manual_input_estimation(item, rate_card)
+
+
+def _evaluate(mode, rate_card, items):
+    """
+    Worker entry point: estimate one micro-batch
+    Returns ('ok', result), ('missing', message) when the module produced no
+    estimate (e.g. an unknown scenario) or ('error', message) per item, in order.
+    """
+    if mode == 'manual' and len(items) >= VECTORIZE_MIN_BATCH:
+        try:
+            results = EstimationModules.manual_input_estimation_batch(items, rate_card)
+        except Exception:
+            # One malformed item spoils the vectorized pass; isolate it below
+            pass
+        else:
+            return [('ok', result) if result is not None else ('missing', NO_ESTIMATE) for result in results]
+    
+    outcomes = []
+    for item in items:
+        try:
+            result = _estimate_one(mode, item, rate_card)
+            outcomes.append(('ok', result) if result is not None else ('missing', NO_ESTIMATE))
+        except Exception as exc:
+            outcomes.append(('error', f'{type(exc).__name__}: {exc}'))
+    return outcomes
+
+
+class MicroBatcher:
+    """
+    Groups concurrent single estimates into one worker call
+    Items for the same (mode, rate_card) are flushed when max_batch is reached
+    or window seconds after the first one arrived, whichever comes first.
+    At most max_pending items may be queued or running at once.
+    """
+    
+    def __init__(self, evaluate, max_batch=64, window=0.002, max_pending=1024):
+        self.evaluate = evaluate
+        self.max_batch = max_batch
+        self.window = window
+        self.max_pending = max_pending
+        self.pending = 0
+        self.stats = {'batches': 0, 'items': 0, 'rejected': 0}
+        self._groups = {}
+        self._timers = {}
+        self._running = set()
+    
+    async def submit(self, mode, rate_card, item):
+        """Estimate one item; raises ServiceBusy when the queue is full"""
+        if self.pending >= self.max_pending:
+            self.stats['rejected'] += 1
+            raise ServiceBusy(f'{self.pending} estimates pending')
+        
+        key = (mode, rate_card)
+        future = asyncio.get_running_loop().create_future()
+        group = self._groups.setdefault(key, [])
+        group.append((item, future))
+        self.pending += 1
+        
+        if len(group) >= self.max_batch:
+            self._flush(key)
+        elif key not in self._timers:
+            self._timers[key] = asyncio.get_running_loop().call_later(self.window, self._flush, key)
+        
+        try:
+            return await future
+        finally:
+            self.pending -= 1
+    
+    def _flush(self, key):
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        group = self._groups.pop(key, None)
+        if group:
+            task = asyncio.ensure_future(self._run(key, group))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+    
+    async def _run(self, key, group):
+        mode, rate_card = key
+        self.stats['batches'] += 1
+        self.stats['items'] += len(group)
+        try:
+            outcomes = await self.evaluate(mode, rate_card, [item for item, _ in group])
+        except Exception as exc:
+            outcomes = [('error', f'{type(exc).__name__}: {exc}')] * len(group)
+        for (_, future), outcome in zip(group, outcomes):
+            if not future.done():
+                future.set_result(outcome)
+
+
+class EstimationService:
+    """
+    The aiohttp application and its worker pool
+    processes=None uses every core. Batch requests are limited to
+    max_batch_items items and max_streams concurrent streams; each stream keeps
+    at most two chunks per worker in flight and writes records in input order,
+    so a slow client slows the stream down instead of growing buffers.
+    """
+    
+    def __init__(self, processes=None, okta_source=None, rate_card_paths=(), max_batch=64,
+                 batch_window=0.002, max_pending=1024, max_batch_items=1000000, max_streams=4,
+                 stream_chunk=256):
+        self.processes = processes or os.cpu_count() or 1
+        self.okta_source = okta_source or StubOktaSource()
+        self.rate_card_paths = tuple(rate_card_paths)
+        self.max_batch_items = max_batch_items
+        self.stream_chunk = stream_chunk
+        self.batcher = MicroBatcher(self._evaluate, max_batch, batch_window, max_pending)
+        self._streams = asyncio.Semaphore(max_streams)
+        self._executor = None
+        RateCards.get()
+        for path in self.rate_card_paths:
+            RateCards.load(path)
+    
+    def app(self):
+        """Build the aiohttp web.Application"""
+        app = web.Application(client_max_size=64 * 1024 * 1024)
+        app.add_routes([
+            web.get('/health', self.health),
+            web.get('/scenarios', self.scenarios),
+            web.post('/estimate/scenario', self.estimate_scenario),
+            web.post('/estimate/manual', self.estimate_manual),
+            web.post('/estimate/api', self.estimate_api),
+            web.post('/estimate/batch', self.estimate_batch)
+        ])
+        app.on_startup.append(self._start)
+        app.on_cleanup.append(self._stop)
+        return app
+    
+    async def _start(self, app):
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.processes, initializer=_init_worker, initargs=(self.rate_card_paths,)
+        )
+    
+    async def _stop(self, app):
+        # Don't block the event loop on workers still finishing a batch
+        self._executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _evaluate(self, mode, rate_card, items):
+        return asyncio.get_running_loop().run_in_executor(self._executor, _evaluate, mode, rate_card, items)
+    
+    # --- Handlers -------------------------------------------------------------
+    
+    async def health(self, request):
+        return web.json_response({
+            'status': 'ok',
+            'processes': self.processes,
+            'pending': self.batcher.pending,
+            'batching': self.batcher.stats,
+            'rate_cards': RateCards.loaded()
+        })
+    
+    async def scenarios(self, request):
+        return web.json_response(get_predefined_scenarios())
+    
+    async def estimate_scenario(self, request):
+        body = await self._json_body(request)
+        scenario_type = body.get('scenario') if isinstance(body, dict) else body
+        if not isinstance(scenario_type, str):
+            raise web.HTTPNotFound(text=_dumps({'error': f'Unknown scenario {scenario_type!r}'}),
+                                   content_type='application/json')
+        # scenario_based_estimation knows the predefined and scenario library keys
+        return await self._single(request, 'scenario', scenario_type)
+    
+    async def estimate_manual(self, request):
+        body = await self._json_body(request)
+        if not isinstance(body, dict) or not body:
+            raise self._bad_request('Expected a non-empty form_data object')
+        return await self._single(request, 'manual', body)
+    
+    async def estimate_api(self, request):
+        body = await self._json_body(request) if request.can_read_body else {}
+        if not isinstance(body, dict):
+            raise self._bad_request('Expected an object')
+        
+        api_data = body.get('api_data')
+        if api_data is None and body.get('org_url'):
+            try:
+                api_data = await self.okta_source.collect(body['org_url'], body.get('api_token'))
+            except OktaApiError as exc:
+                raise web.HTTPBadGateway(text=_dumps({'error': str(exc)}), content_type='application/json')
+        return await self._single(request, 'api', api_data)
+    
+    async def estimate_batch(self, request):
+        """Stream one NDJSON record per input item, in input order"""
+        mode = request.query.get('mode', 'manual')
+        if mode not in MODES:
+            raise self._bad_request(f"Unknown mode '{mode}', expected one of {', '.join(MODES)}")
+        rate_card = self._rate_card(request)
+        if self._streams.locked():
+            raise self._busy('Too many concurrent batch streams')
+        
+        async with self._streams:
+            # A JSON array body is parsed and checked before the 200 headers go out
+            items = None
+            if request.content_type == 'application/json':
+                items = await self._json_body(request)
+                if not isinstance(items, list):
+                    raise self._bad_request('Expected a JSON array of items')
+            response = web.StreamResponse(headers={'Content-Type': 'application/x-ndjson'})
+            await response.prepare(request)
+            
+            window = deque()
+            index = 0
+            async for chunk, invalid in self._read_items(request, items):
+                if index + len(chunk) > self.max_batch_items:
+                    await response.write(_dumps({'status': 'error', 'error':
+                                                 f'Batch exceeds {self.max_batch_items} items'}).encode() + b'\n')
+                    break
+                window.append((index, self._evaluate(mode, rate_card, chunk), invalid))
+                index += len(chunk)
+                if len(window) >= 2 * self.processes:
+                    await self._write_chunk(response, *window.popleft())
+            while window:
+                await self._write_chunk(response, *window.popleft())
+            
+            await response.write_eof()
+            return response
+    
+    # --- Helpers --------------------------------------------------------------
+    
+    async def _single(self, request, mode, item):
+        try:
+            status, payload = await self.batcher.submit(mode, self._rate_card(request), item)
+        except ServiceBusy as exc:
+            raise self._busy(str(exc))
+        if status == 'missing' and mode == 'scenario':
+            raise web.HTTPNotFound(text=_dumps({'error': f'Unknown scenario {item!r}'}),
+                                   content_type='application/json')
+        if status != 'ok':
+            raise self._bad_request(payload)
+        return web.json_response(payload, dumps=_dumps)
+    
+    async def _read_items(self, request, items=None):
+        """
+        Yield (chunk, invalid) pairs of up to stream_chunk items from an already
+        parsed JSON array or an NDJSON body; invalid maps chunk offsets of lines
+        that are not valid JSON to their parse error (the chunk holds None there)
+        """
+        if items is not None:
+            for start in range(0, len(items), self.stream_chunk):
+                yield items[start:start + self.stream_chunk], {}
+            return
+        
+        chunk = []
+        invalid = {}
+        while True:
+            line = await request.content.readline()
+            if not line:
+                break
+            if not line.strip():
+                continue
+            try:
+                chunk.append(json.loads(line))
+            except ValueError as exc:
+                invalid[len(chunk)] = f'Item is not valid JSON: {exc}'
+                chunk.append(None)
+            if len(chunk) >= self.stream_chunk:
+                yield chunk, invalid
+                chunk = []
+                invalid = {}
+        if chunk:
+            yield chunk, invalid
+    
+    async def _write_chunk(self, response, start, pending, invalid):
+        outcomes = await pending
+        lines = []
+        for offset, (status, payload) in enumerate(outcomes):
+            if offset in invalid:
+                record = {'index': start + offset, 'status': 'error', 'error': invalid[offset]}
+            elif status == 'ok':
+                record = {'index': start + offset, 'status': 'ok', 'result': payload}
+            else:
+                record = {'index': start + offset, 'status': 'error', 'error': payload}
+            lines.append(_dumps(record))
+        # write() drains the transport, so a slow reader pauses this stream
+        await response.write(('\n'.join(lines) + '\n').encode())
+    
+    def _rate_card(self, request):
+        name = request.query.get('rate_card')
+        if name is None:
+            return None
+        try:
+            RateCards.get(name)
+        except KeyError as exc:
+            raise self._bad_request(str(exc.args[0]))
+        return name
+    
+    async def _json_body(self, request):
+        try:
+            return await request.json()
+        except ValueError:
+            raise self._bad_request('Request body is not valid JSON')
+    
+    @staticmethod
+    def _bad_request(message):
+        return web.HTTPBadRequest(text=_dumps({'error': message}), content_type='application/json')
+    
+    @staticmethod
+    def _busy(message):
+        return web.HTTPServiceUnavailable(text=_dumps({'error': message}), content_type='application/json',
+                                          headers={'Retry-After': '1'})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run the local estimation service.')
+    parser.add_argument('--host', default='127.0.0.1', help='interface to bind (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8080, help='port to listen on (default: 8080)')
+    parser.add_argument('--processes', type=int, default=None, help='worker processes (default: all cores)')
+    parser.add_argument('--okta-source', choices=('stub', 'live'), default='stub',
+                        help='where /estimate/api collects tenant data (default: offline stub)')
+    parser.add_argument('--rate-card', action='append', default=[], help='extra rate card file (repeatable)')
+    parser.add_argument('--max-batch', type=int, default=64, help='largest micro-batch of single estimates')
+    parser.add_argument('--batch-window-ms', type=float, default=2.0, help='micro-batch collection window')
+    parser.add_argument('--max-pending', type=int, default=1024, help='single estimates queued before 503s')
+    args = parser.parse_args(argv)
+    
+    service = EstimationService(
+        processes=args.processes,
+        okta_source=LiveOktaSource() if args.okta_source == 'live' else StubOktaSource(),
+        rate_card_paths=args.rate_card,
+        max_batch=args.max_batch,
+        batch_window=args.batch_window_ms / 1000,
+        max_pending=args.max_pending
+    )
+    web.run_app(service.app(), host=args.host, port=args.port, print=lambda message: print(message, file=sys.stderr))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
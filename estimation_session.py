@@ -0,0 +1,233 @@
+"""
+Incremental Estimation Session for OKTA to Entra ID Migration Calculator
+Keeps one tenant's estimate live for an interactive form: records which input
+fields every calculator reads, recomputes only the calculators a change
+touches (and what depends on them) and returns a diff of the result fields
+"""
+
+from datetime import datetime
+
+from estimation_modules import EstimationModules
+from rate_card import RateCards
+
+# Calculator graph in evaluation order: node -> (upstream nodes, compute(session, data, values))
+# Input fields read by each node are recorded at run time, so rate card thresholds are covered
+CALCULATOR_GRAPH = {
+    'total_apps': ((), lambda session, data, values: (
+        data.get('saml_apps_count', 0) +
+        data.get('bookmark_apps_count', 0) +
+        data.get('swa_apps_count', 0) +
+        data.get('oidc_apps_count', 0)
+    )),
+    'total_users': ((), lambda session, data, values: data.get('num_employees', 0)),
+    'effort_hours': ((), lambda session, data, values:
+                     EstimationModules._calculate_migration_effort(data, session.rates)),
+    'effort_days': (('effort_hours',), lambda session, data, values:
+                    values['effort_hours'] / session.rates.coefficients.hours_per_day),
+    'licensing': ((), lambda session, data, values:
+                  EstimationModules._calculate_licensing_cost(data, session.rates)),
+    'infrastructure': ((), lambda session, data, values:
+                       EstimationModules._calculate_infrastructure_cost(data, session.rates)),
+    'professional_services': ((), lambda session, data, values:
+                              EstimationModules._calculate_professional_services_cost(data, session.rates)),
+    'support': (('professional_services',), lambda session, data, values:
+                values['professional_services'] * session.rates.coefficients.support_rate),
+    'complexity_score': ((), lambda session, data, values:
+                         EstimationModules._calculate_complexity_score(data, session.rates)),
+    'migration_schedule': ((), lambda session, data, values: session._schedule(data)),
+    'timeline_weeks': (('effort_days', 'migration_schedule'), lambda session, data, values: max(
+        EstimationModules._calculate_timeline(data, values['effort_days'], session.rates),
+        0 if values['migration_schedule'] is None else values['migration_schedule']['weeks']
+    )),
+    'total_cost': (('licensing', 'infrastructure', 'professional_services'), lambda session, data, values:
+                   values['licensing'] + values['infrastructure'] + values['professional_services']),
+    'complexity_level': (('complexity_score',), lambda session, data, values:
+                         EstimationModules._get_complexity_level(values['complexity_score'])),
+    'phases': (('timeline_weeks', 'migration_schedule'), lambda session, data, values: (
+        EstimationModules._get_migration_phases(values['timeline_weeks'], session.rates)
+        if values['migration_schedule'] is None else
+        [{'phase': phase['phase'], 'weeks': phase['weeks']} for phase in values['migration_schedule']['phases']]
+    )),
+    'critical_path': (('migration_schedule',), lambda session, data, values: (
+        EstimationModules._get_critical_path_items(data)
+        if values['migration_schedule'] is None else
+        EstimationModules._get_schedule_critical_path(values['migration_schedule'])
+    )),
+    'risk_assessment': (('complexity_score',), lambda session, data, values:
+                        EstimationModules._assess_risks(data, values['complexity_score'])),
+    'recommendations': (('complexity_score',), lambda session, data, values:
+                        EstimationModules._generate_recommendations(data, values['complexity_score'])),
+    'company_name': ((), lambda session, data, values: data.get('company_name', 'N/A')),
+    'project_name': ((), lambda session, data, values: data.get('project_name', 'N/A')),
+    'complexity_factors': ((), lambda session, data, values: EstimationModules._analyze_complexity_factors(data))
+}
+
+# Result field -> calculator node, in manual_input_estimation key order ('section.key' for nested fields)
+RESULT_FIELDS = (
+    ('executive_summary.total_cost', 'total_cost'),
+    ('executive_summary.timeline_weeks', 'timeline_weeks'),
+    ('executive_summary.complexity_score', 'complexity_score'),
+    ('executive_summary.total_apps', 'total_apps'),
+    ('executive_summary.total_users', 'total_users'),
+    ('migration_effort.hours', 'effort_hours'),
+    ('migration_effort.days', 'effort_days'),
+    ('migration_effort.complexity_level', 'complexity_level'),
+    ('cost_breakdown.licensing', 'licensing'),
+    ('cost_breakdown.professional_services', 'professional_services'),
+    ('cost_breakdown.infrastructure', 'infrastructure'),
+    ('cost_breakdown.support', 'support'),
+    ('cost_breakdown.total', 'total_cost'),
+    ('timeline_estimation.weeks', 'timeline_weeks'),
+    ('timeline_estimation.phases', 'phases'),
+    ('timeline_estimation.critical_path', 'critical_path'),
+    ('risk_assessment', 'risk_assessment'),
+    ('recommendations', 'recommendations'),
+    ('company_name', 'company_name'),
+    ('project_name', 'project_name'),
+    ('complexity_factors', 'complexity_factors'),
+    ('migration_schedule', 'migration_schedule')
+)
+
+
+class _ReadTracker(dict):
+    """form_data view that records every key a calculator looks up"""
+    
+    __slots__ = ('reads',)
+    
+    def get(self, key, default=None):
+        self.reads.add(key)
+        return dict.get(self, key, default)
+    
+    def __getitem__(self, key):
+        self.reads.add(key)
+        return dict.__getitem__(self, key)
+    
+    def __contains__(self, key):
+        self.reads.add(key)
+        return dict.__contains__(self, key)
+
+
+class EstimationSession:
+    """
+    Live manual-input estimate for one tenant
+    The first run evaluates every CALCULATOR_GRAPH node and records the input
+    fields it read. update() then marks dirty only the nodes that read a
+    changed field, walks the graph in order recomputing those and any node
+    whose upstream value actually changed, and patches the result in place.
+    estimate() matches manual_input_estimation on the same inputs. The wave
+    scheduling and input schema settings are captured when the session is
+    created; with an input schema the initial form_data is normalized and
+    update() normalizes each changed field before applying any of them.
+    """
+    
+    def __init__(self, form_data=None, rate_card=None):
+        self.rates = RateCards.get(rate_card)
+        self.input_schema = EstimationModules.input_schema
+        if self.input_schema is not None and form_data:
+            form_data = self.input_schema.normalize(form_data)
+        self.data = _ReadTracker(form_data or {})
+        self.data.reads = set()
+        self.values = {}
+        self.readers = {}
+        self.node_reads = {}
+        self.stats = {'updates': 0, 'recomputed': 0}
+        self.wave_scheduling = EstimationModules.wave_scheduling
+        for node in CALCULATOR_GRAPH:
+            self.values[node] = self._run(node)
+        self.result = self._assemble()
+    
+    def estimate(self):
+        """The current full result (shared with the session; copy before mutating)"""
+        return self.result
+    
+    def update(self, changes):
+        """
+        Apply field changes (None removes a field) and return the diff
+        {'section.key' or top-level key: new value} of every result field whose
+        value changed, plus calculation_date when anything did.
+        With an input schema, a removed schema field takes its default and an
+        invalid value raises InputValidationError without applying any change.
+        """
+        if self.input_schema is not None:
+            changes = self.input_schema.normalize_fields(changes)
+        self.stats['updates'] += 1
+        changed_fields = set()
+        for field, value in changes.items():
+            present = dict.__contains__(self.data, field)
+            current = dict.get(self.data, field)
+            if value is None:
+                if present:
+                    dict.__delitem__(self.data, field)
+                    changed_fields.add(field)
+            elif not present or not EstimationSession._same(current, value):
+                dict.__setitem__(self.data, field, value)
+                changed_fields.add(field)
+        
+        dirty = set()
+        for field in changed_fields:
+            dirty.update(self.readers.get(field, ()))
+        
+        changed_nodes = set()
+        if dirty:
+            for node, (upstream, _) in CALCULATOR_GRAPH.items():
+                if node not in dirty and changed_nodes.isdisjoint(upstream):
+                    continue
+                value = self._run(node)
+                if not EstimationSession._same(self.values[node], value):
+                    self.values[node] = value
+                    changed_nodes.add(node)
+        
+        diff = {}
+        for path, node in RESULT_FIELDS:
+            if node in changed_nodes:
+                self._set(path, self.values[node])
+                diff[path] = self.values[node]
+        if diff:
+            self.result['calculation_date'] = diff['calculation_date'] = datetime.now().isoformat()
+        return diff
+    
+    def _run(self, node):
+        """Evaluate one node and re-record the input fields it read"""
+        self.stats['recomputed'] += 1
+        reads = self.data.reads = set()
+        value = CALCULATOR_GRAPH[node][1](self, self.data, self.values)
+        for field in self.node_reads.get(node, ()):
+            self.readers[field].discard(node)
+        for field in reads:
+            self.readers.setdefault(field, set()).add(node)
+        self.node_reads[node] = reads
+        return value
+    
+    def _assemble(self):
+        """Full result in the manual_input_estimation layout"""
+        result = {}
+        for path, node in RESULT_FIELDS:
+            if path == 'company_name':
+                result['rate_card'] = self.rates.card_id
+                result['calculation_date'] = datetime.now().isoformat()
+                if self.values['migration_schedule'] is not None:
+                    result['migration_schedule'] = self.values['migration_schedule']
+                result['estimation_type'] = 'Manual Input-Based'
+            if node != 'migration_schedule':
+                self._set(path, self.values[node], result)
+        return result
+    
+    def _set(self, path, value, result=None):
+        result = self.result if result is None else result
+        section, _, key = path.rpartition('.')
+        if section:
+            result = result.setdefault(section, {})
+        result[key] = value
+    
+    def _schedule(self, data):
+        """Wave schedule when scheduling was enabled for the session, else None"""
+        if self.wave_scheduling is None:
+            return None
+        from migration_scheduler import MigrationScheduler
+        
+        return MigrationScheduler.schedule(data, self.rates, **self.wave_scheduling)
+    
+    @staticmethod
+    def _same(old, new):
+        """Equal and of the same type, so 1 -> 1.0 still counts as a change in the JSON output"""
+        return type(old) is type(new) and old == new
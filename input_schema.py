@@ -0,0 +1,318 @@
+"""
+Input Schema for OKTA to Entra ID Migration Calculator
+Validates and normalizes form_data before it reaches the calculators:
+spreadsheet strings such as "1,200" or "$5,000" become numbers, None and
+blank cells fall back to the field default, comma-separated text becomes a
+list, and anything that cannot be coerced is reported per field instead of
+crashing the arithmetic or silently turning into 0
+"""
+
+import math
+from collections import namedtuple
+from collections.abc import Mapping
+
+from estimation_modules import CALCULATOR_INPUT_FIELDS
+
+# One schema field: kind is 'count' (whole number >= 0), 'text' or 'list'
+SchemaField = namedtuple('SchemaField', ['key', 'kind', 'default', 'required'])
+
+# Every field the calculators, metadata and complexity factor analysis read
+FORM_FIELDS = tuple(
+    SchemaField(key, 'count', 0, key == 'num_employees') for key in CALCULATOR_INPUT_FIELDS
+) + (
+    SchemaField('company_name', 'text', 'N/A', False),
+    SchemaField('project_name', 'text', 'N/A', False),
+    SchemaField('appetite_app_refactoring', 'text', '', False),
+    SchemaField('regulatory_requirements', 'list', (), False),
+    SchemaField('current_identity_providers', 'list', (), False)
+)
+
+FIELD_KINDS = ('count', 'text', 'list')
+
+# Characters stripped from numeric text before parsing ("1,200", "$5,000", "1 200")
+NUMBER_NOISE = str.maketrans('', '', ',$ _')
+
+# Counts at or above this do not fit the int64 columns of validate_frame
+COUNT_LIMIT = 2.0 ** 63
+
+# Error codes in the reports: field is None for errors about the record itself
+ERROR_MESSAGES = {
+    'record': 'form_data must be an object',
+    'missing': 'required field is missing',
+    'type': 'cannot be read as a {kind}',
+    'negative': 'must not be negative',
+    'not_integer': 'must be a whole number'
+}
+
+_MISSING = object()
+
+
+class InputValidationError(ValueError):
+    """Raised by InputSchema.normalize when a record (or batch) has invalid fields"""
+    
+    def __init__(self, errors):
+        self.errors = errors
+        shown = '; '.join(
+            (f"[{error['index']}] " if 'index' in error else '') + f"{error['field']}: {error['message']}"
+            for error in errors[:5]
+        )
+        more = f' (+{len(errors) - 5} more)' if len(errors) > 5 else ''
+        super().__init__(f'{len(errors)} invalid input field(s): {shown}{more}')
+
+
+class InputSchema:
+    """
+    A form_data schema compiled for single-pass validation
+    The fields are compiled once into per-kind tuples; validate() walks them
+    once per record, and values that already have the normalized type (an
+    int >= 0 for counts, a str, a list) cost one type check. Unknown keys
+    pass through untouched. validate_frame() applies the same rules column
+    by column to a DataFrame, with array operations for the count columns.
+    """
+    
+    def __init__(self, fields=FORM_FIELDS):
+        for field in fields:
+            if field.kind not in FIELD_KINDS:
+                raise ValueError(f"Unknown field kind '{field.kind}' for {field.key}, "
+                                 f"expected one of {', '.join(FIELD_KINDS)}")
+        self.fields = tuple(fields)
+        self.counts = tuple((f.key, f.default, f.required) for f in self.fields if f.kind == 'count')
+        self.texts = tuple((f.key, f.default, f.required) for f in self.fields if f.kind == 'text')
+        self.lists = tuple((f.key, f.default, f.required) for f in self.fields if f.kind == 'list')
+    
+    def validate(self, data):
+        """
+        Normalize one form_data dict; returns (normalized dict, errors)
+        Every schema field is present in the normalized dict (missing and blank
+        values take the field default). errors is a list of {'field', 'code',
+        'message', 'value'} dicts; invalid fields keep their default. Mappings
+        and records with to_dict() (estimate_records.TenantProfile) are read
+        as their dict.
+        """
+        if not isinstance(data, dict):
+            if isinstance(data, Mapping):
+                data = dict(data)
+            elif callable(getattr(data, 'to_dict', None)):
+                data = data.to_dict()
+            if not isinstance(data, dict):
+                return None, [InputSchema._error(None, 'record', data)]
+        normalized = dict(data)
+        errors = []
+        get = normalized.get
+        
+        for key, default, required in self.counts:
+            value = get(key, _MISSING)
+            if type(value) is int and value >= 0:
+                continue
+            normalized[key] = InputSchema._count(key, value, default, required, errors)
+        
+        for key, default, required in self.texts:
+            value = get(key, _MISSING)
+            if type(value) is str and value:
+                continue
+            if value is _MISSING or value is None or InputSchema._blank(value):
+                if required:
+                    errors.append(InputSchema._error(key, 'missing'))
+                normalized[key] = default
+            elif isinstance(value, (int, float)) and not isinstance(value, bool):
+                normalized[key] = str(value)
+            else:
+                errors.append(InputSchema._error(key, 'type', value, 'text'))
+                normalized[key] = default
+        
+        for key, default, required in self.lists:
+            value = get(key, _MISSING)
+            if type(value) is list:
+                continue
+            if value is _MISSING or value is None or InputSchema._blank(value):
+                if required:
+                    errors.append(InputSchema._error(key, 'missing'))
+                normalized[key] = list(default)
+            elif isinstance(value, str):
+                normalized[key] = InputSchema._split(value)
+            elif isinstance(value, (tuple, set, frozenset)):
+                normalized[key] = list(value)
+            else:
+                errors.append(InputSchema._error(key, 'type', value, 'list'))
+                normalized[key] = list(default)
+        
+        return normalized, errors
+    
+    def normalize(self, data):
+        """Normalized form_data, or InputValidationError listing every invalid field"""
+        normalized, errors = self.validate(data)
+        if errors:
+            raise InputValidationError(errors)
+        return normalized
+    
+    def normalize_fields(self, changes):
+        """
+        normalize() for a partial record: only the fields in changes are checked
+        and returned (None and blank values take the field default, unknown keys
+        pass through), or InputValidationError listing every invalid field
+        """
+        fields = [field for field in self.fields if field.key in changes]
+        schema = self if len(fields) == len(self.fields) else InputSchema(fields)
+        return schema.normalize(changes)
+    
+    def validate_batch(self, items):
+        """
+        validate() over many records; returns (normalized list, errors)
+        Each error carries the record's 'index'; falsy items stay as they are
+        (the estimators return None for them).
+        """
+        validate = self.validate
+        normalized = []
+        errors = []
+        for index, item in enumerate(items):
+            if not item:
+                normalized.append(item)
+                continue
+            record, record_errors = validate(item)
+            normalized.append(record)
+            for error in record_errors:
+                error['index'] = index
+                errors.append(error)
+        return normalized, errors
+    
+    def normalize_batch(self, items):
+        """Normalized records, or InputValidationError listing every invalid field of every record"""
+        normalized, errors = self.validate_batch(items)
+        if errors:
+            raise InputValidationError(errors)
+        return normalized
+    
+    def validate_frame(self, df):
+        """
+        Column-wise validate() for a DataFrame of records; returns (normalized copy, errors)
+        Count columns come back as int64, text as str and list columns as lists;
+        errors carry the DataFrame index label of the row as 'index'.
+        """
+        import numpy as np
+        import pandas as pd
+        
+        frame = df.copy()
+        errors = []
+        rows = len(frame)
+        
+        for key, default, required in self.counts:
+            if key not in frame:
+                if required:
+                    errors.extend(InputSchema._error(key, 'missing', index=label) for label in frame.index)
+                frame[key] = np.full(rows, default, dtype=np.int64)
+                continue
+            column = frame[key]
+            if pd.api.types.is_bool_dtype(column):
+                values = np.full(rows, np.nan)
+                invalid = np.ones(rows, dtype=bool)
+            elif pd.api.types.is_numeric_dtype(column):
+                values = column.to_numpy(dtype=np.float64, copy=True)
+                invalid = np.zeros(rows, dtype=bool)
+            else:
+                # Plain numeric text parses in one pass; only the rest is cleaned and parsed again
+                values = pd.to_numeric(column, errors='coerce').to_numpy(dtype=np.float64, copy=True)
+                retry = np.isnan(values) & column.notna().to_numpy()
+                invalid = np.zeros(rows, dtype=bool)
+                if retry.any():
+                    text = column[retry].astype(str).str.translate(NUMBER_NOISE)
+                    values[retry] = pd.to_numeric(text, errors='coerce').to_numpy(dtype=np.float64)
+                    unparsed = np.isnan(values[retry]) & (text != '').to_numpy()
+                    invalid[retry] = unparsed & (text.str.lower() != 'nan').to_numpy()
+                # Booleans are not counts, even though to_numeric reads them as 0 / 1
+                invalid |= column.map(lambda value: isinstance(value, (bool, np.bool_))).to_numpy(dtype=bool)
+                values[invalid] = np.nan
+            missing = np.isnan(values) & ~invalid
+            negative = values < 0
+            fractional = ~negative & ~np.isnan(values) & ((values != np.floor(values)) | (values >= COUNT_LIMIT))
+            for code, mask in (('type', invalid), ('negative', negative), ('not_integer', fractional)):
+                for position in np.flatnonzero(mask):
+                    errors.append(InputSchema._error(key, code, column.iat[position], 'count', frame.index[position]))
+            if required:
+                errors.extend(InputSchema._error(key, 'missing', index=frame.index[position])
+                              for position in np.flatnonzero(missing))
+            values[invalid | missing | negative | fractional] = default
+            frame[key] = values.astype(np.int64)
+        
+        for key, default, required, is_list in [field + (False,) for field in self.texts] + \
+                [field + (True,) for field in self.lists]:
+            if key not in frame and not required:
+                frame[key] = [list(default) for _ in range(rows)] if is_list else default
+                continue
+            column = frame[key] if key in frame else pd.Series([None] * rows, index=frame.index, dtype=object)
+            values = []
+            for label, value in column.items():
+                if InputSchema._blank(value):
+                    if required:
+                        errors.append(InputSchema._error(key, 'missing', index=label))
+                    values.append(list(default) if is_list else default)
+                elif is_list:
+                    values.append(InputSchema._split(value) if isinstance(value, str) else list(value))
+                else:
+                    values.append(value if isinstance(value, str) else str(value))
+            frame[key] = values
+        
+        return frame, errors
+    
+    @staticmethod
+    def count_value(value):
+        """One count coerced like validate() does, or None when blank or invalid"""
+        if type(value) is int and value >= 0:
+            return value
+        return InputSchema._count(None, value, None, False, [])
+    
+    @staticmethod
+    def _count(key, value, default, required, errors):
+        """Slow path for a count: parse, check and return the normalized value (default when invalid)"""
+        if InputSchema._blank(value):
+            if required:
+                errors.append(InputSchema._error(key, 'missing'))
+            return default
+        if isinstance(value, str):
+            try:
+                number = float(value.translate(NUMBER_NOISE))
+            except ValueError:
+                errors.append(InputSchema._error(key, 'type', value, 'count'))
+                return default
+        elif isinstance(value, bool):
+            errors.append(InputSchema._error(key, 'type', value, 'count'))
+            return default
+        else:
+            try:
+                number = float(value)
+            except (TypeError, ValueError):
+                errors.append(InputSchema._error(key, 'type', value, 'count'))
+                return default
+        if math.isnan(number):
+            if required:
+                errors.append(InputSchema._error(key, 'missing'))
+            return default
+        if number < 0:
+            errors.append(InputSchema._error(key, 'negative', value))
+            return default
+        if not number.is_integer() or number >= COUNT_LIMIT:
+            errors.append(InputSchema._error(key, 'not_integer', value))
+            return default
+        return int(number)
+    
+    @staticmethod
+    def _blank(value):
+        """Missing, None, NaN or whitespace-only"""
+        return (value is _MISSING or value is None or (isinstance(value, float) and math.isnan(value))
+                or (isinstance(value, str) and not value.strip()))
+    
+    @staticmethod
+    def _split(text):
+        """Comma-separated text as a list, like the workbook loader's list cells"""
+        items = [item.strip() for item in text.split(',')]
+        return [item for item in items if item and item != 'None']
+    
+    @staticmethod
+    def _error(field, code, value=None, kind=None, index=None):
+        error = {'field': field, 'code': code, 'message': ERROR_MESSAGES[code].format(kind=kind), 'value': value}
+        if index is not None:
+            error['index'] = index
+        return error
+
+
+# Schema for EstimationModules.manual_input_estimation form_data
+FORM_SCHEMA = InputSchema()
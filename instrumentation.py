@@ -0,0 +1,201 @@
+"""
+Hot-Path Instrumentation for OKTA to Entra ID Migration Calculator
+Opt-in per-stage wall time, call counts and allocation counts for the estimation
+entry points, calculators, input loading and serialization, exportable as
+JSON or a Prometheus text snapshot
+"""
+
+import sys
+import json
+import time
+import threading
+import importlib
+from contextlib import contextmanager
+from functools import wraps
+
+# Instrumented stages: stage name -> (module, class, static method)
+INSTRUMENTED_STAGES = {
+    'entry.scenario_based_estimation': ('estimation_modules', 'EstimationModules', 'scenario_based_estimation'),
+    'entry.manual_input_estimation': ('estimation_modules', 'EstimationModules', 'manual_input_estimation'),
+    'entry.okta_api_estimation': ('estimation_modules', 'EstimationModules', 'okta_api_estimation'),
+    'entry.manual_input_estimation_batch':
+        ('estimation_modules', 'EstimationModules', 'manual_input_estimation_batch'),
+    'entry.app_inventory_estimation': ('estimation_modules', 'EstimationModules', 'app_inventory_estimation'),
+    'entry.scenario_match_estimation': ('estimation_modules', 'EstimationModules', 'scenario_match_estimation'),
+    'entry.estimate_batch': ('estimation_modules', 'EstimationModules', 'estimate_batch'),
+    'input.load_form_data': ('okta_workbook_loader', 'OktaWorkbookLoader', 'load_form_data'),
+    'input.convert_api_data': ('estimation_modules', 'EstimationModules', '_convert_api_data'),
+    'engine.comprehensive_estimate': ('estimation_modules', 'EstimationModules', '_calculate_comprehensive_estimate'),
+    # Self time of this stage is result assembly (everything but the calculators)
+    'engine.assemble_result': ('estimation_modules', 'EstimationModules', '_compute_comprehensive_estimate'),
+    'calculator.migration_effort': ('estimation_modules', 'EstimationModules', '_calculate_migration_effort'),
+    'calculator.licensing_cost': ('estimation_modules', 'EstimationModules', '_calculate_licensing_cost'),
+    'calculator.infrastructure_cost': ('estimation_modules', 'EstimationModules', '_calculate_infrastructure_cost'),
+    'calculator.professional_services_cost':
+        ('estimation_modules', 'EstimationModules', '_calculate_professional_services_cost'),
+    'calculator.complexity_score': ('estimation_modules', 'EstimationModules', '_calculate_complexity_score'),
+    'calculator.timeline': ('estimation_modules', 'EstimationModules', '_calculate_timeline'),
+    'calculator.assess_risks': ('estimation_modules', 'EstimationModules', '_assess_risks'),
+    'calculator.recommendations': ('estimation_modules', 'EstimationModules', '_generate_recommendations'),
+    'output.serialize': ('portfolio_runner', 'PortfolioRunner', '_serialize')
+}
+
+# Per-stage counters, in export order
+STAT_FIELDS = ('calls', 'seconds', 'self_seconds', 'max_seconds', 'allocated_blocks')
+
+# Prometheus metric suffix, type and help text per counter
+PROMETHEUS_METRICS = (
+    ('calls', 'calls_total', 'counter', 'Calls per estimation stage'),
+    ('seconds', 'seconds_total', 'counter', 'Wall time per estimation stage, including nested stages'),
+    ('self_seconds', 'self_seconds_total', 'counter', 'Wall time per estimation stage, excluding nested stages'),
+    ('max_seconds', 'max_seconds', 'gauge', 'Slowest single call per estimation stage'),
+    ('allocated_blocks', 'allocated_blocks_total', 'counter',
+     'Memory blocks still allocated after each call per estimation stage, summed over calls')
+)
+
+
+class StageRegistry:
+    """
+    In-process registry of per-stage timings
+    install() swaps the INSTRUMENTED_STAGES static methods for timing wrappers
+    and uninstall() puts the originals back, so nothing is measured (and
+    nothing costs anything) while the layer is disabled. Nested stages are
+    tracked per thread so each stage also reports its self time. With
+    track_allocations, the growth of sys.getallocatedblocks() over each call
+    (0 when a call frees more than it allocates) is summed too, so every
+    counter only ever increases.
+    Stats are per process: ProcessPoolExecutor workers keep their own copies.
+    """
+    
+    def __init__(self, track_allocations=False):
+        self.track_allocations = track_allocations
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._installed = []
+    
+    def install(self, stages=None):
+        """Wrap the given stage names (default: every INSTRUMENTED_STAGES entry)"""
+        for stage in stages or INSTRUMENTED_STAGES:
+            module, class_name, attribute = INSTRUMENTED_STAGES[stage]
+            owner = getattr(importlib.import_module(module), class_name)
+            original = owner.__dict__[attribute]
+            setattr(owner, attribute, staticmethod(self.wrap(stage, getattr(owner, attribute))))
+            self._installed.append((owner, attribute, original))
+    
+    def uninstall(self):
+        """Restore the original static methods; recorded stats are kept"""
+        while self._installed:
+            owner, attribute, original = self._installed.pop()
+            setattr(owner, attribute, original)
+    
+    def wrap(self, stage, fn):
+        """Timing wrapper for fn recorded under stage (the hot path, so kept inline)"""
+        stats = self._counters(stage)
+        track_allocations = self.track_allocations
+        local = self._local
+        lock = self._lock
+        perf_counter = time.perf_counter
+        
+        @wraps(fn)
+        def timed(*args, **kwargs):
+            try:
+                stack = local.stack
+            except AttributeError:
+                stack = local.stack = []
+            stack.append(0.0)
+            blocks = sys.getallocatedblocks() if track_allocations else 0
+            start = perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                elapsed = perf_counter() - start
+                nested = stack.pop()
+                if stack:
+                    stack[-1] += elapsed
+                allocated = max(sys.getallocatedblocks() - blocks, 0) if track_allocations else 0
+                lock.acquire()
+                stats[0] += 1
+                stats[1] += elapsed
+                stats[2] += elapsed - nested
+                if elapsed > stats[3]:
+                    stats[3] = elapsed
+                stats[4] += allocated
+                lock.release()
+        return timed
+    
+    @contextmanager
+    def stage(self, name):
+        """Time a block of code as one call of stage name (nests with wrapped stages)"""
+        try:
+            stack = self._local.stack
+        except AttributeError:
+            stack = self._local.stack = []
+        stack.append(0.0)
+        blocks = sys.getallocatedblocks() if self.track_allocations else 0
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            nested = stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            allocated = max(sys.getallocatedblocks() - blocks, 0) if self.track_allocations else 0
+            self.record(name, elapsed, elapsed - nested, allocated)
+    
+    def record(self, stage, seconds, self_seconds=None, allocated_blocks=0):
+        """Add one call of stage to the registry"""
+        if self_seconds is None:
+            self_seconds = seconds
+        stats = self._counters(stage)
+        with self._lock:
+            stats[0] += 1
+            stats[1] += seconds
+            stats[2] += self_seconds
+            if seconds > stats[3]:
+                stats[3] = seconds
+            stats[4] += allocated_blocks
+    
+    def _counters(self, stage):
+        """The mutable [calls, seconds, self_seconds, max_seconds, allocated_blocks] list of a stage"""
+        with self._lock:
+            stats = self._stats.get(stage)
+            if stats is None:
+                stats = self._stats[stage] = [0, 0.0, 0.0, 0.0, 0]
+            return stats
+    
+    def reset(self):
+        """Zero every counter"""
+        with self._lock:
+            for stats in self._stats.values():
+                stats[:] = [0, 0.0, 0.0, 0.0, 0]
+    
+    def snapshot(self):
+        """Counters per stage as {stage: {'calls', 'seconds', ..., 'mean_seconds'}}"""
+        with self._lock:
+            stats = {stage: list(values) for stage, values in self._stats.items() if values[0]}
+        snapshot = {}
+        for stage in sorted(stats):
+            entry = dict(zip(STAT_FIELDS, stats[stage]))
+            entry['mean_seconds'] = entry['seconds'] / entry['calls']
+            snapshot[stage] = entry
+        return snapshot
+    
+    def to_json(self, indent=None):
+        """Snapshot as a JSON document"""
+        return json.dumps({'stages': self.snapshot(), 'track_allocations': self.track_allocations}, indent=indent)
+    
+    def prometheus(self, prefix='okta_estimator_stage'):
+        """Snapshot in the Prometheus text exposition format"""
+        snapshot = self.snapshot()
+        lines = []
+        for field, suffix, metric_type, help_text in PROMETHEUS_METRICS:
+            if field == 'allocated_blocks' and not self.track_allocations:
+                continue
+            metric = f'{prefix}_{suffix}'
+            lines.append(f'# HELP {metric} {help_text}')
+            lines.append(f'# TYPE {metric} {metric_type}')
+            for stage, entry in snapshot.items():
+                lines.append(f'{metric}{{stage="{stage}"}} {entry[field]!r}')
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,188 @@
+"""
+Inverse Solver for OKTA to Entra ID Migration Calculator
+Finds the smallest change to a manual input (app retirements, policy
+consolidations, ...) that brings the estimate under cost, timeline or
+complexity targets
+"""
+
+import math
+
+from estimation_modules import EstimationModules, CALCULATOR_INPUT_FIELDS
+from rate_card import RateCards
+
+# Target names -> _estimate_columns output they constrain (always "at most")
+TARGET_OUTPUTS = {
+    'total_cost': 'total_cost',
+    'cost_breakdown.total': 'total_cost',
+    'timeline_weeks': 'timeline_weeks',
+    'timeline_estimation.weeks': 'timeline_weeks',
+    'complexity_score': 'complexity_score',
+    'effort_hours': 'effort_hours'
+}
+
+
+class InverseSolver:
+    """
+    Branch-and-bound over the adjustable input fields
+    Every calculator output is non-decreasing in every input, so the targets
+    carve out a down-set of feasible inputs. At each node the solver evaluates,
+    in one vectorized pass, each free field over its whole range with the other
+    free fields at their lower bounds. That gives the largest value each field
+    may keep (a tightened upper bound), the least change any completion must
+    make (a lower bound on the objective), and proves infeasibility early.
+    The last free field is then set directly to its largest feasible value.
+    The objective is sum(weight * |new - base|) over the adjustable fields.
+    """
+    
+    def __init__(self, base, adjustable, targets, weights=None, rate_card=None, max_nodes=20000):
+        unknown = set(adjustable) - set(CALCULATOR_INPUT_FIELDS)
+        if unknown:
+            raise ValueError(f"Fields not read by the calculators: {', '.join(sorted(unknown))}")
+        if not adjustable:
+            raise ValueError('At least one adjustable field is required')
+        self.targets = {}
+        for name, limit in targets.items():
+            if name not in TARGET_OUTPUTS:
+                raise ValueError(f"Unknown target '{name}', expected one of {', '.join(TARGET_OUTPUTS)}")
+            output = TARGET_OUTPUTS[name]
+            self.targets[output] = min(limit, self.targets.get(output, limit))
+        if not self.targets:
+            raise ValueError('At least one target is required')
+        
+        self.base = base
+        self.rates = RateCards.get(rate_card)
+        self.max_nodes = max_nodes
+        self.weights = {field: (weights or {}).get(field, 1) for field in adjustable}
+        self.low = {}
+        self.preferred = {}
+        for field, (low, high) in adjustable.items():
+            if int(low) != low or int(high) != high or not 0 <= low <= high:
+                raise ValueError(f"Bounds for '{field}' must be integers with 0 <= low <= high")
+            # Raising an input never lowers an output, so values above base never help
+            self.low[field] = int(low)
+            self.preferred[field] = int(min(max(base.get(field, 0), low), high))
+        
+        # Small ranges are branched on first; the largest is solved directly at the leaf
+        self.order = sorted(adjustable, key=lambda field: self.preferred[field] - self.low[field])
+        self.best_cost = float('inf')
+        self.best = None
+        self.stats = {'nodes': 0, 'evaluations': 0, 'rows_evaluated': 0}
+    
+    def solve(self):
+        """
+        Run the search and return the plan
+        {'feasible', 'optimal', 'change_cost', 'changes': {field: {'from', 'to'}},
+         'form_data', 'estimate', 'search'}; optimal is False when max_nodes
+        stopped the search before it proved the plan minimal.
+        """
+        self.exhausted = False
+        self._search(0, {}, 0)
+        
+        feasible = self.best is not None
+        assignment = self.best if feasible else dict(self.low)
+        form_data = dict(self.base)
+        form_data.update(assignment)
+        changes = {
+            field: {'from': self.base.get(field, 0), 'to': value}
+            for field, value in assignment.items() if value != self.base.get(field, 0)
+        }
+        return {
+            'feasible': feasible,
+            'optimal': feasible and not self.exhausted,
+            'change_cost': self._change_cost(assignment),
+            'changes': changes,
+            'form_data': form_data,
+            'estimate': EstimationModules.manual_input_estimation(form_data, self.rates),
+            'search': dict(self.stats)
+        }
+    
+    def _search(self, depth, fixed, cost):
+        self.stats['nodes'] += 1
+        if self.stats['nodes'] > self.max_nodes:
+            self.exhausted = True
+            return
+        
+        free = self.order[depth:]
+        floor = {field: self.low[field] for field in free}
+        while True:
+            upper = self._propagate(fixed, free, floor)
+            if upper is None:
+                return
+            required = {field: self._change(field, upper[field]) for field in free}
+            if cost + sum(required.values()) >= self.best_cost:
+                return
+            if self.best is None:
+                break
+            # Only completions cheaper than the incumbent matter, which bounds how
+            # far each field may drop; tighter floors tighten the upper bounds too
+            budget = self.best_cost - cost - sum(required.values())
+            tightened = False
+            for field in free:
+                value = math.ceil(self.base.get(field, 0) - (budget + required[field]) / self.weights[field])
+                if value > floor[field]:
+                    floor[field] = value
+                    tightened = True
+            if not tightened:
+                break
+        
+        field = free[0]
+        if len(free) == 1:
+            self.best_cost = cost + required[field]
+            self.best = dict(fixed, **{field: upper[field]})
+            return
+        
+        rest = sum(required.values()) - required[field]
+        for value in range(upper[field], floor[field] - 1, -1):
+            change = cost + self._change(field, value)
+            if change + rest >= self.best_cost:
+                break
+            self._search(depth + 1, dict(fixed, **{field: value}), change)
+            if self.exhausted:
+                return
+    
+    def _propagate(self, fixed, free, floor):
+        """
+        Largest feasible value of each free field with the other free fields
+        at their floors, or None when some field has no feasible value
+        """
+        import numpy as np
+        
+        ranges = [np.arange(floor[field], self.preferred[field] + 1, dtype=np.float64) for field in free]
+        rows = sum(len(values) for values in ranges)
+        columns = {field: float(self.base.get(field, 0) or 0) for field in CALCULATOR_INPUT_FIELDS}
+        columns.update((field, float(value)) for field, value in fixed.items())
+        offset = 0
+        for field, values in zip(free, ranges):
+            column = np.full(rows, float(floor[field]))
+            column[offset:offset + len(values)] = values
+            columns[field] = column
+            offset += len(values)
+        
+        feasible = self._feasible(columns) if rows else ()
+        upper = {}
+        offset = 0
+        for field, values in zip(free, ranges):
+            allowed = np.flatnonzero(feasible[offset:offset + len(values)])
+            if not len(allowed):
+                return None
+            upper[field] = int(values[allowed[-1]])
+            offset += len(values)
+        return upper
+    
+    def _feasible(self, columns):
+        import numpy as np
+        
+        self.stats['evaluations'] += 1
+        outputs = EstimationModules._estimate_columns(columns, self.rates)
+        feasible = None
+        for output, limit in self.targets.items():
+            within = outputs[output] <= limit
+            feasible = within if feasible is None else feasible & within
+        self.stats['rows_evaluated'] += feasible.size
+        return np.atleast_1d(feasible)
+    
+    def _change(self, field, value):
+        return self.weights[field] * abs(value - self.base.get(field, 0))
+    
+    def _change_cost(self, assignment):
+        return sum(self._change(field, value) for field, value in assignment.items())
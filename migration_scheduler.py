@@ -0,0 +1,340 @@
+"""
+Migration Wave Scheduler for OKTA to Entra ID Migration Calculator
+Breaks a tenant into work items, packs them into waves under the available
+staff capacity and dependency rules, and derives a week-by-week plan and the
+resource-constrained critical path
+"""
+
+import heapq
+from math import ceil
+
+from rate_card import RateCards
+
+# Work item kinds in plan order: (kind, phase label, input fields, hours coefficient)
+# Each unit of the input fields becomes one work item of the coefficient's hours
+WORK_ITEM_KINDS = (
+    ('planning', 'Planning & Assessment', (), 'base_hours'),
+    ('federation', 'Domain Federation', ('federated_domains_count',), None),
+    ('agent', 'Directory Agents', ('okta_ad_agents_count', 'okta_radius_agents_count'), 'agent_hours'),
+    ('policy', 'Conditional Access Policies', ('okta_policies_count',), 'policy_hours'),
+    ('group', 'Group Migration', ('groups_recreate_count',), 'group_hours'),
+    ('saml_app', 'SAML Applications', ('saml_apps_count',), 'saml_hours'),
+    ('oidc_app', 'OIDC Applications', ('oidc_apps_count',), 'oidc_hours'),
+    ('swa_app', 'SWA Applications', ('swa_apps_count',), 'swa_hours'),
+    ('bookmark_app', 'Bookmark Applications', ('bookmark_apps_count',), 'bookmark_hours'),
+    ('provisioning', 'Provisioning', ('provisioning_enabled_apps',), 'provisioning_hours'),
+    ('workflow', 'Workflow Automations', ('workflow_automations_count',), 'workflow_hours')
+)
+
+APP_KINDS = ('saml_app', 'oidc_app', 'swa_app', 'bookmark_app')
+
+# (before, after): every item of `after` waits for every item of `before`
+DEPENDENCY_RULES = (
+    ('planning', 'federation'),
+    ('planning', 'agent'),
+    ('planning', 'policy'),
+    ('agent', 'group'),
+    ('agent', 'provisioning'),
+    ('group', 'provisioning'),
+    ('group', 'workflow'),
+) + tuple(('federation', kind) for kind in APP_KINDS) + tuple(('policy', kind) for kind in APP_KINDS)
+
+# Hours per federated domain cutover (the effort model has no per-domain hours)
+FEDERATION_HOURS = 16
+
+
+class MigrationScheduler:
+    
+    @staticmethod
+    def schedule(data, rate_card=None, capacity=None, rules=DEPENDENCY_RULES,
+                 wave_weeks=2, federation_hours=FEDERATION_HOURS):
+        """
+        Resource-constrained migration schedule for one tenant
+        capacity is the number of people working in parallel (default
+        num_it_staff, at least 1); each works hours_per_day * days_per_week
+        hours a week and takes one item at a time. Items are list-scheduled by
+        longest remaining path, so the critical chain is started first.
+        Returns a dict with:
+            'weeks'              scheduled duration
+            'unconstrained_weeks' duration with unlimited capacity (DAG critical path)
+            'phases'             per kind: phase label, weeks, start_week, end_week, items, hours
+            'plan'               week by week: hours, utilisation, hours per kind, items completed
+            'waves'              wave_weeks blocks of the plan with the items they complete
+            'critical_path'      resource-constrained critical chain as consecutive kind segments
+        """
+        rates = RateCards.get(rate_card)
+        c = rates.coefficients
+        kinds, items, duration, successors, predecessors = MigrationScheduler._build_graph(
+            data, rates, rules, federation_hours)
+        order = MigrationScheduler._topological_order(successors, predecessors)
+        
+        # Longest path from each node to the end of the project (list-scheduling priority)
+        tail = [0.0] * len(duration)
+        for node in reversed(order):
+            tail[node] = duration[node] + max((tail[successor] for successor in successors[node]), default=0.0)
+        
+        if capacity is None:
+            capacity = data.get('num_it_staff', 0) or 1
+        capacity = max(int(capacity), 1)
+        start, finish, previous_on_worker = MigrationScheduler._list_schedule(
+            duration, successors, predecessors, tail, capacity)
+        
+        hours_per_week = c.hours_per_day * c.days_per_week
+        chain = MigrationScheduler._critical_chain(start, finish, predecessors, previous_on_worker, duration)
+        plan = MigrationScheduler._weekly_plan(kinds, items, start, finish, duration, capacity, hours_per_week)
+        
+        return {
+            'weeks': len(plan),
+            'unconstrained_weeks': ceil(max(tail) / hours_per_week) if max(tail) else 0,
+            'capacity': capacity,
+            'hours_per_week': hours_per_week,
+            'total_hours': round(sum(duration), 2),
+            'phases': MigrationScheduler._phases(kinds, items, start, finish, duration, hours_per_week),
+            'plan': plan,
+            'waves': MigrationScheduler._waves(plan, wave_weeks),
+            'critical_path': MigrationScheduler._chain_segments(chain, kinds, items, start, finish, hours_per_week)
+        }
+    
+    @staticmethod
+    def _build_graph(data, rates, rules, federation_hours):
+        """
+        Work item DAG
+        Items are nodes 0..n-1; each kind also gets a zero-duration gate node
+        that completes when all of its items and prerequisite gates have. Items
+        depend on their prerequisite kinds' gates, so an all-pairs rule costs
+        one edge per item instead of |before| * |after| edges, and empty kinds
+        still pass their prerequisites through.
+        """
+        c = rates.coefficients
+        multiplier = 1.0
+        for step in rates.effort_multipliers:
+            if data.get(step.field, 0) > step.above:
+                multiplier += step.add
+        
+        known = {kind for kind, _, _, _ in WORK_ITEM_KINDS}
+        prerequisites = {kind: [] for kind in known}
+        for before, after in rules:
+            if before not in known or after not in known:
+                raise ValueError(f"Unknown work item kind in rule ({before!r}, {after!r})")
+            prerequisites[after].append(before)
+        
+        kinds, items, duration = [], {}, []
+        for kind, _, fields, coefficient in WORK_ITEM_KINDS:
+            if kind == 'planning':
+                count = 1
+            else:
+                count = sum(int(data.get(field, 0) or 0) for field in fields)
+            hours = federation_hours if coefficient is None else getattr(c, coefficient)
+            items[kind] = range(len(duration), len(duration) + max(count, 0))
+            duration.extend([hours * multiplier] * max(count, 0))
+            kinds.append(kind)
+        
+        gates = {kind: len(duration) + index for index, kind in enumerate(kinds)}
+        duration.extend([0.0] * len(gates))
+        successors = [[] for _ in duration]
+        predecessors = [[] for _ in duration]
+        for kind in kinds:
+            gate = gates[kind]
+            for node in items[kind]:
+                successors[node].append(gate)
+                predecessors[gate].append(node)
+            for before in prerequisites[kind]:
+                before_gate = gates[before]
+                for node in items[kind]:
+                    successors[before_gate].append(node)
+                    predecessors[node].append(before_gate)
+                successors[before_gate].append(gate)
+                predecessors[gate].append(before_gate)
+        return kinds, items, duration, successors, predecessors
+    
+    @staticmethod
+    def _topological_order(successors, predecessors):
+        """Kahn's algorithm; raises ValueError when the rules form a cycle"""
+        indegree = [len(nodes) for nodes in predecessors]
+        stack = [node for node, count in enumerate(indegree) if not count]
+        order = []
+        while stack:
+            node = stack.pop()
+            order.append(node)
+            for successor in successors[node]:
+                indegree[successor] -= 1
+                if not indegree[successor]:
+                    stack.append(successor)
+        if len(order) != len(successors):
+            raise ValueError('Dependency rules contain a cycle')
+        return order
+    
+    @staticmethod
+    def _list_schedule(duration, successors, predecessors, tail, capacity):
+        """
+        Event-driven list scheduling
+        Whenever a worker is free the ready item with the longest remaining path
+        starts; gates complete the moment their last predecessor does.
+        Returns start and finish hours per node and, per item, the item its
+        worker finished just before (for tracing resource delays).
+        """
+        nodes = len(duration)
+        indegree = [len(nodes_before) for nodes_before in predecessors]
+        start = [0.0] * nodes
+        finish = [0.0] * nodes
+        previous_on_worker = [None] * nodes
+        last_on_worker = [None] * capacity
+        free_workers = list(range(capacity - 1, -1, -1))
+        ready = []
+        running = []
+        now = 0.0
+        
+        def complete(node):
+            stack = [node]
+            while stack:
+                done = stack.pop()
+                finish[done] = now
+                for successor in successors[done]:
+                    indegree[successor] -= 1
+                    if indegree[successor]:
+                        continue
+                    if duration[successor]:
+                        heapq.heappush(ready, (-tail[successor], successor))
+                    else:
+                        start[successor] = now
+                        stack.append(successor)
+        
+        for node in [node for node in range(nodes) if not indegree[node]]:
+            if duration[node]:
+                heapq.heappush(ready, (-tail[node], node))
+            else:
+                complete(node)
+        
+        while ready or running:
+            while ready and free_workers:
+                _, node = heapq.heappop(ready)
+                worker = free_workers.pop()
+                start[node] = now
+                previous_on_worker[node] = last_on_worker[worker]
+                last_on_worker[worker] = node
+                heapq.heappush(running, (now + duration[node], node, worker))
+            now, node, worker = heapq.heappop(running)
+            free_workers.append(worker)
+            complete(node)
+            while running and running[0][0] == now:
+                _, node, worker = heapq.heappop(running)
+                free_workers.append(worker)
+                complete(node)
+        return start, finish, previous_on_worker
+    
+    @staticmethod
+    def _critical_chain(start, finish, predecessors, previous_on_worker, duration):
+        """
+        Items on the resource-constrained critical path, first to last
+        Walks back from the last item to finish, each step taking a dependency
+        that finished exactly when the item started or else the item its
+        worker was waiting on.
+        """
+        node = max(range(len(finish)), key=lambda index: (finish[index], duration[index]))
+        chain = []
+        while node is not None:
+            if duration[node]:
+                chain.append(node)
+            began = start[node]
+            if not began:
+                break
+            blocking = next((before for before in predecessors[node] if finish[before] == began), None)
+            if blocking is None:
+                blocking = previous_on_worker[node]
+            node = blocking
+        chain.reverse()
+        return chain
+    
+    @staticmethod
+    def _weekly_plan(kinds, items, start, finish, duration, capacity, hours_per_week):
+        """Hours worked per kind and items completed per kind, week by week"""
+        weeks = ceil(max(finish) / hours_per_week) if max(finish) else 0
+        worked = [{} for _ in range(weeks)]
+        completed = [{} for _ in range(weeks)]
+        for kind in kinds:
+            for node in items[kind]:
+                begin, end = start[node], finish[node]
+                week = int(begin // hours_per_week)
+                while begin < end:
+                    boundary = min((week + 1) * hours_per_week, end)
+                    worked[week][kind] = worked[week].get(kind, 0.0) + boundary - begin
+                    begin = boundary
+                    week += 1
+                done = ceil(end / hours_per_week) - 1
+                completed[done][kind] = completed[done].get(kind, 0) + 1
+        
+        week_capacity = capacity * hours_per_week
+        plan = []
+        for week in range(weeks):
+            hours = sum(worked[week].values())
+            plan.append({
+                'week': week + 1,
+                'hours': round(hours, 2),
+                'utilisation': round(hours / week_capacity, 3),
+                'work': {kind: round(value, 2) for kind, value in worked[week].items()},
+                'completed': completed[week]
+            })
+        return plan
+    
+    @staticmethod
+    def _phases(kinds, items, start, finish, duration, hours_per_week):
+        """Scheduled window of every non-empty kind, in plan order (replaces the fixed phase split)"""
+        labels = {kind: label for kind, label, _, _ in WORK_ITEM_KINDS}
+        phases = []
+        for kind in kinds:
+            nodes = items[kind]
+            if not nodes:
+                continue
+            first = min(start[node] for node in nodes)
+            last = max(finish[node] for node in nodes)
+            start_week = int(first // hours_per_week) + 1
+            end_week = max(ceil(last / hours_per_week), start_week)
+            phases.append({
+                'phase': labels[kind],
+                'weeks': end_week - start_week + 1,
+                'start_week': start_week,
+                'end_week': end_week,
+                'items': len(nodes),
+                'hours': round(sum(duration[node] for node in nodes), 2)
+            })
+        return phases
+    
+    @staticmethod
+    def _waves(plan, wave_weeks):
+        """Consecutive wave_weeks blocks of the weekly plan with the items each completes"""
+        waves = []
+        for offset in range(0, len(plan), wave_weeks):
+            weeks = plan[offset:offset + wave_weeks]
+            completed = {}
+            for week in weeks:
+                for kind, count in week['completed'].items():
+                    completed[kind] = completed.get(kind, 0) + count
+            waves.append({
+                'wave': len(waves) + 1,
+                'start_week': weeks[0]['week'],
+                'end_week': weeks[-1]['week'],
+                'hours': round(sum(week['hours'] for week in weeks), 2),
+                'completed': completed
+            })
+        return waves
+    
+    @staticmethod
+    def _chain_segments(chain, kinds, items, start, finish, hours_per_week):
+        """Critical chain collapsed into runs of the same kind"""
+        labels = {kind: label for kind, label, _, _ in WORK_ITEM_KINDS}
+        kind_of = {node: kind for kind in kinds for node in items[kind]}
+        segments = []
+        for node in chain:
+            kind = kind_of[node]
+            if segments and segments[-1]['kind'] == kind:
+                segment = segments[-1]
+                segment['items'] += 1
+                segment['end_hour'] = finish[node]
+            else:
+                segment = {'kind': kind, 'phase': labels[kind], 'items': 1,
+                           'start_hour': start[node], 'end_hour': finish[node]}
+                segments.append(segment)
+        for segment in segments:
+            segment['start_week'] = int(segment.pop('start_hour') // hours_per_week) + 1
+            segment['end_week'] = max(ceil(segment.pop('end_hour') / hours_per_week), segment['start_week'])
+        return segments
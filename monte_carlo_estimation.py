@@ -0,0 +1,264 @@
+"""
+Monte Carlo Uncertainty Mode for OKTA to Entra ID Migration Calculator
+Turns the point-estimate rates of the core calculators into P10/P50/P90 bands
+"""
+
+import numpy as np
+
+from rate_card import RateCards
+
+# Rate name -> coefficient of the rate card it varies
+RATE_COEFFICIENTS = {
+    # Migration effort (hours)
+    'base_hours': 'base_hours',
+    'saml_app_hours': 'saml_hours',
+    'oidc_app_hours': 'oidc_hours',
+    'swa_app_hours': 'swa_hours',
+    'bookmark_app_hours': 'bookmark_hours',
+    'policy_hours': 'policy_hours',
+    'agent_hours': 'agent_hours',
+    'workflow_hours': 'workflow_hours',
+    'provisioning_hours': 'provisioning_hours',
+    'group_hours': 'group_hours',
+    
+    # Licensing
+    'e3_user_month': 'e3_user_month',
+    'p1_user_month': 'p1_user_month',
+    
+    # Infrastructure
+    'base_infrastructure': 'base_infrastructure',
+    'agent_cost': 'agent_infrastructure',
+    'domain_cost': 'domain_infrastructure',
+    'monitoring_large': 'monitoring_large',
+    'monitoring_small': 'monitoring_small',
+    
+    # Professional services
+    'base_services': 'base_services',
+    'app_services': 'app_services',
+    'policy_services': 'policy_services',
+    'workflow_services': 'workflow_services',
+    'training_per_staff': 'training_per_staff'
+}
+
+# Rate name -> (rate card threshold table, field) of the multiplier step it varies
+RATE_STEPS = {
+    'large_org_effort_multiplier': ('effort_multipliers', 'num_employees'),
+    'multi_domain_effort_multiplier': ('effort_multipliers', 'federated_domains_count'),
+    'workflow_services_multiplier': ('services_multipliers', 'workflow_automations_count'),
+    'provisioning_services_multiplier': ('services_multipliers', 'provisioning_enabled_apps')
+}
+
+# Default spread per rate: (kind, low, high) as fractions of the rate card value,
+# which is the mode; kind is 'triangular' or 'pert'. Rates not listed are fixed.
+DEFAULT_SPREADS = {
+    'base_hours': ('triangular', 0.75, 1.5),
+    'saml_app_hours': ('pert', 0.75, 1.5),
+    'oidc_app_hours': ('pert', 2 / 3, 5 / 3),
+    'swa_app_hours': ('pert', 0.75, 1.75),
+    'bookmark_app_hours': ('pert', 0.5, 1.5),
+    'policy_hours': ('pert', 2 / 3, 5 / 3),
+    'agent_hours': ('pert', 2 / 3, 5 / 3),
+    'workflow_hours': ('pert', 0.75, 1.75),
+    'provisioning_hours': ('pert', 0.75, 1.75),
+    'group_hours': ('pert', 0.5, 2.0),
+    'large_org_effort_multiplier': ('triangular', 2 / 3, 5 / 3),
+    'multi_domain_effort_multiplier': ('triangular', 0.5, 1.75),
+    'base_infrastructure': ('triangular', 0.8, 1.4),
+    'agent_cost': ('triangular', 0.8, 1.4),
+    'domain_cost': ('triangular', 0.8, 1.4),
+    'monitoring_large': ('triangular', 0.8, 4 / 3),
+    'monitoring_small': ('triangular', 0.8, 1.4),
+    'base_services': ('triangular', 0.8, 1.3),
+    'app_services': ('pert', 0.8, 4 / 3),
+    'policy_services': ('pert', 0.8, 4 / 3),
+    'workflow_services': ('pert', 0.8, 1.4),
+    'training_per_staff': ('pert', 0.8, 1.3),
+    'workflow_services_multiplier': ('triangular', 0.75, 1.5),
+    'provisioning_services_multiplier': ('triangular', 2 / 3, 1.5)
+}
+
+DEFAULT_PERCENTILES = (10, 50, 90)
+
+
+class MonteCarloEstimation:
+    
+    @staticmethod
+    def default_distributions(rate_card=None):
+        """
+        Distribution per rate under a rate card: the card value is the mode and
+        DEFAULT_SPREADS sets the range. A plain number is a fixed rate; a tuple
+        is (kind, low, mode, high) where kind is 'triangular' or 'pert'.
+        """
+        rates = RateCards.get(rate_card)
+        values = {name: getattr(rates.coefficients, coefficient) for name, coefficient in RATE_COEFFICIENTS.items()}
+        for name, (table, field) in RATE_STEPS.items():
+            step = next((step for step in getattr(rates, table) if step.field == field), None)
+            if step is not None:
+                values[name] = step.add
+        
+        specs = {}
+        for name, value in values.items():
+            spread = DEFAULT_SPREADS.get(name)
+            specs[name] = value if spread is None else (spread[0], value * spread[1], value, value * spread[2])
+        return specs
+    
+    @staticmethod
+    def simulate(data, samples=100000, distributions=None, seed=None, percentiles=DEFAULT_PERCENTILES,
+                 rate_card=None):
+        """
+        Simulate effort, cost and timeline for one tenant
+        Draws every rate from its distribution (default_distributions() of the
+        rate card, overridden per rate by distributions) and returns percentile
+        tables. Thresholds, timeline and support rate come from the rate card.
+        Pass a fixed seed for reproducible results.
+        """
+        if not data:
+            return None
+        
+        rates = RateCards.get(rate_card)
+        c = rates.coefficients
+        specs = MonteCarloEstimation.default_distributions(rates)
+        if distributions:
+            unknown = set(distributions) - set(RATE_COEFFICIENTS) - set(RATE_STEPS)
+            if unknown:
+                raise ValueError(f"Unknown rate(s): {', '.join(sorted(unknown))}")
+            specs.update(distributions)
+        
+        rng = np.random.default_rng(seed)
+        rate = lambda name: MonteCarloEstimation._draw(rng, specs[name], samples)
+        count = lambda key: data.get(key, 0)
+        step_names = {step: name for name, step in RATE_STEPS.items()}
+        
+        def multiplier(table):
+            # Steps with a named rate are drawn, the rest stay at the card value
+            value = 1.0
+            for step in getattr(rates, table):
+                if count(step.field) > step.above:
+                    name = step_names.get((table, step.field))
+                    value = value + (rate(name) if name in specs else step.add)
+            return value
+        
+        num_employees = count('num_employees')
+        total_apps = (
+            count('saml_apps_count') +
+            count('bookmark_apps_count') +
+            count('swa_apps_count') +
+            count('oidc_apps_count')
+        )
+        agents = count('okta_ad_agents_count') + count('okta_radius_agents_count')
+        workflows = count('workflow_automations_count')
+        provisioning = count('provisioning_enabled_apps')
+        domains = count('federated_domains_count')
+        
+        # Migration effort
+        total_hours = (
+            rate('base_hours') +
+            count('saml_apps_count') * rate('saml_app_hours') +
+            count('oidc_apps_count') * rate('oidc_app_hours') +
+            count('swa_apps_count') * rate('swa_app_hours') +
+            count('bookmark_apps_count') * rate('bookmark_app_hours') +
+            count('okta_policies_count') * rate('policy_hours') +
+            agents * rate('agent_hours') +
+            workflows * rate('workflow_hours') +
+            provisioning * rate('provisioning_hours') +
+            count('groups_recreate_count') * rate('group_hours')
+        )
+        effort_hours = np.trunc(total_hours * multiplier('effort_multipliers'))
+        effort_days = effort_hours / c.hours_per_day
+        
+        # Licensing
+        licensing_cost = num_employees * rate('e3_user_month') * c.license_months
+        if count('okta_policies_count') > c.p1_policies_above:
+            licensing_cost = licensing_cost + num_employees * rate('p1_user_month') * c.license_months
+        
+        # Infrastructure
+        monitoring = rate('monitoring_large') if num_employees > c.monitoring_employees_above \
+            else rate('monitoring_small')
+        infrastructure_cost = (
+            rate('base_infrastructure') +
+            agents * rate('agent_cost') +
+            domains * rate('domain_cost') +
+            monitoring
+        )
+        
+        # Professional services
+        total_services = (
+            rate('base_services') +
+            total_apps * rate('app_services') +
+            count('okta_policies_count') * rate('policy_services') +
+            workflows * rate('workflow_services') +
+            count('num_it_staff') * rate('training_per_staff')
+        )
+        professional_services_cost = np.trunc(total_services * multiplier('services_multipliers'))
+        
+        # Timeline (complexity adders depend only on the fixed counts)
+        complexity_weeks = 0
+        for step in rates.timeline_adders:
+            if count(step.field) > step.above:
+                complexity_weeks += step.add
+        timeline_weeks = np.maximum(
+            np.trunc(c.base_weeks + ((effort_days / c.days_per_week) * c.effort_factor) + complexity_weeks),
+            c.min_weeks
+        )
+        
+        total_cost = licensing_cost + infrastructure_cost + professional_services_cost
+        
+        table = lambda values: MonteCarloEstimation._percentile_table(values, samples, percentiles)
+        
+        return {
+            'samples': samples,
+            'seed': seed,
+            'rate_card': rates.card_id,
+            'percentiles': [f'P{p}' for p in percentiles],
+            'migration_effort': {
+                'hours': table(effort_hours),
+                'days': table(effort_days)
+            },
+            'cost_breakdown': {
+                'licensing': table(licensing_cost),
+                'professional_services': table(professional_services_cost),
+                'infrastructure': table(infrastructure_cost),
+                'support': table(professional_services_cost * c.support_rate),
+                'total': table(total_cost)
+            },
+            'timeline_weeks': table(timeline_weeks)
+        }
+    
+    @staticmethod
+    def scenario_simulation(scenario_type, **kwargs):
+        """Run simulate() against one of the PREDEFINED_SCENARIOS"""
+        from estimation_modules import PREDEFINED_SCENARIOS
+        
+        if scenario_type not in PREDEFINED_SCENARIOS:
+            return None
+        
+        return MonteCarloEstimation.simulate(PREDEFINED_SCENARIOS[scenario_type]['data'], **kwargs)
+    
+    @staticmethod
+    def _draw(rng, spec, samples):
+        """Draw samples for one rate spec (fixed number, triangular or PERT)"""
+        if isinstance(spec, (int, float)):
+            return float(spec)
+        
+        kind, low, mode, high = spec
+        if not low <= mode <= high:
+            raise ValueError(f"Invalid {kind} distribution: expected low <= mode <= high, got {spec}")
+        if low == high:
+            return float(mode)
+        
+        if kind == 'triangular':
+            return rng.triangular(low, mode, high, samples)
+        if kind == 'pert':
+            span = high - low
+            alpha = 1 + 4 * (mode - low) / span
+            beta = 1 + 4 * (high - mode) / span
+            return low + rng.beta(alpha, beta, samples) * span
+        
+        raise ValueError(f"Unknown distribution kind: {kind}")
+    
+    @staticmethod
+    def _percentile_table(values, samples, percentiles):
+        """Percentile table for a sampled (or constant) output"""
+        values = np.broadcast_to(values, (samples,))
+        points = np.percentile(values, percentiles)
+        return {f'P{p}': float(v) for p, v in zip(percentiles, points)}
@@ -0,0 +1,244 @@
+"""
+Async OKTA API Collector for the API-Based Estimation Module
+Pages through the OKTA management API over one pooled HTTP session and
+aggregates the counts EstimationModules.okta_api_estimation expects
+"""
+
+import time
+import random
+import asyncio
+from collections import Counter
+
+import aiohttp
+
+from okta_constants import (
+    SIGN_ON_MODES, PROVISIONING_FEATURES, POLICY_TYPES, FEDERATED_IDP_TYPES, CUSTOM_INTEGRATION_ENDPOINTS
+)
+
+
+class OktaApiError(Exception):
+    """Raised when the OKTA API returns a non-retryable error or retries run out"""
+
+
+class OktaApiCollector:
+    """
+    Collects tenant counts from the OKTA API
+    All requests share one aiohttp session (connection pool) and a semaphore
+    bounding in-flight requests. Each endpoint follows its Link: next cursor and
+    folds every page into running counters, so no object list is held in memory.
+    With a TenantSnapshotCache, users and groups are re-fetched only when changed
+    (lastUpdated gt high-water mark) and the other object types are reused
+    while their snapshot is within the cache TTL.
+    """
+    
+    def __init__(self, org_url, api_token, max_concurrency=8, page_limit=200,
+                 max_retries=5, rate_limit_floor=5, max_backoff=60, snapshot_cache=None):
+        self.org_url = org_url.rstrip('/')
+        self.api_token = api_token
+        self.max_concurrency = max_concurrency
+        self.page_limit = page_limit
+        self.max_retries = max_retries
+        self.rate_limit_floor = rate_limit_floor
+        self.max_backoff = max_backoff
+        self.snapshot_cache = snapshot_cache
+        self.stats = {'requests': 0, 'retries': 0, 'rate_limit_waits': 0}
+        self.snapshot_stats = {'hits': 0, 'misses': 0, 'incremental': 0, 'objects_fetched': 0}
+    
+    async def collect(self):
+        """Collect every endpoint concurrently and return api_data"""
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        connector = aiohttp.TCPConnector(limit=self.max_concurrency)
+        headers = {
+            'Authorization': f'SSWS {self.api_token}',
+            'Accept': 'application/json'
+        }
+        async with aiohttp.ClientSession(connector=connector, headers=headers) as session:
+            self._session = session
+            users, groups, apps, policies, agents, federated, hooks = await asyncio.gather(
+                self._count_users(),
+                self._count_groups(),
+                self._count_apps(),
+                self._count_policies(),
+                self._count_agents(),
+                self._count_federated_idps(),
+                self._count_hooks()
+            )
+        
+        applications = {bucket: apps.get(bucket, 0) for bucket in ('saml', 'bookmark', 'swa', 'oidc')}
+        api_data = {
+            'users_count': users,
+            'groups_count': groups,
+            'applications': applications,
+            'policies_count': policies['total'],
+            'mfa_policies': policies['MFA_ENROLL'],
+            'custom_integrations': hooks,
+            'sso_integrations': apps.get('total', 0),
+            'provisioning_apps_count': apps.get('provisioning', 0),
+            'push_groups_apps_count': apps.get('group_push', 0),
+            'federated_domains_count': federated,
+            'ad_agents_count': agents.get('AD', 0),
+            'radius_agents_count': agents.get('RADIUS', 0)
+        }
+        if self.snapshot_cache is not None:
+            api_data['snapshot_cache'] = dict(self.snapshot_stats)
+        return api_data
+    
+    @staticmethod
+    def collect_api_data(org_url, api_token, **kwargs):
+        """Synchronous wrapper around collect() for scripts and okta_api_estimation callers"""
+        return asyncio.run(OktaApiCollector(org_url, api_token, **kwargs).collect())
+    
+    async def _count_users(self):
+        # Deprovisioned users only show up in lastUpdated deltas; they no longer count
+        contribution = lambda user: {'users': 0 if user.get('status') == 'DEPROVISIONED' else 1}
+        totals = await self._tally('users', '/api/v1/users', contribution, incremental=True)
+        return totals.get('users', 0)
+    
+    async def _count_groups(self):
+        totals = await self._tally('groups', '/api/v1/groups', lambda group: {'groups': 1}, incremental=True)
+        return totals.get('groups', 0)
+    
+    async def _count_apps(self):
+        def contribution(app):
+            features = set(app.get('features') or ())
+            return {
+                SIGN_ON_MODES.get(app.get('signOnMode'), 'other'): 1,
+                'total': 1,
+                'provisioning': 1 if features & PROVISIONING_FEATURES else 0,
+                'group_push': 1 if 'GROUP_PUSH' in features else 0
+            }
+        
+        return await self._tally('apps', '/api/v1/apps', contribution, {'filter': 'status eq "ACTIVE"'})
+    
+    async def _count_policies(self):
+        async def count_type(policy_type):
+            totals = await self._tally(f'policies:{policy_type}', '/api/v1/policies',
+                                       lambda policy: {'policies': 1}, {'type': policy_type})
+            return totals.get('policies', 0)
+        
+        totals = await asyncio.gather(*(count_type(policy_type) for policy_type in POLICY_TYPES))
+        counts = dict(zip(POLICY_TYPES, totals))
+        counts['total'] = sum(totals)
+        return counts
+    
+    async def _count_agents(self):
+        contribution = lambda pool: {(pool.get('type') or 'OTHER').upper(): len(pool.get('agents') or ())}
+        return await self._tally('agents', '/api/v1/agentPools', contribution)
+    
+    async def _count_federated_idps(self):
+        # Active SAML / OIDC identity providers, not /domains (custom URL and email domains)
+        contribution = lambda idp: {
+            'federated': 1 if idp.get('type') in FEDERATED_IDP_TYPES and idp.get('status') == 'ACTIVE' else 0
+        }
+        totals = await self._tally('idps', '/api/v1/idps', contribution)
+        return totals.get('federated', 0)
+    
+    async def _count_hooks(self):
+        # Approximates custom integrations, see okta_constants.CUSTOM_INTEGRATION_ENDPOINTS
+        contribution = lambda hook: {'hooks': 1}
+        totals = await asyncio.gather(*(
+            self._tally(path.rsplit('/', 1)[1], path, contribution) for path in CUSTOM_INTEGRATION_ENDPOINTS
+        ))
+        return sum(total.get('hooks', 0) for total in totals)
+    
+    async def _tally(self, object_type, path, contribution, params=None, incremental=False):
+        """
+        Sum each object's contribution dict over an endpoint
+        Goes through the snapshot cache when one is configured.
+        """
+        cache = self.snapshot_cache
+        totals = Counter()
+        if cache is None:
+            async for page in self._pages(path, params):
+                for item in page:
+                    totals.update(contribution(item))
+            return totals
+        
+        snapshot = cache.load(self.org_url, object_type)
+        if snapshot is not None and not incremental:
+            cache.record('hits')
+            self.snapshot_stats['hits'] += 1
+            return Counter(snapshot['aggregates'])
+        
+        high_water_mark = None
+        if snapshot is not None:
+            cache.record('incremental')
+            self.snapshot_stats['incremental'] += 1
+            totals.update(snapshot['aggregates'])
+            high_water_mark = snapshot['high_water_mark']
+            if high_water_mark:
+                params = dict(params or {})
+                params['filter'] = f'lastUpdated gt "{high_water_mark}"'
+        else:
+            cache.record('misses')
+            self.snapshot_stats['misses'] += 1
+            cache.clear_objects(self.org_url, object_type)
+        
+        async for items in self._pages(path, params):
+            self.snapshot_stats['objects_fetched'] += len(items)
+            contributions = [contribution(item) for item in items]
+            if incremental:
+                pairs = [(item['id'], value) for item, value in zip(items, contributions)]
+                for previous in cache.swap_contributions(self.org_url, object_type, pairs):
+                    totals.subtract(previous)
+                high_water_mark = max(
+                    [high_water_mark or ''] + [item.get('lastUpdated') or '' for item in items]
+                ) or None
+            for value in contributions:
+                totals.update(value)
+        
+        cache.save(self.org_url, object_type, totals, high_water_mark, full_scan=snapshot is None)
+        return totals
+    
+    async def _pages(self, path, params=None):
+        """Yield each page of an endpoint, following Link: rel="next" cursors"""
+        url = self.org_url + path
+        query = dict(params or {})
+        query.setdefault('limit', self.page_limit)
+        while url:
+            page, next_url = await self._get(url, query)
+            yield page
+            url, query = next_url, None
+    
+    async def _get(self, url, params):
+        """GET one page with bounded concurrency, rate-limit pacing and retries"""
+        for attempt in range(self.max_retries + 1):
+            async with self._semaphore:
+                self.stats['requests'] += 1
+                async with self._session.get(url, params=params) as response:
+                    delay = self._rate_limit_delay(response.headers)
+                    if response.status == 429 or response.status >= 500:
+                        retry_delay = delay if response.status == 429 and delay else self._backoff(attempt)
+                    elif response.status >= 400:
+                        raise OktaApiError(f'{response.status} from {url}: {await response.text()}')
+                    else:
+                        page = await response.json()
+                        next_link = response.links.get('next')
+                        next_url = str(next_link['url']) if next_link else None
+                        retry_delay = None
+            
+            if retry_delay is None:
+                if delay:
+                    # Nearly out of quota: hold this worker until the window resets
+                    self.stats['rate_limit_waits'] += 1
+                    await asyncio.sleep(delay)
+                return page, next_url
+            
+            if attempt == self.max_retries:
+                break
+            self.stats['retries'] += 1
+            await asyncio.sleep(retry_delay)
+        
+        raise OktaApiError(f'Giving up on {url} after {self.max_retries} retries')
+    
+    def _rate_limit_delay(self, headers):
+        """Seconds to wait before the next call, based on X-Rate-Limit-Remaining/Reset"""
+        remaining = headers.get('X-Rate-Limit-Remaining')
+        reset = headers.get('X-Rate-Limit-Reset')
+        if remaining is None or reset is None or int(remaining) > self.rate_limit_floor:
+            return 0
+        return min(max(int(reset) - time.time(), 0) + 1, self.max_backoff)
+    
+    def _backoff(self, attempt):
+        """Exponential backoff with jitter for 5xx and 429s without reset headers"""
+        return min(2 ** attempt + random.random(), self.max_backoff)
@@ -0,0 +1,35 @@
+"""
+OKTA API Vocabulary for OKTA to Entra ID Migration Calculator
+Sign-on modes, provisioning features and policy types shared by the API
+collector and the per-app inventory; kept free of third-party imports so
+either can be loaded without the other's dependencies
+"""
+
+# signOnMode -> estimator application bucket
+SIGN_ON_MODES = {
+    'SAML_2_0': 'saml',
+    'SAML_1_1': 'saml',
+    'WS_FEDERATION': 'saml',
+    'OPENID_CONNECT': 'oidc',
+    'BOOKMARK': 'bookmark',
+    'BROWSER_PLUGIN': 'swa',
+    'SECURE_PASSWORD_STORE': 'swa',
+    'AUTO_LOGIN': 'swa',
+    'BASIC_AUTH': 'swa'
+}
+
+# App features that mean provisioning is switched on
+PROVISIONING_FEATURES = {'PUSH_NEW_USERS', 'PUSH_USER_DEACTIVATION', 'PUSH_PROFILE_UPDATES', 'IMPORT_NEW_USERS'}
+
+POLICY_TYPES = ('OKTA_SIGN_ON', 'PASSWORD', 'MFA_ENROLL', 'ACCESS_POLICY', 'PROFILE_ENROLLMENT')
+
+# Identity provider types that federate sign-in from another directory; each
+# active one becomes a federated domain to cut over (social login IdPs such as
+# GOOGLE or FACEBOOK and X509 smart card IdPs are not counted)
+FEDERATED_IDP_TYPES = {'SAML2', 'OIDC'}
+
+# Okta has no direct equivalent of the estimator's custom integration count:
+# event hooks and inline hooks are counted instead, as the closest measure of
+# custom code wired into the tenant. This is an approximation; it feeds
+# workflow_automations_count in EstimationModules.okta_api_estimation.
+CUSTOM_INTEGRATION_ENDPOINTS = ('/api/v1/eventHooks', '/api/v1/inlineHooks')
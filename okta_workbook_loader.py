@@ -0,0 +1,191 @@
+"""
+Bulk Ingestion of OKTA Input Workbooks
+Streams Okta_Input_Sample_* / Okta_Migration_Manual_Input_template.xlsx layouts
+into the form_data dicts expected by EstimationModules.manual_input_estimation
+"""
+
+import os
+import glob
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+# Sheets that carry estimator inputs (multi-sheet form and single-sheet template)
+INPUT_SHEETS = (
+    'Customer Info',
+    'Org Details',
+    'Other Parameters',
+    'Technical Details',
+    'Okta_Migration_Template'
+)
+
+# Workbook 'Field Name' label (normalized) -> (form_data key, value type)
+FIELD_MAP = {
+    'company name': ('company_name', 'text'),
+    'customer contact name': ('customer_contact_name', 'text'),
+    'customer email': ('customer_email', 'text'),
+    'industry sector': ('industry_sector', 'text'),
+    'region / country': ('region', 'text'),
+    'project / engagement name': ('project_name', 'text'),
+    'number of employees': ('num_employees', 'number'),
+    'number of it staff': ('num_it_staff', 'number'),
+    'number of locations': ('num_locations', 'number'),
+    'regulatory requirements': ('regulatory_requirements', 'list'),
+    'cloud maturity level': ('cloud_maturity_level', 'text'),
+    'annual okta subcription cost': ('annual_okta_cost', 'number'),
+    'appetite for app refactoring': ('appetite_app_refactoring', 'text'),
+    'internal migration resources': ('internal_migration_resources', 'text'),
+    'current identity providors': ('current_identity_providers', 'list'),
+    'full service migration or guided migration': ('migration_type', 'text'),
+    'count of saml apps': ('saml_apps_count', 'number'),
+    'count of bookmark apps': ('bookmark_apps_count', 'number'),
+    'count of swa apps': ('swa_apps_count', 'number'),
+    'count of open id connect apps': ('oidc_apps_count', 'number'),
+    'count of okta authenication policies': ('okta_policies_count', 'number'),
+    'count of okta ad agents': ('okta_ad_agents_count', 'number'),
+    'count of okta radius agents': ('okta_radius_agents_count', 'number'),
+    'count of apps with provisioning enabled': ('provisioning_enabled_apps', 'number'),
+    'user profile source': ('user_profile_source', 'list'),
+    'office 365 integrated': ('office365_integrated', 'text'),
+    'number of domains federated': ('federated_domains_count', 'number'),
+    'authenicators used': ('authenticators_used', 'list'),
+    'count of okta workflow automations used': ('workflow_automations_count', 'number'),
+    'count of apps with push groups enabled': ('push_groups_apps_count', 'number'),
+    'count of total push groups': ('total_push_groups_count', 'number'),
+    'count of groups that need to be recreated in entra': ('groups_recreate_count', 'number')
+}
+
+
+class OktaWorkbookLoader:
+    
+    @staticmethod
+    def load_form_data(path):
+        """
+        Read one input workbook into a form_data dict
+        Only the input sheets are opened, in read-only row-iterating mode,
+        and only the 'Field Name' and 'Value' columns are parsed.
+        """
+        import openpyxl
+        
+        form_data = {}
+        found_layout = False
+        
+        workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+        try:
+            for sheet_name in INPUT_SHEETS:
+                if sheet_name not in workbook.sheetnames:
+                    continue
+                
+                rows = workbook[sheet_name].iter_rows(values_only=True)
+                header = [str(cell).strip() if cell is not None else '' for cell in next(rows, ())]
+                if 'Field Name' not in header or 'Value' not in header:
+                    continue
+                
+                found_layout = True
+                label_col = header.index('Field Name')
+                value_col = header.index('Value')
+                
+                for row in rows:
+                    if len(row) <= max(label_col, value_col) or row[label_col] is None:
+                        continue
+                    mapping = FIELD_MAP.get(OktaWorkbookLoader._normalize_label(row[label_col]))
+                    if mapping is None:
+                        continue
+                    key, kind = mapping
+                    value = OktaWorkbookLoader._convert_value(row[value_col], kind)
+                    if value is not None:
+                        form_data[key] = value
+        finally:
+            workbook.close()
+        
+        if not found_layout:
+            raise ValueError("no sheet with 'Field Name' and 'Value' columns")
+        
+        form_data['source_file'] = os.path.basename(path)
+        return form_data
+    
+    @staticmethod
+    def iter_form_data(directory, pattern='*.xlsx', processes=None, on_error='raise'):
+        """
+        Lazily yield form_data dicts for every matching workbook in a directory
+        processes=None reads in-process; an integer (or 0 for all cores) fans the
+        files out over a process pool with a bounded number of files in flight,
+        so memory stays flat and results come back in directory order.
+        on_error='skip' drops unreadable workbooks instead of raising.
+        """
+        if on_error not in ('raise', 'skip'):
+            raise ValueError("on_error must be 'raise' or 'skip'")
+        
+        paths = OktaWorkbookLoader.find_workbooks(directory, pattern)
+        load = OktaWorkbookLoader._load_or_error
+        
+        if processes is None:
+            results = (load(path) for path in paths)
+            for form_data, error in results:
+                if error is None:
+                    yield form_data
+                elif on_error == 'raise':
+                    raise ValueError(error)
+            return
+        
+        workers = processes or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for form_data, error in bounded_map(executor, load, paths, 4 * workers):
+                if error is None:
+                    yield form_data
+                elif on_error == 'raise':
+                    raise ValueError(error)
+    
+    @staticmethod
+    def find_workbooks(directory, pattern='*.xlsx'):
+        """Sorted workbook paths in a directory, skipping Excel lock files"""
+        paths = glob.iglob(os.path.join(directory, pattern))
+        return sorted(path for path in paths if not os.path.basename(path).startswith('~$'))
+    
+    @staticmethod
+    def _load_or_error(path):
+        """Process-pool friendly wrapper that returns (form_data, error message)"""
+        try:
+            return OktaWorkbookLoader.load_form_data(path), None
+        except Exception as exc:
+            return None, f"{path}: {exc}"
+    
+    @staticmethod
+    def _normalize_label(label):
+        """Normalize a 'Field Name' cell (case and stray whitespace vary across files)"""
+        return ' '.join(str(label).split()).lower()
+    
+    @staticmethod
+    def _convert_value(value, kind):
+        """Convert a 'Value' cell to the type the estimator expects"""
+        if value is None or (isinstance(value, str) and not value.strip()):
+            return None
+        
+        if kind == 'number':
+            if isinstance(value, (int, float)):
+                return int(value) if float(value).is_integer() else value
+            text = str(value).replace(',', '').replace('$', '').strip()
+            try:
+                number = float(text)
+            except ValueError:
+                return None
+            return int(number) if number.is_integer() else number
+        
+        if kind == 'list':
+            items = [item.strip() for item in str(value).split(',')]
+            return [item for item in items if item and item != 'None']
+        
+        return str(value).strip()
+
+
+def bounded_map(executor, fn, iterable, window):
+    """
+    Ordered executor.map() that keeps at most `window` tasks in flight
+    Results are yielded in input order as soon as the head task finishes.
+    """
+    pending = deque()
+    for item in iterable:
+        pending.append(executor.submit(fn, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
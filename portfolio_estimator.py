@@ -0,0 +1,247 @@
+"""
+Portfolio Estimator for OKTA to Entra ID Migration Calculator
+Combines the estimates of many tenants (e.g. subsidiaries) into one migration
+programme: fixed costs are charged once and shared, variable effort and
+services get a learning-curve discount, and every tenant gets an allocation
+"""
+
+from math import log2
+
+from estimation_modules import EstimationModules
+from rate_card import RateCards
+
+# Each doubling of the number of tenants migrated cuts variable effort and services to this share
+DEFAULT_LEARNING_RATE = 0.95
+
+# Bases for splitting the shared fixed costs across tenants
+ALLOCATION_BASES = ('variable_cost', 'users', 'equal')
+
+# Running totals kept per portfolio; each tenant contributes one value to each
+TOTAL_FIELDS = (
+    'tenants', 'users', 'apps', 'licensing', 'infrastructure_variable', 'services_variable',
+    'effort_variable', 'standalone_total', 'standalone_support', 'variable_cost'
+)
+
+
+class PortfolioEstimator:
+    """
+    Shared-cost portfolio of tenant estimates
+    add() and remove() estimate or drop one tenant and adjust the running
+    totals (plus small counters for the maxima), so estimate() costs O(1)
+    however many tenants are in the portfolio. The rate card's base project
+    hours, base services, base infrastructure and monitoring are charged once
+    (base hours and services at the highest effort / services multiplier of
+    any tenant, monitoring at the tier of the combined user count). Each
+    tenant's variable effort and services keep its own multipliers and are scaled by
+    the learning-curve factor mean(k ** log2(learning_rate)) over k = 1..N.
+    Per-tenant allocations (O(N)) split the shared costs by allocation basis.
+    The combined timeline assumes the effort is spread over `streams` parallel
+    migration teams.
+    """
+    
+    def __init__(self, rate_card=None, learning_rate=DEFAULT_LEARNING_RATE, allocation='variable_cost', streams=1):
+        if not 0 < learning_rate <= 1:
+            raise ValueError('learning_rate must be in (0, 1]')
+        if streams < 1:
+            raise ValueError('streams must be at least 1')
+        if allocation not in ALLOCATION_BASES:
+            raise ValueError(f"Unknown allocation basis '{allocation}', expected one of {', '.join(ALLOCATION_BASES)}")
+        self.rates = RateCards.get(rate_card)
+        self.learning_rate = learning_rate
+        self.allocation = allocation
+        self.streams = streams
+        self.tenants = {}
+        self.totals = dict.fromkeys(TOTAL_FIELDS, 0)
+        self.complexity_scores = {}
+        self.timeline_adders = {}
+        self.effort_multipliers = {}
+        self.services_multipliers = {}
+        self._learning_sums = [0.0]
+    
+    def add(self, tenant_id, form_data):
+        """Add (or replace) one tenant; returns its standalone figures"""
+        if tenant_id in self.tenants:
+            self.remove(tenant_id)
+        figures = PortfolioEstimator._tenant_figures(form_data, self.rates)
+        self.tenants[tenant_id] = figures
+        self._apply(figures, 1)
+        return figures
+    
+    def remove(self, tenant_id):
+        """Remove one tenant (KeyError when unknown); returns its standalone figures"""
+        figures = self.tenants.pop(tenant_id)
+        self._apply(figures, -1)
+        return figures
+    
+    def __len__(self):
+        return len(self.tenants)
+    
+    def __contains__(self, tenant_id):
+        return tenant_id in self.tenants
+    
+    def _apply(self, figures, sign):
+        for field in TOTAL_FIELDS:
+            self.totals[field] += sign * figures[field]
+        for counter, key in ((self.complexity_scores, figures['complexity_score']),
+                             (self.timeline_adders, figures['timeline_adders']),
+                             (self.effort_multipliers, figures['effort_multiplier']),
+                             (self.services_multipliers, figures['services_multiplier'])):
+            counter[key] = counter.get(key, 0) + sign
+            if not counter[key]:
+                del counter[key]
+    
+    @staticmethod
+    def _tenant_figures(data, rates):
+        """Standalone estimate of one tenant split into its fixed and variable parts"""
+        c = rates.coefficients
+        standalone = EstimationModules._calculate_comprehensive_estimate(data, rates)
+        costs = standalone['cost_breakdown']
+        summary = standalone['executive_summary']
+        
+        effort_multiplier = 1.0
+        for step in rates.effort_multipliers:
+            if data.get(step.field, 0) > step.above:
+                effort_multiplier += step.add
+        services_multiplier = 1.0
+        for step in rates.services_multipliers:
+            if data.get(step.field, 0) > step.above:
+                services_multiplier += step.add
+        timeline_adders = 0
+        for step in rates.timeline_adders:
+            if data.get(step.field, 0) > step.above:
+                timeline_adders += step.add
+        
+        monitoring = c.monitoring_large if data.get('num_employees', 0) > c.monitoring_employees_above \
+            else c.monitoring_small
+        effort_variable = EstimationModules._calculate_migration_effort(data, rates) - c.base_hours * effort_multiplier
+        services_variable = costs['professional_services'] - c.base_services * services_multiplier
+        infrastructure_variable = costs['infrastructure'] - c.base_infrastructure - monitoring
+        return {
+            'tenants': 1,
+            'users': summary['total_users'],
+            'apps': summary['total_apps'],
+            'licensing': costs['licensing'],
+            'infrastructure_variable': infrastructure_variable,
+            'services_variable': services_variable,
+            'effort_variable': effort_variable,
+            'standalone_total': costs['total'],
+            'standalone_support': costs['support'],
+            'variable_cost': costs['licensing'] + infrastructure_variable + services_variable,
+            'complexity_score': summary['complexity_score'],
+            'timeline_adders': timeline_adders,
+            'effort_multiplier': effort_multiplier,
+            'services_multiplier': services_multiplier,
+            'standalone': standalone
+        }
+    
+    def learning_factor(self, tenants=None):
+        """Mean learning-curve multiplier over the first N tenants (1.0 for one tenant)"""
+        tenants = len(self.tenants) if tenants is None else tenants
+        if tenants <= 0:
+            return 1.0
+        exponent = log2(self.learning_rate)
+        sums = self._learning_sums
+        while len(sums) <= tenants:
+            sums.append(sums[-1] + len(sums) ** exponent)
+        return sums[tenants] / tenants
+    
+    def shared_costs(self):
+        """Fixed costs charged once for the whole portfolio, at the highest tenant multipliers"""
+        c = self.rates.coefficients
+        if not self.tenants:
+            return {'base_hours': 0, 'base_services': 0, 'base_infrastructure': 0, 'monitoring': 0}
+        monitoring = c.monitoring_large if self.totals['users'] > c.monitoring_employees_above \
+            else c.monitoring_small
+        return {
+            'base_hours': c.base_hours * max(self.effort_multipliers),
+            'base_services': c.base_services * max(self.services_multipliers),
+            'base_infrastructure': c.base_infrastructure,
+            'monitoring': monitoring
+        }
+    
+    def estimate(self):
+        """Combined programme estimate in O(1): summary, effort, cost breakdown, sharing and savings"""
+        c = self.rates.coefficients
+        totals = self.totals
+        shared = self.shared_costs()
+        factor = self.learning_factor()
+        
+        effort_hours = shared['base_hours'] + totals['effort_variable'] * factor
+        effort_days = effort_hours / c.hours_per_day
+        licensing = totals['licensing']
+        infrastructure = shared['base_infrastructure'] + shared['monitoring'] + totals['infrastructure_variable']
+        professional_services = shared['base_services'] + totals['services_variable'] * factor
+        support = professional_services * c.support_rate
+        total_cost = licensing + infrastructure + professional_services
+        
+        timeline_weeks = 0
+        if self.tenants:
+            effort_weeks = effort_days / c.days_per_week / self.streams
+            weeks = c.base_weeks + effort_weeks * c.effort_factor + max(self.timeline_adders)
+            timeline_weeks = max(int(weeks), c.min_weeks)
+        standalone_total = totals['standalone_total']
+        return {
+            'executive_summary': {
+                'total_cost': round(total_cost, 2),
+                'timeline_weeks': timeline_weeks,
+                'complexity_score': max(self.complexity_scores, default=0),
+                'total_apps': totals['apps'],
+                'total_users': totals['users'],
+                'tenants': totals['tenants']
+            },
+            'migration_effort': {
+                'hours': int(effort_hours),
+                'days': round(effort_days, 2)
+            },
+            'cost_breakdown': {
+                'licensing': round(licensing, 2),
+                'professional_services': round(professional_services, 2),
+                'infrastructure': round(infrastructure, 2),
+                'support': round(support, 2),
+                'total': round(total_cost, 2)
+            },
+            'shared_costs': shared,
+            'economies_of_scale': {
+                'learning_rate': self.learning_rate,
+                'factor': round(factor, 4)
+            },
+            'standalone_total': round(standalone_total, 2),
+            'savings': round(standalone_total - total_cost, 2),
+            'rate_card': self.rates.card_id
+        }
+    
+    def allocations(self):
+        """
+        Per-tenant share of the combined estimate
+        Variable costs stay with their tenant (services and effort after the
+        learning-curve factor); shared costs are split by the allocation basis.
+        """
+        shared = self.shared_costs()
+        factor = self.learning_factor()
+        basis_total = {
+            'variable_cost': self.totals['variable_cost'],
+            'users': self.totals['users'],
+            'equal': self.totals['tenants']
+        }[self.allocation]
+        support_rate = self.rates.coefficients.support_rate
+        
+        allocations = {}
+        for tenant_id, figures in self.tenants.items():
+            basis = figures['tenants'] if self.allocation == 'equal' else figures[self.allocation]
+            share = basis / basis_total if basis_total else 1 / len(self.tenants)
+            services = figures['services_variable'] * factor + shared['base_services'] * share
+            infrastructure = figures['infrastructure_variable'] + (
+                shared['base_infrastructure'] + shared['monitoring']) * share
+            total = figures['licensing'] + infrastructure + services
+            allocations[tenant_id] = {
+                'share': round(share, 6),
+                'effort_hours': round(figures['effort_variable'] * factor + shared['base_hours'] * share, 2),
+                'licensing': figures['licensing'],
+                'infrastructure': round(infrastructure, 2),
+                'professional_services': round(services, 2),
+                'support': round(services * support_rate, 2),
+                'total': round(total, 2),
+                'standalone_total': figures['standalone_total'],
+                'savings': round(figures['standalone_total'] - total, 2)
+            }
+        return allocations
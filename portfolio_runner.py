@@ -0,0 +1,217 @@
+"""
+Parallel Portfolio Runner for OKTA to Entra ID Migration Calculator
+Runs one of the estimation modules over a large input set across all cores
+and writes the results back in input order
+
+Usage:
+    python portfolio_runner.py manual tenants.jsonl -o estimates.jsonl
+    python portfolio_runner.py manual tenants.csv
+    python portfolio_runner.py manual ./workbooks/ --processes 8
+    python portfolio_runner.py manual tenants.jsonl --rate-card rate_cards/partner.yaml
+    python portfolio_runner.py scenario scenarios.jsonl
+    python portfolio_runner.py api api_payloads.jsonl
+"""
+
+import os
+import sys
+import csv
+import json
+import math
+import argparse
+from functools import partial
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor
+
+from estimation_modules import EstimationModules, PREDEFINED_SCENARIOS, CALCULATOR_INPUT_FIELDS
+from input_schema import InputSchema
+from okta_workbook_loader import OktaWorkbookLoader, FIELD_MAP, bounded_map
+from rate_card import RateCards
+
+MODES = ('manual', 'scenario', 'api')
+
+# form_data keys holding comma-separated lists in CSV cells, as in the input workbooks
+LIST_FIELDS = frozenset(key for key, kind in FIELD_MAP.values() if kind == 'list')
+
+# Calculator counts, coerced like input_schema
+COUNT_FIELDS = frozenset(CALCULATOR_INPUT_FIELDS)
+
+# Other numeric form_data keys (e.g. annual_okta_cost), which may be fractional
+NUMBER_FIELDS = frozenset(key for key, kind in FIELD_MAP.values() if kind == 'number') - COUNT_FIELDS
+
+
+class PortfolioRunner:
+    
+    @staticmethod
+    def run(items, mode='manual', processes=None, chunksize=64, rate_card=None):
+        """
+        Estimate every item and yield one record per item in input order
+        Items are form_data dicts (manual), scenario keys or {'scenario': key}
+        dicts (scenario), api_data dicts (api), or workbook paths (manual).
+        Records are {'index', 'status': 'ok', 'input', 'result'} or
+        {'index', 'status': 'error', 'error'}; a failing item never aborts the run.
+        'input' is the form_data the estimate was computed from (None when unknown),
+        so report_exporter can fill in the effort and cost breakdowns.
+        processes=1 runs in-process; None uses all cores.
+        rate_card is a loaded card name / name@version, a CompiledRateCard or a
+        .json/.yaml rate card path; worker processes load the same card.
+        """
+        if mode not in MODES:
+            raise ValueError(f"Unknown mode '{mode}', expected one of {', '.join(MODES)}")
+        if isinstance(rate_card, str) and os.path.isfile(rate_card):
+            rates = RateCards.load(rate_card)
+        else:
+            rates = RateCards.get(rate_card)
+        
+        chunks = PortfolioRunner._chunks(items, chunksize)
+        
+        if processes == 1:
+            for chunk in chunks:
+                yield from PortfolioRunner._run_chunk(mode, rates.card_id, chunk)
+            return
+        
+        workers = processes or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers, initializer=RateCards.load,
+                                 initargs=(RateCards.to_dict(rates),)) as executor:
+            run_chunk = partial(PortfolioRunner._run_chunk, mode, rates.card_id)
+            for records in bounded_map(executor, run_chunk, chunks, 2 * workers):
+                yield from records
+    
+    @staticmethod
+    def run_to_file(items, output, mode='manual', processes=None, chunksize=64, rate_card=None):
+        """
+        Stream run() results as NDJSON to a path or open file
+        Returns a summary dict with ok/error counts.
+        """
+        summary = {'total': 0, 'ok': 0, 'errors': 0}
+        handle = open(output, 'w', encoding='utf-8') if isinstance(output, str) else output
+        try:
+            for record in PortfolioRunner.run(items, mode, processes, chunksize, rate_card):
+                handle.write(PortfolioRunner._serialize(record))
+                summary['total'] += 1
+                summary['ok' if record['status'] == 'ok' else 'errors'] += 1
+        finally:
+            if handle is not output:
+                handle.close()
+        return summary
+    
+    @staticmethod
+    def _serialize(record):
+        """One NDJSON line for a run() record"""
+        return json.dumps(record, default=str) + '\n'
+    
+    @staticmethod
+    def read_inputs(source):
+        """
+        Lazily read an input set: a .jsonl file, a .csv file or a workbook directory
+        Workbook directories yield paths so parsing happens in the worker processes.
+        """
+        if os.path.isdir(source):
+            return iter(OktaWorkbookLoader.find_workbooks(source))
+        if source.lower().endswith('.csv'):
+            return PortfolioRunner._read_csv(source)
+        return PortfolioRunner._read_jsonl(source)
+    
+    @staticmethod
+    def _run_chunk(mode, rate_card, chunk):
+        """Worker entry point: estimate one chunk of (index, item) pairs"""
+        records = []
+        for index, item in chunk:
+            try:
+                inputs, result = PortfolioRunner._estimate(mode, item, rate_card)
+                if result is None:
+                    raise ValueError('no estimate produced for this input')
+                records.append({'index': index, 'status': 'ok', 'input': inputs, 'result': result})
+            except Exception as exc:
+                records.append({'index': index, 'status': 'error', 'error': f'{type(exc).__name__}: {exc}'})
+        return records
+    
+    @staticmethod
+    def _estimate(mode, item, rate_card=None):
+        """Dispatch one item to its estimation module; returns (form_data, result)"""
+        if mode == 'scenario':
+            scenario_type = item.get('scenario') if isinstance(item, dict) else item
+            result = EstimationModules.scenario_based_estimation(scenario_type, rate_card)
+            scenario = PREDEFINED_SCENARIOS.get(scenario_type)
+            library = EstimationModules.scenario_library
+            if scenario is None and library is not None and scenario_type in library:
+                scenario = library.scenarios[scenario_type]
+            return (scenario['data'] if scenario else None), result
+        
+        if mode == 'api':
+            inputs = EstimationModules._convert_api_data(item) if item else None
+            return inputs, EstimationModules.okta_api_estimation(item, rate_card)
+        
+        if isinstance(item, str):
+            item = OktaWorkbookLoader.load_form_data(item)
+        return item, EstimationModules.manual_input_estimation(item, rate_card)
+    
+    @staticmethod
+    def _chunks(items, chunksize):
+        """Group items into lists of (index, item) work units"""
+        indexed = enumerate(items)
+        while True:
+            chunk = list(islice(indexed, chunksize))
+            if not chunk:
+                return
+            yield chunk
+    
+    @staticmethod
+    def _read_jsonl(path):
+        """Yield one parsed object per non-empty JSONL line"""
+        with open(path, encoding='utf-8') as handle:
+            for line in handle:
+                if line.strip():
+                    yield json.loads(line)
+    
+    @staticmethod
+    def _read_csv(path):
+        """Yield one form_data dict per CSV row, with numeric and list cells converted"""
+        with open(path, newline='', encoding='utf-8-sig') as handle:
+            for row in csv.DictReader(handle):
+                yield {
+                    key: PortfolioRunner._csv_value(key, value)
+                    for key, value in row.items()
+                    if key and value not in (None, '')
+                }
+    
+    @staticmethod
+    def _csv_value(key, value):
+        """
+        Convert a CSV cell like the input workbooks and input_schema do
+        Calculator counts go through InputSchema.count_value ("1,200" -> 1200),
+        other numeric fields through the workbook number conversion and
+        LIST_FIELDS cells become lists. Cells that cannot be read as their
+        field's type stay as text, so the record fails on its own.
+        """
+        if key in LIST_FIELDS:
+            return OktaWorkbookLoader._convert_value(value, 'list')
+        if key in COUNT_FIELDS:
+            number = InputSchema.count_value(value)
+            return value if number is None else number
+        if key in NUMBER_FIELDS:
+            number = OktaWorkbookLoader._convert_value(value, 'number')
+            return value if number is None or not math.isfinite(number) else number
+        return value
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run an estimation module over a portfolio of inputs')
+    parser.add_argument('mode', choices=MODES, help='estimation module to run')
+    parser.add_argument('source', help='.jsonl file, .csv file or directory of input workbooks')
+    parser.add_argument('-o', '--output', help='NDJSON output file (default: stdout)')
+    parser.add_argument('--processes', type=int, default=None, help='worker processes (default: all cores)')
+    parser.add_argument('--chunksize', type=int, default=64, help='items per work unit (default: 64)')
+    parser.add_argument('--rate-card', help='rate card name or .json/.yaml path (default: the default card)')
+    args = parser.parse_args(argv)
+    
+    items = PortfolioRunner.read_inputs(args.source)
+    output = args.output or sys.stdout
+    summary = PortfolioRunner.run_to_file(items, output, args.mode, args.processes, args.chunksize,
+                                          args.rate_card)
+    
+    print(f"{summary['total']} estimates: {summary['ok']} ok, {summary['errors']} failed", file=sys.stderr)
+    return 1 if summary['errors'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,422 @@
+"""
+Rate Calibration for OKTA to Entra ID Migration Calculator
+Fits the effort hours, infrastructure and professional services coefficients
+and the step multipliers of a rate card to historical migrations (input
+profile, actual hours, actual cost), cross-validates the fit and emits a rate
+card the estimator can load directly
+
+Usage:
+    python rate_calibration.py actuals.csv -o rate_cards/calibrated.json
+    python rate_calibration.py actuals.jsonl -o calibrated.yaml --name acme --version 2024.1 --folds 10
+"""
+
+import sys
+import json
+import argparse
+
+from estimation_modules import EstimationModules, CALCULATOR_INPUT_FIELDS
+from rate_card import RateCards, COEFFICIENT_LAYOUT, EFFORT_COMPONENTS
+
+# Target columns of a historical record; either may be missing for a record
+ACTUAL_FIELDS = ('actual_hours', 'actual_cost')
+
+# Infrastructure cost components: (input fields, coefficient); monitoring is fitted separately
+INFRASTRUCTURE_COMPONENTS = (
+    ((), 'base_infrastructure'),
+    (('okta_ad_agents_count', 'okta_radius_agents_count'), 'agent_infrastructure'),
+    (('federated_domains_count',), 'domain_infrastructure')
+)
+
+# Professional services components before the services multiplier: (input fields, coefficient)
+SERVICES_COMPONENTS = (
+    ((), 'base_services'),
+    (('saml_apps_count', 'bookmark_apps_count', 'swa_apps_count', 'oidc_apps_count'), 'app_services'),
+    (('okta_policies_count',), 'policy_services'),
+    (('workflow_automations_count',), 'workflow_services'),
+    (('num_it_staff',), 'training_per_staff')
+)
+
+LOSSES = ('squared', 'huber')
+
+# Huber tuning constant (95% efficiency under normal errors), applied to the MAD scale of the residuals
+HUBER_K = 1.345
+
+
+class RateCalibrator:
+    """
+    Least-squares calibration of a rate card against historical actuals
+    Effort is hours = (base + sum(items * hours_per_item)) * effort_multiplier
+    and cost = licensing + infrastructure + services * services_multiplier, so
+    each model is fitted by alternating two linear solves: the per-item
+    coefficients with the multipliers fixed, then the multiplier steps with
+    the coefficients fixed. Every solve is a weighted ridge regression pulled
+    towards the base card (which keeps collinear terms such as the base setup
+    and monitoring costs identified), with Huber reweighting when
+    loss='huber' and non-negative coefficients so estimates stay monotone in
+    every input. Licensing is vendor list price and is taken from the base
+    card; step thresholds, complexity, timeline and phases are kept as is.
+    """
+    
+    @staticmethod
+    def load_actuals(source):
+        """
+        Historical records as float64 columns (inputs missing -> 0, actuals missing -> NaN)
+        source is a DataFrame, a .csv / .jsonl / .ndjson path, or an iterable of
+        dicts; a record's inputs may be flat or nested under 'form_data'.
+        """
+        import numpy as np
+        import pandas as pd
+        
+        if isinstance(source, str):
+            if source.lower().endswith('.csv'):
+                source = pd.read_csv(source)
+            else:
+                from portfolio_runner import PortfolioRunner
+                
+                source = PortfolioRunner._read_jsonl(source)
+        if not isinstance(source, pd.DataFrame):
+            source = pd.DataFrame([
+                dict(record['form_data'], **{key: record[key] for key in ACTUAL_FIELDS if key in record})
+                if 'form_data' in record else record
+                for record in source
+            ])
+        
+        columns = {key: EstimationModules._batch_column(source, key) for key in CALCULATOR_INPUT_FIELDS}
+        for key in ACTUAL_FIELDS:
+            columns[key] = (pd.to_numeric(source[key]).to_numpy(dtype=np.float64) if key in source
+                            else np.full(len(source), np.nan))
+        return columns
+    
+    @staticmethod
+    def fit(actuals, base_card=None, loss='huber', prior_strength=0.01, iterations=50,
+            name='calibrated', version='1.0'):
+        """
+        Fit a rate card to historical actuals (see load_actuals for the sources)
+        Returns {'card': rate card dict, 'rate_card': CompiledRateCard (not
+        registered), 'records': {'hours', 'cost'} record counts, 'metrics':
+        in-sample error metrics of the fitted and the base card}.
+        """
+        import numpy as np
+        
+        if loss not in LOSSES:
+            raise ValueError(f"Unknown loss '{loss}', expected one of {', '.join(LOSSES)}")
+        columns = actuals if isinstance(actuals, dict) else RateCalibrator.load_actuals(actuals)
+        base = RateCards.get(base_card)
+        card = RateCards.to_dict(base)
+        card['name'], card['version'] = name, str(version)
+        options = {'loss': loss, 'strength': prior_strength, 'iterations': iterations}
+        
+        records = {}
+        for model, target, fit_model in (('hours', 'actual_hours', RateCalibrator._fit_effort),
+                                         ('cost', 'actual_cost', RateCalibrator._fit_cost)):
+            rows = np.isfinite(columns[target])
+            records[model] = int(rows.sum())
+            if records[model]:
+                subset = {key: values[rows] for key, values in columns.items()}
+                fit_model(subset, subset[target], base, card, options)
+        
+        card['description'] = (f"Calibrated from {records['hours']} actual-hours and {records['cost']} "
+                               f"actual-cost records against {base.card_id} ({loss} loss)")
+        rates = RateCards.compile(card)
+        return {
+            'card': card,
+            'rate_card': rates,
+            'records': records,
+            'metrics': {
+                'calibrated': RateCalibrator.evaluate(columns, rates),
+                'baseline': RateCalibrator.evaluate(columns, base)
+            }
+        }
+    
+    @staticmethod
+    def cross_validate(actuals, folds=5, seed=0, base_card=None, **fit_options):
+        """
+        k-fold cross-validation of fit()
+        Returns out-of-fold metrics per target for the fitted cards (pooled over
+        all folds) and the base card, plus the metrics of every fold.
+        """
+        import numpy as np
+        
+        columns = actuals if isinstance(actuals, dict) else RateCalibrator.load_actuals(actuals)
+        count = len(columns['actual_hours'])
+        if not 2 <= folds <= count:
+            raise ValueError(f'folds must be between 2 and the number of records ({count})')
+        fold_of = np.random.default_rng(seed).permutation(count) % folds
+        
+        predicted = {field: np.full(count, np.nan) for field in ACTUAL_FIELDS}
+        per_fold = []
+        for fold in range(folds):
+            test = fold_of == fold
+            train = {key: values[~test] for key, values in columns.items()}
+            held_out = {key: values[test] for key, values in columns.items()}
+            rates = RateCalibrator.fit(train, base_card, **fit_options)['rate_card']
+            outputs = RateCalibrator._predict(held_out, rates)
+            for field in ACTUAL_FIELDS:
+                predicted[field][test] = outputs[field]
+            per_fold.append(RateCalibrator._metrics(held_out, outputs))
+        
+        return {
+            'folds': folds,
+            'calibrated': RateCalibrator._metrics(columns, predicted),
+            'baseline': RateCalibrator.evaluate(columns, base_card),
+            'per_fold': per_fold
+        }
+    
+    @staticmethod
+    def calibrate(source, folds=5, register=True, **fit_options):
+        """
+        Cross-validate, fit on every record and (by default) register the card
+        Returns the fit() result with a 'cross_validation' entry (None when folds is 0).
+        """
+        columns = RateCalibrator.load_actuals(source)
+        cross_validation = RateCalibrator.cross_validate(columns, folds, **fit_options) if folds else None
+        fitted = RateCalibrator.fit(columns, **fit_options)
+        if register:
+            fitted['rate_card'] = RateCards.load(fitted['card'])
+        fitted['cross_validation'] = cross_validation
+        return fitted
+    
+    @staticmethod
+    def evaluate(actuals, rate_card=None):
+        """Error metrics of a rate card's estimates against historical actuals"""
+        columns = actuals if isinstance(actuals, dict) else RateCalibrator.load_actuals(actuals)
+        return RateCalibrator._metrics(columns, RateCalibrator._predict(columns, rate_card))
+    
+    @staticmethod
+    def save(card, path):
+        """Write a rate card dict as JSON, or YAML for .yaml/.yml paths"""
+        with open(path, 'w', encoding='utf-8') as handle:
+            if path.lower().endswith(('.yaml', '.yml')):
+                import yaml
+                
+                yaml.safe_dump(card, handle, sort_keys=False)
+            else:
+                json.dump(card, handle, indent=4)
+                handle.write('\n')
+    
+    @staticmethod
+    def _predict(columns, rate_card):
+        """Estimated hours and cost for every record, keyed like ACTUAL_FIELDS"""
+        outputs = EstimationModules._estimate_columns(columns, rate_card)
+        return {'actual_hours': outputs['effort_hours'], 'actual_cost': outputs['total_cost']}
+    
+    @staticmethod
+    def _metrics(columns, predicted):
+        """MAE, RMSE, MAPE (%), bias and R^2 per target over the records that have the actual"""
+        import numpy as np
+        
+        metrics = {}
+        for field, model in zip(ACTUAL_FIELDS, ('hours', 'cost')):
+            rows = np.isfinite(columns[field])
+            actual = columns[field][rows]
+            if not len(actual):
+                metrics[model] = None
+                continue
+            error = predicted[field][rows] - actual
+            spread = ((actual - actual.mean()) ** 2).sum()
+            nonzero = actual != 0
+            metrics[model] = {
+                'records': int(len(actual)),
+                'mae': round(float(np.abs(error).mean()), 2),
+                'rmse': round(float(np.sqrt((error ** 2).mean())), 2),
+                'mape': round(float(np.abs(error[nonzero] / actual[nonzero]).mean() * 100), 2)
+                        if nonzero.any() else None,
+                'bias': round(float(error.mean()), 2),
+                'r2': round(float(1 - (error ** 2).sum() / spread), 4) if spread else None
+            }
+        return metrics
+    
+    @staticmethod
+    def _fit_effort(columns, hours, base, card, options):
+        """Fit the hours per item and the effort multiplier steps into card['effort']"""
+        import numpy as np
+        
+        c = base.coefficients
+        features = RateCalibrator._features(columns, [fields for _, fields, _ in EFFORT_COMPONENTS], len(hours))
+        coefficients = np.array([getattr(c, name) for _, _, name in EFFORT_COMPONENTS], dtype=np.float64)
+        steps = base.effort_multipliers
+        indicators = RateCalibrator._indicators(columns, steps, len(hours))
+        adds = np.array([step.add for step in steps], dtype=np.float64)
+        
+        coefficients, adds = RateCalibrator._fit_multiplied(
+            features, coefficients, indicators, adds, np.zeros(len(hours)), hours, options)
+        for (_, _, name), value in zip(EFFORT_COMPONENTS, coefficients):
+            RateCalibrator._set_coefficient(card, name, value)
+        card['effort']['multipliers'] = RateCalibrator._steps(steps, adds)
+    
+    @staticmethod
+    def _fit_cost(columns, cost, base, card, options):
+        """Fit infrastructure, services and the services multiplier steps (licensing stays at list price)"""
+        import numpy as np
+        
+        c = base.coefficients
+        count = len(cost)
+        # Monitoring is fitted as the small-tenant cost plus a non-negative step for large tenants,
+        # so monitoring_large never drops below monitoring_small
+        large = (columns['num_employees'] > c.monitoring_employees_above).astype(np.float64)
+        infrastructure = np.column_stack([
+            RateCalibrator._features(columns, [fields for fields, _ in INFRASTRUCTURE_COMPONENTS], count),
+            np.ones(count), large
+        ])
+        services = RateCalibrator._features(columns, [fields for fields, _ in SERVICES_COMPONENTS], count)
+        prior = [getattr(c, name) for _, name in INFRASTRUCTURE_COMPONENTS + SERVICES_COMPONENTS]
+        prior[len(INFRASTRUCTURE_COMPONENTS):len(INFRASTRUCTURE_COMPONENTS)] = [
+            c.monitoring_small, c.monitoring_large - c.monitoring_small]
+        steps = base.services_multipliers
+        indicators = RateCalibrator._indicators(columns, steps, count)
+        adds = np.array([step.add for step in steps], dtype=np.float64)
+        licensing = EstimationModules._estimate_columns(columns, base)['licensing']
+        
+        # The services multiplier scales the services columns only
+        features = np.column_stack([infrastructure, services])
+        multiplied = np.arange(features.shape[1]) >= infrastructure.shape[1]
+        coefficients, adds = RateCalibrator._fit_multiplied(
+            features, np.array(prior, dtype=np.float64), indicators, adds, licensing, cost, options, multiplied)
+        
+        infrastructure_fit = list(coefficients[:infrastructure.shape[1]])
+        monitoring_small, monitoring_step = infrastructure_fit[-2:]
+        for (_, name), value in zip(INFRASTRUCTURE_COMPONENTS, infrastructure_fit):
+            RateCalibrator._set_coefficient(card, name, value)
+        RateCalibrator._set_coefficient(card, 'monitoring_small', monitoring_small)
+        RateCalibrator._set_coefficient(card, 'monitoring_large', monitoring_small + monitoring_step)
+        for (_, name), value in zip(SERVICES_COMPONENTS, coefficients[infrastructure.shape[1]:]):
+            RateCalibrator._set_coefficient(card, name, value)
+        card['professional_services']['multipliers'] = RateCalibrator._steps(steps, adds)
+    
+    @staticmethod
+    def _fit_multiplied(features, coefficients, indicators, adds, offset, target, options, multiplied=None):
+        """
+        Alternating fit of target ~ offset + features @ coefficients scaled by
+        (1 + indicators @ adds) on the `multiplied` columns (all by default)
+        Each round solves the coefficients, then the adds, then refreshes the
+        Huber weights from the full model's residuals. Returns the fitted
+        (coefficients, adds); both start from and are pulled towards the base card.
+        """
+        import numpy as np
+        
+        multiplied = np.ones(features.shape[1], dtype=bool) if multiplied is None else multiplied
+        prior_coefficients, prior_adds = coefficients.copy(), adds.copy()
+        weights = np.ones(len(target))
+        strength = options['strength']
+        for _ in range(options['iterations']):
+            previous = np.concatenate([coefficients, adds])
+            scale = 1.0 + indicators @ adds
+            design = np.where(multiplied, features * scale[:, None], features)
+            coefficients = RateCalibrator._ridge(design, target - offset, prior_coefficients, strength, weights)
+            
+            scaled_part = features[:, multiplied] @ coefficients[multiplied]
+            unscaled = offset + features[:, ~multiplied] @ coefficients[~multiplied] + scaled_part
+            if len(adds):
+                adds = RateCalibrator._ridge(indicators * scaled_part[:, None], target - unscaled, prior_adds,
+                                             strength, weights)
+            if options['loss'] == 'huber':
+                weights = RateCalibrator._huber_weights(target - unscaled - scaled_part * (indicators @ adds))
+            current = np.concatenate([coefficients, adds])
+            if np.allclose(current, previous, rtol=1e-6, atol=1e-9):
+                break
+        return coefficients, adds
+    
+    @staticmethod
+    def _huber_weights(residuals):
+        """IRLS weights min(1, k * scale / |r|) with scale the normal-consistent MAD of the residuals"""
+        import numpy as np
+        
+        scale = 1.4826 * np.median(np.abs(residuals - np.median(residuals)))
+        if not scale:
+            return np.ones(len(residuals))
+        return np.minimum(1.0, HUBER_K * scale / np.maximum(np.abs(residuals), 1e-12))
+    
+    @staticmethod
+    def _ridge(design, target, prior, strength, weights):
+        """
+        argmin sum(w * (target - design @ b) ** 2) + strength * sum(d * (b - prior) ** 2), b >= 0
+        d is the weighted column energy, so the pull is scale free; columns that
+        go negative are clamped to 0 and the rest re-solved (active set).
+        """
+        import numpy as np
+        
+        weighted = design * weights[:, None]
+        gram = weighted.T @ design
+        moment = weighted.T @ target
+        energy = np.diag(gram).copy()
+        energy[energy <= 0] = 1.0
+        gram = gram + np.diag(strength * energy)
+        moment = moment + strength * energy * prior
+        
+        free = np.ones(len(prior), dtype=bool)
+        coefficients = np.zeros(len(prior))
+        while free.any():
+            coefficients[:] = 0.0
+            coefficients[free] = np.linalg.solve(gram[np.ix_(free, free)], moment[free])
+            negative = coefficients < 0
+            if not negative.any():
+                break
+            free &= ~negative
+        return coefficients
+    
+    @staticmethod
+    def _features(columns, components, count):
+        """One column per component: the sum of its input fields, or a constant 1 for the base term"""
+        import numpy as np
+        
+        return np.column_stack([
+            sum(columns[field] for field in fields) if fields else np.ones(count)
+            for fields in components
+        ])
+    
+    @staticmethod
+    def _indicators(columns, steps, count):
+        """One 0/1 column per threshold step: data[field] > above"""
+        import numpy as np
+        
+        if not steps:
+            return np.zeros((count, 0))
+        return np.column_stack([(columns[step.field] > step.above).astype(np.float64) for step in steps])
+    
+    @staticmethod
+    def _steps(steps, adds):
+        return [{'field': step.field, 'above': step.above, 'add': round(float(add), 4)}
+                for step, add in zip(steps, adds)]
+    
+    @staticmethod
+    def _set_coefficient(card, name, value):
+        """Write one fitted coefficient into the card dict at its COEFFICIENT_LAYOUT path"""
+        for coefficient, section, path in COEFFICIENT_LAYOUT:
+            if coefficient == name:
+                node = card[section]
+                for part in path[:-1]:
+                    node = node[part]
+                node[path[-1]] = round(float(value), 4)
+                return
+        raise KeyError(name)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Calibrate a rate card against historical migration actuals')
+    parser.add_argument('source', help='.csv or .jsonl records with the calculator inputs, actual_hours, actual_cost')
+    parser.add_argument('-o', '--output', help='rate card file to write (.json, .yaml)')
+    parser.add_argument('--base', help='base rate card file (default: the default card)')
+    parser.add_argument('--name', default='calibrated', help='calibrated card name (default: calibrated)')
+    parser.add_argument('--version', default='1.0', help='calibrated card version (default: 1.0)')
+    parser.add_argument('--loss', choices=LOSSES, default='huber', help='regression loss (default: huber)')
+    parser.add_argument('--prior-strength', type=float, default=0.01,
+                        help='ridge pull towards the base card (default: 0.01)')
+    parser.add_argument('--folds', type=int, default=5, help='cross-validation folds, 0 to skip (default: 5)')
+    args = parser.parse_args(argv)
+    
+    base_card = RateCards.load(args.base) if args.base else None
+    fitted = RateCalibrator.calibrate(args.source, args.folds, register=False, base_card=base_card,
+                                      loss=args.loss, prior_strength=args.prior_strength,
+                                      name=args.name, version=args.version)
+    if args.output:
+        RateCalibrator.save(fitted['card'], args.output)
+    
+    report = {'records': fitted['records'], 'in_sample': fitted['metrics']}
+    if fitted['cross_validation']:
+        report['cross_validation'] = {key: fitted['cross_validation'][key] for key in ('calibrated', 'baseline')}
+    print(json.dumps(report, indent=2), file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,248 @@
+"""
+Declarative Rate Cards for OKTA to Entra ID Migration Calculator
+Loads versioned JSON/YAML rate cards and compiles each one once into a flat
+coefficient tuple plus threshold tables used by the scalar and batch estimators
+"""
+
+import os
+import json
+from collections import namedtuple
+
+RATE_CARD_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'rate_cards')
+DEFAULT_RATE_CARD_PATH = os.path.join(RATE_CARD_DIR, 'default.json')
+
+# Flat coefficient layout: (attribute name, section, path inside the section)
+COEFFICIENT_LAYOUT = (
+    ('base_hours', 'effort', ('base_hours',)),
+    ('hours_per_day', 'effort', ('hours_per_day',)),
+    ('saml_hours', 'effort', ('hours_per_item', 'saml_apps_count')),
+    ('oidc_hours', 'effort', ('hours_per_item', 'oidc_apps_count')),
+    ('swa_hours', 'effort', ('hours_per_item', 'swa_apps_count')),
+    ('bookmark_hours', 'effort', ('hours_per_item', 'bookmark_apps_count')),
+    ('policy_hours', 'effort', ('hours_per_item', 'okta_policies_count')),
+    ('agent_hours', 'effort', ('hours_per_item', 'agents')),
+    ('workflow_hours', 'effort', ('hours_per_item', 'workflow_automations_count')),
+    ('provisioning_hours', 'effort', ('hours_per_item', 'provisioning_enabled_apps')),
+    ('group_hours', 'effort', ('hours_per_item', 'groups_recreate_count')),
+    ('license_months', 'licensing', ('months',)),
+    ('e3_user_month', 'licensing', ('e3_user_month',)),
+    ('p1_user_month', 'licensing', ('p1_user_month',)),
+    ('p1_policies_above', 'licensing', ('p1_policies_above',)),
+    ('base_infrastructure', 'infrastructure', ('base',)),
+    ('agent_infrastructure', 'infrastructure', ('per_agent',)),
+    ('domain_infrastructure', 'infrastructure', ('per_federated_domain',)),
+    ('monitoring_large', 'infrastructure', ('monitoring_large',)),
+    ('monitoring_small', 'infrastructure', ('monitoring_small',)),
+    ('monitoring_employees_above', 'infrastructure', ('monitoring_employees_above',)),
+    ('base_services', 'professional_services', ('base',)),
+    ('app_services', 'professional_services', ('per_app',)),
+    ('policy_services', 'professional_services', ('per_policy',)),
+    ('workflow_services', 'professional_services', ('per_workflow',)),
+    ('training_per_staff', 'professional_services', ('training_per_it_staff',)),
+    ('support_rate', 'professional_services', ('support_rate',)),
+    ('max_score', 'complexity', ('max_score',)),
+    ('app_points', 'complexity', ('points', 'total_apps', 'per_item')),
+    ('app_points_cap', 'complexity', ('points', 'total_apps', 'cap')),
+    ('policy_points', 'complexity', ('points', 'okta_policies_count', 'per_item')),
+    ('policy_points_cap', 'complexity', ('points', 'okta_policies_count', 'cap')),
+    ('workflow_points', 'complexity', ('points', 'workflow_automations_count', 'per_item')),
+    ('workflow_points_cap', 'complexity', ('points', 'workflow_automations_count', 'cap')),
+    ('provisioning_points', 'complexity', ('points', 'provisioning_enabled_apps', 'per_item')),
+    ('provisioning_points_cap', 'complexity', ('points', 'provisioning_enabled_apps', 'cap')),
+    ('domain_points', 'complexity', ('points', 'federated_domains_count', 'per_item')),
+    ('domain_points_cap', 'complexity', ('points', 'federated_domains_count', 'cap')),
+    ('base_weeks', 'timeline', ('base_weeks',)),
+    ('days_per_week', 'timeline', ('days_per_week',)),
+    ('effort_factor', 'timeline', ('effort_factor',)),
+    ('min_weeks', 'timeline', ('min_weeks',))
+)
+
+# Effort breakdown components as in the readme: (label, input fields, effort coefficient name)
+EFFORT_COMPONENTS = (
+    ('Base Project', (), 'base_hours'),
+    ('SAML Apps', ('saml_apps_count',), 'saml_hours'),
+    ('OIDC Apps', ('oidc_apps_count',), 'oidc_hours'),
+    ('SWA Apps', ('swa_apps_count',), 'swa_hours'),
+    ('Bookmark Apps', ('bookmark_apps_count',), 'bookmark_hours'),
+    ('Policies', ('okta_policies_count',), 'policy_hours'),
+    ('Agents (AD + RADIUS)', ('okta_ad_agents_count', 'okta_radius_agents_count'), 'agent_hours'),
+    ('Workflows', ('workflow_automations_count',), 'workflow_hours'),
+    ('Provisioning', ('provisioning_enabled_apps',), 'provisioning_hours'),
+    ('Groups', ('groups_recreate_count',), 'group_hours')
+)
+
+Coefficients = namedtuple('Coefficients', [name for name, _, _ in COEFFICIENT_LAYOUT])
+
+# One step in a threshold table: add `add` when data[field] > above
+Threshold = namedtuple('Threshold', ['field', 'above', 'add'])
+
+Phase = namedtuple('Phase', ['phase', 'share', 'min_weeks'])
+
+
+class RateCardError(ValueError):
+    """Raised when a rate card is missing fields or malformed"""
+
+
+class CompiledRateCard:
+    """
+    A rate card compiled for evaluation
+    coefficients is a flat namedtuple of numbers; the threshold tables are
+    tuples of Threshold steps applied in card order. Instances are immutable
+    and shared, so switching cards per request costs one registry lookup.
+    """
+    
+    __slots__ = ('name', 'version', 'currency', 'coefficients', 'effort_multipliers',
+                 'services_multipliers', 'complexity_steps', 'timeline_adders', 'phases')
+    
+    def __init__(self, name, version, currency, coefficients, effort_multipliers,
+                 services_multipliers, complexity_steps, timeline_adders, phases):
+        object.__setattr__(self, 'name', name)
+        object.__setattr__(self, 'version', version)
+        object.__setattr__(self, 'currency', currency)
+        object.__setattr__(self, 'coefficients', coefficients)
+        object.__setattr__(self, 'effort_multipliers', effort_multipliers)
+        object.__setattr__(self, 'services_multipliers', services_multipliers)
+        object.__setattr__(self, 'complexity_steps', complexity_steps)
+        object.__setattr__(self, 'timeline_adders', timeline_adders)
+        object.__setattr__(self, 'phases', phases)
+    
+    def __setattr__(self, name, value):
+        raise AttributeError('CompiledRateCard is immutable')
+    
+    @property
+    def card_id(self):
+        return f'{self.name}@{self.version}'
+    
+    def thresholds(self):
+        """Every step threshold as (field, above, applies_to) rows"""
+        rows = []
+        rows.extend((step.field, step.above, f'migration effort multiplier (+{step.add})')
+                    for step in self.effort_multipliers)
+        rows.extend((step.field, step.above, f'professional services multiplier (+{step.add})')
+                    for step in self.services_multipliers)
+        rows.extend((step.field, step.above, f'timeline (+{step.add} weeks)')
+                    for step in self.timeline_adders)
+        for field, tiers in self.complexity_steps:
+            rows.extend((field, step.above, f'complexity score (+{step.add})') for step in tiers)
+        c = self.coefficients
+        rows.append(('num_employees', c.monitoring_employees_above, 'infrastructure monitoring cost'))
+        rows.append(('okta_policies_count', c.p1_policies_above, 'premium (P1) licensing'))
+        return rows
+    
+    def __repr__(self):
+        return f'<CompiledRateCard {self.card_id}>'
+
+
+class RateCards:
+    
+    # Loaded cards by name and by name@version
+    _registry = {}
+    
+    @staticmethod
+    def compile(card):
+        """Compile a rate card dict into a CompiledRateCard"""
+        for key in ('name', 'version'):
+            if key not in card:
+                raise RateCardError(f"Rate card is missing '{key}'")
+        label = f"{card['name']}@{card['version']}"
+        
+        values = []
+        for name, section, path in COEFFICIENT_LAYOUT:
+            node = card.get(section)
+            for part in path:
+                if not isinstance(node, dict) or part not in node:
+                    raise RateCardError(f"{label}: missing {section}.{'.'.join(path)}")
+                node = node[part]
+            if isinstance(node, bool) or not isinstance(node, (int, float)):
+                raise RateCardError(f"{label}: {section}.{'.'.join(path)} must be a number")
+            values.append(node)
+        
+        steps = lambda rows: tuple(Threshold(row['field'], row['above'], row['add']) for row in rows)
+        try:
+            effort_multipliers = steps(card['effort'].get('multipliers', ()))
+            services_multipliers = steps(card['professional_services'].get('multipliers', ()))
+            timeline_adders = steps(card['timeline'].get('adders', ()))
+            complexity_steps = tuple(
+                (row['field'], tuple(sorted(
+                    (Threshold(row['field'], tier['above'], tier['add']) for tier in row['tiers']),
+                    key=lambda step: -step.above
+                )))
+                for row in card['complexity'].get('steps', ())
+            )
+            phases = tuple(Phase(row['phase'], row['share'], row['min_weeks']) for row in card['phases'])
+        except (KeyError, TypeError) as exc:
+            raise RateCardError(f'{label}: malformed threshold or phase table ({exc})') from exc
+        
+        return CompiledRateCard(
+            card['name'], str(card['version']), card.get('currency', 'USD'),
+            Coefficients(*values), effort_multipliers, services_multipliers,
+            complexity_steps, timeline_adders, phases
+        )
+    
+    @staticmethod
+    def to_dict(rate_card):
+        """Rate card dict that compiles back to the same card (inverse of compile)"""
+        rates = RateCards.get(rate_card)
+        card = {'name': rates.name, 'version': rates.version, 'currency': rates.currency}
+        for (name, section, path), value in zip(COEFFICIENT_LAYOUT, rates.coefficients):
+            node = card.setdefault(section, {})
+            for part in path[:-1]:
+                node = node.setdefault(part, {})
+            node[path[-1]] = value
+        
+        rows = lambda table: [{'field': step.field, 'above': step.above, 'add': step.add} for step in table]
+        card['effort']['multipliers'] = rows(rates.effort_multipliers)
+        card['professional_services']['multipliers'] = rows(rates.services_multipliers)
+        card['timeline']['adders'] = rows(rates.timeline_adders)
+        card['complexity']['steps'] = [
+            {'field': field, 'tiers': [{'above': step.above, 'add': step.add} for step in tiers]}
+            for field, tiers in rates.complexity_steps
+        ]
+        card['phases'] = [
+            {'phase': phase.phase, 'share': phase.share, 'min_weeks': phase.min_weeks} for phase in rates.phases
+        ]
+        return card
+    
+    @staticmethod
+    def load(source):
+        """
+        Load, compile and register a rate card
+        source is a .json/.yaml/.yml path or an already parsed dict.
+        Returns the CompiledRateCard; it stays available by name and name@version.
+        """
+        card = RateCards._read(source) if isinstance(source, str) else source
+        compiled = RateCards.compile(card)
+        RateCards._registry[compiled.name] = compiled
+        RateCards._registry[compiled.card_id] = compiled
+        return compiled
+    
+    @staticmethod
+    def get(rate_card=None):
+        """
+        Resolve a rate card: None (default card), a registered name / name@version,
+        or a CompiledRateCard (returned as is)
+        """
+        if isinstance(rate_card, CompiledRateCard):
+            return rate_card
+        if rate_card is None:
+            rate_card = 'default'
+        compiled = RateCards._registry.get(rate_card)
+        if compiled is None:
+            if rate_card == 'default':
+                return RateCards.load(DEFAULT_RATE_CARD_PATH)
+            raise KeyError(f"Rate card '{rate_card}' is not loaded")
+        return compiled
+    
+    @staticmethod
+    def loaded():
+        """Names (and name@version ids) of every registered card"""
+        return sorted(RateCards._registry)
+    
+    @staticmethod
+    def _read(path):
+        """Parse a JSON or YAML rate card file"""
+        with open(path, encoding='utf-8') as handle:
+            if path.lower().endswith(('.yaml', '.yml')):
+                import yaml
+                return yaml.safe_load(handle)
+            return json.load(handle)
@@ -0,0 +1,361 @@
+"""
+Report Export Pipeline for OKTA to Entra ID Migration Calculator
+Streams many comprehensive estimates to CSV, NDJSON, Parquet/Arrow and Excel
+one row at a time, so portfolio-sized result sets never sit in memory whole.
+The Excel report has the summary, effort breakdown and cost breakdown of
+Estimation_Module_Readme.md, one row per estimate.
+
+Usage:
+    python report_exporter.py estimates.jsonl -o report.xlsx
+    python report_exporter.py estimates.jsonl -o report.csv      (.ndjson, .parquet, .arrow)
+"""
+
+import os
+import sys
+import csv
+import json
+import argparse
+from itertools import chain
+
+from rate_card import RateCards, EFFORT_COMPONENTS
+
+# Flat summary columns: (key, Excel header, Arrow type)
+SUMMARY_COLUMNS = (
+    ('index', 'Index', 'int64'),
+    ('company_name', 'Company', 'string'),
+    ('project_name', 'Project', 'string'),
+    ('estimation_type', 'Estimation Type', 'string'),
+    ('rate_card', 'Rate Card', 'string'),
+    ('effort_hours', 'Final Effort Hours', 'int64'),
+    ('effort_days', 'Final Effort Days', 'float64'),
+    ('total_cost', 'Total Cost (excl. support)', 'float64'),
+    ('total_cost_incl_support', 'Total Cost (incl. support)', 'float64'),
+    ('timeline_weeks', 'Timeline (weeks)', 'int64'),
+    ('complexity_score', 'Complexity Score', 'int64'),
+    ('complexity_level', 'Complexity Level', 'string'),
+    ('total_apps', 'Total Apps', 'float64'),
+    ('total_users', 'Total Users', 'float64'),
+    ('licensing', 'Licensing', 'float64'),
+    ('infrastructure', 'Infrastructure', 'float64'),
+    ('professional_services', 'Professional Services', 'float64'),
+    ('support', 'Support', 'float64'),
+    ('risks', 'Risks', 'string'),
+    ('critical_path', 'Critical Path', 'string'),
+    ('calculation_date', 'Calculation Date', 'string')
+)
+
+EFFORT_HEADERS = ('Index', 'Company') + tuple(f'{label} (h)' for label, _, _ in EFFORT_COMPONENTS) + (
+    'Pre-Multiplier Hours', 'Effort Multiplier', 'Final Effort Hours', 'Final Effort Days')
+
+COST_HEADERS = (
+    'Index', 'Company',
+    'Licensing (base)', 'Licensing (premium add-on)', 'Licensing Total',
+    'Base Setup', 'Agents', 'Domains', 'Monitoring & Logging', 'Infrastructure Total',
+    'Base Services', 'Apps Component', 'Policies Component', 'Workflows Component', 'Training',
+    'Services Subtotal (before multipliers)', 'Services Multiplier', 'Professional Services Total',
+    'Support', 'Total (excl. support)', 'Total (incl. support)'
+)
+
+# Excel sheet row limit (header included); longer sheets continue on "<name> (2)", ...
+EXCEL_MAX_ROWS = 1048576
+
+EXPORT_FORMATS = ('csv', 'ndjson', 'parquet', 'arrow', 'xlsx')
+
+
+class ReportExporter:
+    """
+    Streaming writers for estimate reports
+    items may be result dicts, (form_data, result) pairs, {'input', 'result'}
+    dicts or PortfolioRunner records, which carry their 'input' (failed records
+    are skipped). The effort and cost component columns need the inputs;
+    without them only the totals from the result are filled in. Every writer returns the number of
+    estimates written.
+    """
+    
+    @staticmethod
+    def export(items, path, fmt=None, **kwargs):
+        """Write items to path in fmt (default: from the file extension)"""
+        fmt = fmt or os.path.splitext(path)[1].lstrip('.').lower()
+        fmt = {'jsonl': 'ndjson', 'feather': 'arrow', 'excel': 'xlsx'}.get(fmt, fmt)
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format '{fmt}', expected one of {', '.join(EXPORT_FORMATS)}")
+        writer = getattr(ReportExporter, 'write_excel' if fmt == 'xlsx' else f'write_{fmt}')
+        return writer(items, path, **kwargs)
+    
+    @staticmethod
+    def entries(items):
+        """Yield (index, form_data or None, result) for every successful item"""
+        for position, item in enumerate(items):
+            inputs = None
+            index = position
+            if isinstance(item, tuple):
+                inputs, result = item
+            elif 'status' in item and 'index' in item:
+                if item['status'] != 'ok':
+                    continue
+                index, inputs, result = item['index'], item.get('input'), item['result']
+            elif 'result' in item:
+                inputs, result = item.get('input'), item['result']
+            else:
+                result = item
+            if result:
+                yield index, inputs, result
+    
+    @staticmethod
+    def summary_row(index, result):
+        """Flat summary values in SUMMARY_COLUMNS order"""
+        summary = result['executive_summary']
+        effort = result['migration_effort']
+        costs = result['cost_breakdown']
+        return [
+            index,
+            result.get('company_name'),
+            result.get('project_name'),
+            result.get('estimation_type'),
+            result.get('rate_card'),
+            effort['hours'],
+            effort['days'],
+            costs['total'],
+            costs['total'] + costs['support'],
+            summary['timeline_weeks'],
+            summary['complexity_score'],
+            effort['complexity_level'],
+            summary['total_apps'],
+            summary['total_users'],
+            costs['licensing'],
+            costs['infrastructure'],
+            costs['professional_services'],
+            costs['support'],
+            '; '.join(risk['category'] for risk in result.get('risk_assessment', ())),
+            '; '.join(result.get('timeline_estimation', {}).get('critical_path', ())),
+            result.get('calculation_date')
+        ]
+    
+    @staticmethod
+    def effort_row(index, inputs, result):
+        """Effort breakdown values in EFFORT_HEADERS order"""
+        effort = result['migration_effort']
+        rates = ReportExporter._rates(result, inputs)
+        if rates is None:
+            components = [None] * (len(EFFORT_COMPONENTS) + 2)
+        else:
+            c = rates.coefficients
+            components = []
+            for label, fields, coefficient in EFFORT_COMPONENTS:
+                quantity = sum(inputs.get(field, 0) for field in fields) if fields else 1
+                components.append(quantity * getattr(c, coefficient))
+            multiplier = 1.0
+            for step in rates.effort_multipliers:
+                if inputs.get(step.field, 0) > step.above:
+                    multiplier += step.add
+            components += [sum(components), multiplier]
+        return [index, result.get('company_name')] + components + [effort['hours'], effort['days']]
+    
+    @staticmethod
+    def cost_row(index, inputs, result):
+        """Cost breakdown values in COST_HEADERS order"""
+        costs = result['cost_breakdown']
+        rates = ReportExporter._rates(result, inputs)
+        if rates is None:
+            licensing = [None, None]
+            infrastructure = [None] * 4
+            services = [None] * 7
+        else:
+            c = rates.coefficients
+            get = inputs.get
+            employees = get('num_employees', 0)
+            premium = employees * c.p1_user_month * c.license_months \
+                if get('okta_policies_count', 0) > c.p1_policies_above else 0
+            licensing = [employees * c.e3_user_month * c.license_months, premium]
+            monitoring = c.monitoring_large if employees > c.monitoring_employees_above else c.monitoring_small
+            infrastructure = [
+                c.base_infrastructure,
+                (get('okta_ad_agents_count', 0) + get('okta_radius_agents_count', 0)) * c.agent_infrastructure,
+                get('federated_domains_count', 0) * c.domain_infrastructure,
+                monitoring
+            ]
+            total_apps = sum(get(field, 0) for field in
+                             ('saml_apps_count', 'bookmark_apps_count', 'swa_apps_count', 'oidc_apps_count'))
+            services = [
+                c.base_services,
+                total_apps * c.app_services,
+                get('okta_policies_count', 0) * c.policy_services,
+                get('workflow_automations_count', 0) * c.workflow_services,
+                get('num_it_staff', 0) * c.training_per_staff
+            ]
+            multiplier = 1.0
+            for step in rates.services_multipliers:
+                if get(step.field, 0) > step.above:
+                    multiplier += step.add
+            services += [sum(services), multiplier]
+        return (
+            [index, result.get('company_name')]
+            + licensing + [costs['licensing']]
+            + infrastructure + [costs['infrastructure']]
+            + services + [costs['professional_services'], costs['support'], costs['total'],
+                          costs['total'] + costs['support']]
+        )
+    
+    @staticmethod
+    def _rates(result, inputs):
+        """Rate card of a result when its inputs are known and the card is loaded, else None"""
+        if inputs is None:
+            return None
+        try:
+            return RateCards.get(result.get('rate_card') or None)
+        except KeyError:
+            return None
+    
+    @staticmethod
+    def write_csv(items, output):
+        """Flat summary rows as CSV to a path or open text file"""
+        handle = open(output, 'w', newline='', encoding='utf-8') if isinstance(output, str) else output
+        try:
+            writer = csv.writer(handle)
+            writer.writerow([key for key, _, _ in SUMMARY_COLUMNS])
+            written = 0
+            for index, _, result in ReportExporter.entries(items):
+                writer.writerow(ReportExporter.summary_row(index, result))
+                written += 1
+        finally:
+            if handle is not output:
+                handle.close()
+        return written
+    
+    @staticmethod
+    def write_ndjson(items, output):
+        """Full results, one JSON object per line, to a path or open text file"""
+        handle = open(output, 'w', encoding='utf-8') if isinstance(output, str) else output
+        try:
+            written = 0
+            for _, _, result in ReportExporter.entries(items):
+                handle.write(json.dumps(result, default=str) + '\n')
+                written += 1
+        finally:
+            if handle is not output:
+                handle.close()
+        return written
+    
+    @staticmethod
+    def write_parquet(items, path, batch_size=8192):
+        """Flat summary rows as a Parquet file, written in record batches of batch_size rows"""
+        import pyarrow.parquet as pq
+        
+        return ReportExporter._write_batches(items, path, batch_size,
+                                             lambda schema: pq.ParquetWriter(path, schema))
+    
+    @staticmethod
+    def write_arrow(items, path, batch_size=8192):
+        """Flat summary rows as an Arrow IPC (Feather v2) file, written in record batches"""
+        import pyarrow as pa
+        
+        return ReportExporter._write_batches(items, path, batch_size,
+                                             lambda schema: pa.ipc.new_file(path, schema))
+    
+    @staticmethod
+    def _write_batches(items, path, batch_size, open_writer):
+        """Buffer at most batch_size summary rows column-wise, then hand them to the Arrow writer"""
+        import pyarrow as pa
+        
+        schema = pa.schema([(key, getattr(pa, arrow_type)()) for key, _, arrow_type in SUMMARY_COLUMNS])
+        writer = open_writer(schema)
+        written = 0
+        columns = [[] for _ in SUMMARY_COLUMNS]
+        
+        def flush():
+            arrays = [pa.array(values, type=field.type) for values, field in zip(columns, schema)]
+            writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+            for values in columns:
+                values.clear()
+        
+        try:
+            for index, _, result in ReportExporter.entries(items):
+                for values, value in zip(columns, ReportExporter.summary_row(index, result)):
+                    values.append(value)
+                written += 1
+                if len(columns[0]) >= batch_size:
+                    flush()
+            if columns[0] or not written:
+                flush()
+        finally:
+            writer.close()
+        return written
+    
+    @staticmethod
+    def write_excel(items, path):
+        """
+        Summary, Effort Breakdown and Cost Breakdown sheets with one row per estimate
+        Uses openpyxl's write-only mode, which streams rows to disk as they are
+        appended, so memory stays flat however many estimates are written.
+        """
+        from openpyxl import Workbook
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.styles import Font
+        
+        workbook = Workbook(write_only=True)
+        bold = Font(bold=True)
+        sheets = [
+            _SheetStream(workbook, 'Summary', [header for _, header, _ in SUMMARY_COLUMNS], bold, WriteOnlyCell),
+            _SheetStream(workbook, 'Effort Breakdown', EFFORT_HEADERS, bold, WriteOnlyCell),
+            _SheetStream(workbook, 'Cost Breakdown', COST_HEADERS, bold, WriteOnlyCell)
+        ]
+        written = 0
+        for index, inputs, result in ReportExporter.entries(items):
+            sheets[0].append(ReportExporter.summary_row(index, result))
+            sheets[1].append(ReportExporter.effort_row(index, inputs, result))
+            sheets[2].append(ReportExporter.cost_row(index, inputs, result))
+            written += 1
+        workbook.save(path)
+        return written
+    
+    @staticmethod
+    def read_records(path):
+        """Lazily read a results NDJSON file (e.g. portfolio_runner output)"""
+        with open(path, encoding='utf-8') as handle:
+            for line in handle:
+                if line.strip():
+                    yield json.loads(line)
+
+
+class _SheetStream:
+    """Write-only sheet that starts a continuation sheet at the Excel row limit"""
+    
+    def __init__(self, workbook, title, headers, font, cell_type):
+        self.workbook = workbook
+        self.title = title
+        self.headers = headers
+        self.font = font
+        self.cell_type = cell_type
+        self.part = 0
+        self.rows = EXCEL_MAX_ROWS
+    
+    def append(self, row):
+        if self.rows >= EXCEL_MAX_ROWS:
+            self.part += 1
+            self.sheet = self.workbook.create_sheet(self.title if self.part == 1 else f'{self.title} ({self.part})')
+            header = []
+            for text in self.headers:
+                cell = self.cell_type(self.sheet, value=text)
+                cell.font = self.font
+                header.append(cell)
+            self.sheet.append(header)
+            self.rows = 1
+        self.sheet.append(row)
+        self.rows += 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Export estimation results to CSV, NDJSON, Parquet, Arrow or Excel')
+    parser.add_argument('source', nargs='+', help='results NDJSON file(s), e.g. portfolio_runner output')
+    parser.add_argument('-o', '--output', required=True, help='report file; the format follows the extension')
+    parser.add_argument('--format', choices=EXPORT_FORMATS, help='override the format implied by the extension')
+    args = parser.parse_args(argv)
+    
+    items = chain.from_iterable(ReportExporter.read_records(source) for source in args.source)
+    written = ReportExporter.export(items, args.output, args.format)
+    print(f'{written} estimates written to {args.output}', file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,290 @@
+"""
+Scenario Library for OKTA to Entra ID Migration Calculator
+Reference scenarios loaded from scenario files and input workbooks, each with
+a precomputed estimate, plus a normalized feature index that matches a
+partial or fuzzy input to its nearest reference scenarios and blends their
+estimates into an instant ballpark figure
+"""
+
+import os
+import copy
+import glob
+import json
+from datetime import datetime
+
+from estimation_modules import EstimationModules, PREDEFINED_SCENARIOS, CALCULATOR_INPUT_FIELDS
+from input_schema import FORM_SCHEMA, InputSchema, InputValidationError
+from rate_card import RateCards
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Reference workbooks shipped with the repo, loaded by ScenarioLibrary.default()
+SAMPLE_WORKBOOKS = os.path.join(ROOT, 'Okta_Input_Sample_*.xlsx')
+
+SCENARIO_FILE_EXTENSIONS = ('.json', '.yaml', '.yml', '.xlsx')
+
+# Workbook fields copied into a workbook scenario's characteristics
+WORKBOOK_CHARACTERISTICS = ('industry_sector', 'region', 'cloud_maturity_level', 'migration_type')
+
+# Blended numeric figures: (result section, key)
+BLEND_FIGURES = (
+    ('executive_summary', 'total_cost'),
+    ('executive_summary', 'timeline_weeks'),
+    ('executive_summary', 'complexity_score'),
+    ('executive_summary', 'total_apps'),
+    ('executive_summary', 'total_users'),
+    ('migration_effort', 'hours'),
+    ('migration_effort', 'days'),
+    ('cost_breakdown', 'licensing'),
+    ('cost_breakdown', 'professional_services'),
+    ('cost_breakdown', 'infrastructure'),
+    ('cost_breakdown', 'support'),
+    ('cost_breakdown', 'total')
+)
+
+# Cost breakdown components that add up to the total (support is reported, not added)
+TOTAL_COST_COMPONENTS = ('licensing', 'professional_services', 'infrastructure')
+
+# Figures rounded to whole numbers after blending
+WHOLE_FIGURES = ('timeline_weeks', 'complexity_score', 'total_apps', 'total_users', 'hours')
+
+# Distances below this count as an exact match
+EXACT_DISTANCE = 1e-9
+
+
+class ScenarioLibrary:
+    """
+    Reference scenarios with precomputed estimates and a feature index
+    Every scenario is a PREDEFINED_SCENARIOS-style dict (name, description,
+    characteristics, data). The index holds log1p of each calculator input,
+    standardized per field across the library, so employees and app counts
+    weigh alike. A query is compared on the fields it provides only (RMS
+    distance over those fields) with one vectorized pass over the index, and
+    the k nearest estimates are blended with inverse-distance weights.
+    Estimates are computed once per rate card and reused.
+    """
+    
+    # Library built by default() on first use
+    _default = None
+    
+    def __init__(self, scenarios=None, rate_card=None):
+        self.rates = RateCards.get(rate_card)
+        self.scenarios = {}
+        self._estimates = {}
+        self.features = None
+        self.scales = None
+        for key, scenario in (scenarios or {}).items():
+            self.scenarios[key] = scenario
+        self._build_index()
+    
+    @staticmethod
+    def load(*sources, include_predefined=True, rate_card=None):
+        """
+        Library from scenario files, workbooks and directories of either
+        .json/.yaml files hold {key: scenario} (optionally under 'scenarios');
+        .xlsx input workbooks become one scenario each, keyed by file name.
+        PREDEFINED_SCENARIOS are included unless include_predefined=False.
+        """
+        scenarios = dict(PREDEFINED_SCENARIOS) if include_predefined else {}
+        for source in sources:
+            paths = [source]
+            if os.path.isdir(source):
+                paths = sorted(
+                    path for path in glob.iglob(os.path.join(source, '*'))
+                    if path.lower().endswith(SCENARIO_FILE_EXTENSIONS) and not os.path.basename(path).startswith('~$')
+                )
+            elif glob.has_magic(source):
+                paths = sorted(glob.glob(source))
+            for path in paths:
+                scenarios.update(ScenarioLibrary.read_file(path))
+        return ScenarioLibrary(scenarios, rate_card)
+    
+    @staticmethod
+    def default():
+        """Shared library of PREDEFINED_SCENARIOS plus the repo's Okta_Input_Sample_* workbooks"""
+        if ScenarioLibrary._default is None:
+            ScenarioLibrary._default = ScenarioLibrary.load(SAMPLE_WORKBOOKS)
+        return ScenarioLibrary._default
+    
+    @staticmethod
+    def read_file(path):
+        """Scenarios from one scenario file or input workbook, as {key: scenario}"""
+        if path.lower().endswith('.xlsx'):
+            from okta_workbook_loader import OktaWorkbookLoader
+            
+            data = OktaWorkbookLoader.load_form_data(path)
+            if not any(key in data for key in CALCULATOR_INPUT_FIELDS):
+                return {}  # blank template
+            key = os.path.splitext(os.path.basename(path))[0].lower()
+            return {key: {
+                'name': data.get('company_name', key),
+                'description': data.get('project_name', f'Reference profile from {os.path.basename(path)}'),
+                'characteristics': {field: data[field] for field in WORKBOOK_CHARACTERISTICS if field in data},
+                'data': data
+            }}
+        
+        with open(path, encoding='utf-8') as handle:
+            if path.lower().endswith(('.yaml', '.yml')):
+                import yaml
+                
+                content = yaml.safe_load(handle)
+            else:
+                content = json.load(handle)
+        scenarios = content.get('scenarios', content) if isinstance(content, dict) else None
+        if not isinstance(scenarios, dict):
+            raise ValueError(f'{path}: expected an object of scenarios')
+        for key, scenario in scenarios.items():
+            if not isinstance(scenario, dict) or not isinstance(scenario.get('data'), dict):
+                raise ValueError(f"{path}: scenario '{key}' has no 'data' object")
+            try:
+                scenario['data'] = FORM_SCHEMA.normalize(scenario['data'])
+            except InputValidationError as exc:
+                raise ValueError(f"{path}: scenario '{key}': {exc}") from exc
+            scenario.setdefault('name', key)
+            scenario.setdefault('description', '')
+            scenario.setdefault('characteristics', {})
+        return scenarios
+    
+    def add(self, key, scenario):
+        """Add or replace one scenario and rebuild the index"""
+        self.scenarios[key] = scenario
+        self._build_index()
+    
+    def __len__(self):
+        return len(self.scenarios)
+    
+    def __contains__(self, key):
+        return key in self.scenarios
+    
+    def keys(self):
+        return list(self.scenarios)
+    
+    def estimate(self, key, rate_card=None):
+        """The scenario's precomputed estimate, like scenario_based_estimation (None for unknown keys)"""
+        if key not in self.scenarios:
+            return None
+        estimates, _ = self._precomputed(rate_card)
+        results = copy.deepcopy(estimates[self._positions[key]])
+        results['calculation_date'] = datetime.now().isoformat()
+        return results
+    
+    def nearest(self, partial_data, k=3):
+        """
+        The k reference scenarios closest to a partial input, as [(key, distance)]
+        Values are coerced like input_schema.FORM_SCHEMA ("1,200" -> 1200);
+        fields that are missing, blank or invalid are left out of the distance.
+        """
+        positions, distances = self._match(partial_data, k)
+        return [(self._keys[position], float(distance)) for position, distance in zip(positions, distances)]
+    
+    def blended_estimate(self, partial_data, k=3, rate_card=None):
+        """
+        Inverse-distance blend of the k nearest scenarios' estimates
+        Numeric summary, effort and cost figures are blended, with the cost
+        totals recomputed from the blended components; phases follow the
+        blended timeline and the critical path, risks and recommendations come
+        from the nearest scenario.
+        """
+        import numpy as np
+        
+        rates = RateCards.get(rate_card) if rate_card is not None else self.rates
+        positions, distances = self._match(partial_data, k)
+        exact = distances < EXACT_DISTANCE
+        weights = exact.astype(np.float64) if exact.any() else 1.0 / distances
+        weights = weights / weights.sum()
+        estimates, figures = self._precomputed(rates)
+        blended = weights @ figures[positions]
+        
+        results = {section: {} for section in ('executive_summary', 'migration_effort', 'cost_breakdown')}
+        for (section, key), value in zip(BLEND_FIGURES, blended.tolist()):
+            results[section][key] = int(round(value)) if key in WHOLE_FIGURES else round(value, 2)
+        costs = results['cost_breakdown']
+        costs['total'] = round(sum(costs[key] for key in TOTAL_COST_COMPONENTS), 2)
+        results['executive_summary']['total_cost'] = costs['total']
+        nearest = estimates[positions[0]]
+        results['migration_effort']['complexity_level'] = EstimationModules._get_complexity_level(
+            results['executive_summary']['complexity_score'])
+        weeks = results['executive_summary']['timeline_weeks']
+        results['timeline_estimation'] = {
+            'weeks': weeks,
+            'phases': EstimationModules._get_migration_phases(weeks, rates),
+            'critical_path': list(nearest['timeline_estimation']['critical_path'])
+        }
+        results['risk_assessment'] = [dict(risk) for risk in nearest['risk_assessment']]
+        results['recommendations'] = [dict(item) for item in nearest['recommendations']]
+        results['rate_card'] = rates.card_id
+        results['calculation_date'] = datetime.now().isoformat()
+        results['matches'] = [
+            {
+                'scenario': self._keys[position],
+                'name': self.scenarios[self._keys[position]]['name'],
+                'distance': round(float(distance), 4),
+                'weight': round(float(weight), 4)
+            }
+            for position, distance, weight in zip(positions, distances, weights)
+        ]
+        return results
+    
+    def _build_index(self):
+        """Standardized log1p feature matrix over every scenario's calculator inputs"""
+        import numpy as np
+        
+        self._keys = list(self.scenarios)
+        self._positions = {key: position for position, key in enumerate(self._keys)}
+        self._estimates = {}
+        inputs = [FORM_SCHEMA.validate(scenario['data'])[0] for scenario in self.scenarios.values()]
+        raw = np.array([
+            [data[field] for field in CALCULATOR_INPUT_FIELDS] for data in inputs
+        ], dtype=np.float64).reshape(len(self._keys), len(CALCULATOR_INPUT_FIELDS))
+        logged = np.log1p(raw)
+        scales = logged.std(axis=0) if len(self._keys) > 1 else np.ones(len(CALCULATOR_INPUT_FIELDS))
+        scales[scales == 0] = 1.0
+        self.scales = scales
+        self.features = logged / scales
+    
+    def _match(self, partial_data, k):
+        """Positions and RMS distances of the k nearest scenarios, nearest first"""
+        import numpy as np
+        
+        if not self._keys:
+            raise ValueError('The scenario library is empty')
+        if not isinstance(partial_data, dict):
+            raise ValueError('partial_data must be an object')
+        provided = []
+        values = []
+        for position, field in enumerate(CALCULATOR_INPUT_FIELDS):
+            value = InputSchema.count_value(partial_data.get(field))
+            if value is not None:
+                provided.append(position)
+                values.append(value)
+        if not provided:
+            raise ValueError('partial_data has no usable calculator input fields')
+        
+        query = np.log1p(np.array(values, dtype=np.float64)) / self.scales[provided]
+        distances = np.sqrt(((self.features[:, provided] - query) ** 2).mean(axis=1))
+        k = min(k, len(distances))
+        positions = np.argpartition(distances, k - 1)[:k] if k < len(distances) else np.arange(k)
+        positions = positions[np.argsort(distances[positions], kind='stable')]
+        return positions, distances[positions]
+    
+    def _precomputed(self, rate_card):
+        """Per-scenario estimates and their BLEND_FIGURES matrix under a rate card, computed once"""
+        import numpy as np
+        
+        rates = RateCards.get(rate_card) if rate_card is not None else self.rates
+        cached = self._estimates.get(rates.card_id)
+        if cached is None:
+            estimates = []
+            for key in self._keys:
+                scenario = self.scenarios[key]
+                results = EstimationModules._calculate_comprehensive_estimate(scenario['data'], rates)
+                results['estimation_type'] = 'Scenario-Based'
+                results['scenario'] = scenario['name']
+                results['scenario_description'] = scenario['description']
+                results['characteristics'] = scenario['characteristics']
+                estimates.append(results)
+            figures = np.array([
+                [results[section][key] for section, key in BLEND_FIGURES] for results in estimates
+            ], dtype=np.float64).reshape(len(estimates), len(BLEND_FIGURES))
+            cached = self._estimates[rates.card_id] = (estimates, figures)
+        return cached
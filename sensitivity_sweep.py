@@ -0,0 +1,167 @@
+"""
+Sensitivity and What-If Sweep Engine for OKTA to Entra ID Migration Calculator
+Evaluates parameter grids in one vectorized pass and reports tornado
+sensitivities and the step thresholds that make the estimate jump
+"""
+
+import numpy as np
+import pandas as pd
+
+from estimation_modules import EstimationModules, CALCULATOR_INPUT_FIELDS
+from rate_card import RateCards, CompiledRateCard
+
+# Outputs reported by the sweep (columns of EstimationModules.estimate_batch)
+SWEEP_OUTPUTS = ('effort_hours', 'total_cost', 'timeline_weeks', 'complexity_score')
+
+class SensitivitySweep:
+    
+    @staticmethod
+    def sweep(base, ranges, tornado_spread=0.2, rate_card=None):
+        """
+        What-if sweep around a base input
+        ranges maps input fields to sequences of values; the full cartesian grid
+        is evaluated in one vectorized pass (empty ranges give the base point
+        as the only grid row). Returns a dict with:
+            'grid'            DataFrame of swept fields plus outputs per grid point
+            'tornado'         per-field swing of every output (see tornado())
+            'discontinuities' step thresholds crossed inside the swept ranges
+        rate_card selects the rate card (see rate_card.RateCards.get).
+        """
+        unknown = set(ranges) - set(CALCULATOR_INPUT_FIELDS)
+        if unknown:
+            raise ValueError(f"Fields not read by the calculators: {', '.join(sorted(unknown))}")
+        
+        fields = list(ranges)
+        axes = [np.asarray(list(ranges[field]), dtype=np.float64) for field in fields]
+        mesh = np.meshgrid(*axes, indexing='ij') if axes else []
+        columns = SensitivitySweep._base_columns(base)
+        if mesh:
+            columns.update((field, values.ravel()) for field, values in zip(fields, mesh))
+        else:
+            columns = {field: np.array([value]) for field, value in columns.items()}
+        
+        outputs = EstimationModules._estimate_columns(columns, rate_card)
+        grid = pd.DataFrame({field: columns[field] for field in fields}, index=pd.RangeIndex(len(outputs['total_cost'])))
+        for output in SWEEP_OUTPUTS:
+            grid[output] = outputs[output]
+        
+        return {
+            'grid': grid,
+            'tornado': SensitivitySweep.tornado(base, tornado_spread, ranges, rate_card),
+            'discontinuities': SensitivitySweep.discontinuities(base, ranges, rate_card)
+        }
+    
+    @staticmethod
+    def tornado(base, spread=0.2, ranges=None, rate_card=None):
+        """
+        Tornado-chart sensitivities for every calculator input field
+        Each field is moved to a low and high value with all others held at base:
+        the swept range bounds when given, otherwise base -/+ spread (at least 1).
+        Rows are sorted by total_cost swing, largest first.
+        """
+        ranges = ranges or {}
+        base_columns = SensitivitySweep._base_columns(base)
+        
+        lows, highs = [], []
+        for field in CALCULATOR_INPUT_FIELDS:
+            value = float(base_columns[field])
+            if field in ranges:
+                values = list(ranges[field])
+                low, high = float(min(values)), float(max(values))
+            else:
+                step = max(round(abs(value) * spread), 1)
+                low, high = max(value - step, 0), value + step
+            lows.append(low)
+            highs.append(high)
+        
+        # Rows: [base, field_1 low, field_1 high, field_2 low, ...]
+        size = 1 + 2 * len(CALCULATOR_INPUT_FIELDS)
+        columns = {field: np.full(size, base_columns[field], dtype=np.float64) for field in CALCULATOR_INPUT_FIELDS}
+        for position, field in enumerate(CALCULATOR_INPUT_FIELDS):
+            columns[field][1 + 2 * position] = lows[position]
+            columns[field][2 + 2 * position] = highs[position]
+        outputs = EstimationModules._estimate_columns(columns, rate_card)
+        
+        rows = []
+        for position, field in enumerate(CALCULATOR_INPUT_FIELDS):
+            row = {'field': field, 'base': base_columns[field], 'low': lows[position], 'high': highs[position]}
+            for output in SWEEP_OUTPUTS:
+                values = outputs[output]
+                row[f'{output}_low'] = values[1 + 2 * position] - values[0]
+                row[f'{output}_high'] = values[2 + 2 * position] - values[0]
+                row[f'{output}_swing'] = abs(values[2 + 2 * position] - values[1 + 2 * position])
+            rows.append(row)
+        
+        return pd.DataFrame(rows).sort_values('total_cost_swing', ascending=False, kind='stable').reset_index(drop=True)
+    
+    @staticmethod
+    def discontinuities(base, ranges=None, rate_card=None):
+        """
+        Step thresholds that cause discontinuous jumps
+        For every threshold inside a swept range (or every threshold when no
+        ranges are given) reports the jump in each output when the field goes
+        from the threshold to threshold + 1, net of the change the same move
+        makes under the rate card without its steps. Smooth kinks such as the
+        complexity point caps change both alike and cancel out; thresholds
+        whose steps make no difference at this base are left out.
+        Thresholds come from the rate card's step tables.
+        """
+        rates = RateCards.get(rate_card)
+        base_columns = SensitivitySweep._base_columns(base)
+        candidates = []
+        for field, threshold, applies_to in SensitivitySweep.step_thresholds(rates):
+            if ranges:
+                if field not in ranges:
+                    continue
+                values = list(ranges[field])
+                if not (min(values) <= threshold < max(values)):
+                    continue
+            candidates.append((field, threshold, applies_to))
+        
+        if not candidates:
+            return []
+        
+        # Two rows per threshold: threshold, threshold + 1
+        size = 2 * len(candidates)
+        columns = {field: np.full(size, base_columns[field], dtype=np.float64) for field in CALCULATOR_INPUT_FIELDS}
+        for position, (field, threshold, _) in enumerate(candidates):
+            columns[field][2 * position:2 * position + 2] = (threshold, threshold + 1)
+        stepped = EstimationModules._estimate_columns(columns, rates)
+        smooth = EstimationModules._estimate_columns(columns, SensitivitySweep._without_steps(rates))
+        
+        flagged = []
+        for position, (field, threshold, applies_to) in enumerate(candidates):
+            jumps = {}
+            for output in SWEEP_OUTPUTS:
+                at, above = stepped[output][2 * position:2 * position + 2]
+                smooth_at, smooth_above = smooth[output][2 * position:2 * position + 2]
+                jumps[output] = ((above - at) - (smooth_above - smooth_at)).item()
+            if any(jumps.values()):
+                flagged.append({
+                    'field': field,
+                    'threshold': f'> {threshold}',
+                    'applies_to': applies_to,
+                    'jumps': jumps
+                })
+        return flagged
+    
+    @staticmethod
+    def _without_steps(rates):
+        """The rate card with every step table emptied and the P1 / monitoring tiers never reached"""
+        coefficients = rates.coefficients._replace(p1_policies_above=float('inf'),
+                                                   monitoring_employees_above=float('inf'))
+        return CompiledRateCard(rates.name, rates.version, rates.currency, coefficients,
+                                (), (), (), (), rates.phases)
+    
+    @staticmethod
+    def step_thresholds(rate_card=None):
+        """Distinct (field, value the field must exceed, where it applies) rows of a rate card"""
+        merged = {}
+        for field, threshold, applies_to in RateCards.get(rate_card).thresholds():
+            merged.setdefault((field, threshold), []).append(applies_to)
+        return [(field, threshold, ', '.join(uses)) for (field, threshold), uses in sorted(merged.items())]
+    
+    @staticmethod
+    def _base_columns(base):
+        """Base input as scalar columns (missing fields are 0)"""
+        return {field: float(base.get(field, 0) or 0) for field in CALCULATOR_INPUT_FIELDS}
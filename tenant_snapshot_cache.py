@@ -0,0 +1,140 @@
+"""
+Incremental Tenant Snapshot Cache for the API-Based Estimation Module
+Keeps per-object-type aggregates and lastUpdated high-water marks in SQLite
+so repeat OKTA scans only fetch what changed
+"""
+
+import json
+import time
+import sqlite3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    org_url TEXT NOT NULL,
+    object_type TEXT NOT NULL,
+    aggregates TEXT NOT NULL,
+    high_water_mark TEXT,
+    updated_at REAL NOT NULL,
+    full_scan_at REAL NOT NULL,
+    PRIMARY KEY (org_url, object_type)
+);
+CREATE TABLE IF NOT EXISTS objects (
+    org_url TEXT NOT NULL,
+    object_type TEXT NOT NULL,
+    object_id TEXT NOT NULL,
+    contribution TEXT NOT NULL,
+    PRIMARY KEY (org_url, object_type, object_id)
+);
+"""
+
+
+class TenantSnapshotCache:
+    """
+    On-disk snapshot store shared by OktaApiCollector runs
+    A snapshot row holds the aggregated counts for one object type. Types that
+    support lastUpdated filtering also keep each object's contribution to those
+    counts, so changed objects can be swapped in without a full recount.
+    Snapshots whose last full scan is older than ttl_seconds are treated as
+    misses and rebuilt, however recently incremental scans refreshed them.
+    """
+    
+    def __init__(self, path='okta_tenant_snapshots.sqlite', ttl_seconds=24 * 3600):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._db = sqlite3.connect(path)
+        self._db.executescript(SCHEMA)
+        self.stats = {'hits': 0, 'misses': 0, 'incremental': 0}
+    
+    def load(self, org_url, object_type):
+        """
+        Fresh snapshot for one object type, or None when missing or when the
+        last full scan has expired
+        Returns {'aggregates', 'high_water_mark', 'updated_at', 'full_scan_at'}.
+        """
+        row = self._db.execute(
+            'SELECT aggregates, high_water_mark, updated_at, full_scan_at FROM snapshots '
+            'WHERE org_url = ? AND object_type = ?',
+            (org_url, object_type)
+        ).fetchone()
+        if row is None or time.time() - row[3] > self.ttl_seconds:
+            return None
+        return {'aggregates': json.loads(row[0]), 'high_water_mark': row[1], 'updated_at': row[2],
+                'full_scan_at': row[3]}
+    
+    def save(self, org_url, object_type, aggregates, high_water_mark=None, full_scan=True):
+        """
+        Store the aggregates and high-water mark for one object type
+        full_scan=False (an incremental update) keeps the previous full_scan_at,
+        so the TTL still forces a periodic full recount.
+        """
+        aggregates = {key: count for key, count in aggregates.items() if count}
+        now = time.time()
+        with self._db:
+            self._db.execute(
+                'INSERT INTO snapshots VALUES (?, ?, ?, ?, ?, ?) '
+                'ON CONFLICT (org_url, object_type) DO UPDATE SET aggregates = excluded.aggregates, '
+                'high_water_mark = excluded.high_water_mark, updated_at = excluded.updated_at'
+                + (', full_scan_at = excluded.full_scan_at' if full_scan else ''),
+                (org_url, object_type, json.dumps(aggregates), high_water_mark, now, now if full_scan else 0)
+            )
+    
+    def swap_contributions(self, org_url, object_type, contributions):
+        """
+        Upsert (object_id, contribution) pairs for one page of objects
+        Returns the previous contribution of each object ({} for new objects)
+        so the caller can subtract it from the running aggregates.
+        """
+        if not contributions:
+            return []
+        
+        ids = [object_id for object_id, _ in contributions]
+        previous = {}
+        for start in range(0, len(ids), 500):
+            batch = ids[start:start + 500]
+            rows = self._db.execute(
+                'SELECT object_id, contribution FROM objects '
+                f'WHERE org_url = ? AND object_type = ? AND object_id IN ({",".join("?" * len(batch))})',
+                (org_url, object_type, *batch)
+            )
+            previous.update((object_id, json.loads(contribution)) for object_id, contribution in rows)
+        
+        with self._db:
+            self._db.executemany(
+                'INSERT OR REPLACE INTO objects VALUES (?, ?, ?, ?)',
+                [(org_url, object_type, object_id, json.dumps(contribution))
+                 for object_id, contribution in contributions]
+            )
+        return [previous.get(object_id, {}) for object_id in ids]
+    
+    def clear_objects(self, org_url, object_type):
+        """Drop stored per-object contributions before a full rescan"""
+        with self._db:
+            self._db.execute(
+                'DELETE FROM objects WHERE org_url = ? AND object_type = ?',
+                (org_url, object_type)
+            )
+    
+    def invalidate(self, org_url=None, object_type=None):
+        """
+        Explicitly drop snapshots so the next run rescans
+        No arguments clears everything; org_url and/or object_type narrow it down.
+        """
+        clauses, params = [], []
+        if org_url is not None:
+            clauses.append('org_url = ?')
+            params.append(org_url)
+        if object_type is not None:
+            clauses.append('object_type = ?')
+            params.append(object_type)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ''
+        
+        with self._db:
+            self._db.execute('DELETE FROM snapshots' + where, params)
+            self._db.execute('DELETE FROM objects' + where, params)
+    
+    def record(self, outcome):
+        """Count a 'hits', 'misses' or 'incremental' lookup"""
+        self.stats[outcome] += 1
+    
+    def close(self):
+        self._db.close()
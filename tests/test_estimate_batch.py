@@ -0,0 +1,51 @@
+"""Vectorized estimate_batch / manual_input_estimation_batch must match the scalar path"""
+
+import numpy as np
+import pandas as pd
+
+from estimation_modules import EstimationModules, PREDEFINED_SCENARIOS, CALCULATOR_INPUT_FIELDS
+
+# estimate_batch column -> (result section, key)
+OUTPUTS = {
+    'total_apps': ('executive_summary', 'total_apps'),
+    'complexity_score': ('executive_summary', 'complexity_score'),
+    'timeline_weeks': ('executive_summary', 'timeline_weeks'),
+    'effort_hours': ('migration_effort', 'hours'),
+    'effort_days': ('migration_effort', 'days'),
+    'licensing': ('cost_breakdown', 'licensing'),
+    'professional_services': ('cost_breakdown', 'professional_services'),
+    'infrastructure': ('cost_breakdown', 'infrastructure'),
+    'support': ('cost_breakdown', 'support'),
+    'total_cost': ('cost_breakdown', 'total')
+}
+
+
+def _tenants(count, seed=0):
+    generator = np.random.default_rng(seed)
+    frame = pd.DataFrame({field: generator.integers(0, 60, count) for field in CALCULATOR_INPUT_FIELDS})
+    frame['num_employees'] = generator.integers(0, 12000, count)
+    return pd.concat([frame, pd.DataFrame([scenario['data'] for scenario in PREDEFINED_SCENARIOS.values()])],
+                     ignore_index=True)
+
+
+def test_estimate_batch_matches_scalar_estimates():
+    frame = _tenants(500)
+    frame.loc[::7, 'swa_apps_count'] = np.nan
+    batch = EstimationModules.estimate_batch(frame)
+    
+    for index, row in frame.iterrows():
+        data = {key: int(value) for key, value in row.items() if not pd.isna(value)}
+        expected = EstimationModules.manual_input_estimation(data)
+        for column, (section, key) in OUTPUTS.items():
+            assert batch.at[index, column] == expected[section][key], (index, column)
+
+
+def test_manual_batch_equals_per_item_results():
+    items = [{key: int(value) for key, value in row.items() if not pd.isna(value)}
+             for row in _tenants(64, seed=1).to_dict('records')]
+    items.insert(3, {})
+    strip = lambda result: result and {key: value for key, value in result.items() if key != 'calculation_date'}
+    
+    batch = EstimationModules.manual_input_estimation_batch(items)
+    assert [strip(result) for result in batch] == \
+        [strip(EstimationModules.manual_input_estimation(item)) for item in items]
@@ -0,0 +1,33 @@
+"""EstimateResult / EstimateTable must rebuild result dicts exactly"""
+
+import json
+
+import pytest
+
+from estimate_records import EstimateResult, EstimateTable
+from estimation_modules import EstimationModules, PREDEFINED_SCENARIOS
+from scenario_library import ScenarioLibrary
+
+
+def _results():
+    results = [EstimationModules.scenario_based_estimation(key) for key in PREDEFINED_SCENARIOS]
+    library = ScenarioLibrary(PREDEFINED_SCENARIOS)
+    results.append(library.blended_estimate({'num_employees': 3000, 'saml_apps_count': 40}))
+    return results
+
+
+def test_table_round_trips_fractional_money():
+    results = _results()
+    assert isinstance(results[-1]['cost_breakdown']['professional_services'], float)
+    table = EstimateTable.from_results(results)
+    for index, result in enumerate(results):
+        assert json.dumps(table.row(index)) == json.dumps(result)
+
+
+def test_table_rejects_fractional_whole_number_columns():
+    result = EstimationModules.scenario_based_estimation('small')
+    result['executive_summary']['timeline_weeks'] = result['timeline_estimation']['weeks'] = 12.5
+    record = EstimateResult.from_dict(result)
+    assert record.to_dict() == result
+    with pytest.raises(ValueError, match='timeline_weeks'):
+        EstimateTable.from_results([record])
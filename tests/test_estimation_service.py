@@ -0,0 +1,104 @@
+"""EstimationService endpoints and MicroBatcher through aiohttp's test client"""
+
+import json
+import asyncio
+
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+
+from estimation_modules import EstimationModules, PREDEFINED_SCENARIOS
+from estimation_service import EstimationService, MicroBatcher, ServiceBusy
+
+
+def serve(check, **options):
+    """Run check(client) against a one-process service"""
+    async def run():
+        service = EstimationService(processes=1, **options)
+        async with TestClient(TestServer(service.app())) as client:
+            return await check(client)
+    
+    return asyncio.run(run())
+
+
+def test_manual_estimate_matches_module():
+    data = PREDEFINED_SCENARIOS['medium']['data']
+    
+    async def check(client):
+        response = await client.post('/estimate/manual', json=data)
+        return response.status, await response.json()
+    
+    status, body = serve(check)
+    assert status == 200
+    assert body['cost_breakdown'] == EstimationModules.manual_input_estimation(data)['cost_breakdown']
+
+
+def test_unknown_scenario_is_404():
+    async def check(client):
+        return [(await client.post('/estimate/scenario', json={'scenario': scenario})).status
+                for scenario in ('small', 'no-such-scenario', 7)]
+    
+    assert serve(check) == [200, 404, 404]
+
+
+@pytest.mark.parametrize('body', ['[{"num_employees": 10}', '{"num_employees": 10}'])
+def test_bad_json_array_batch_is_400_before_streaming(body):
+    async def check(client):
+        response = await client.post('/estimate/batch', data=body, headers={'Content-Type': 'application/json'})
+        return response.status, response.content_type, await response.json()
+    
+    status, content_type, payload = serve(check)
+    assert status == 400
+    assert content_type == 'application/json'
+    assert 'error' in payload
+
+
+def test_ndjson_batch_reports_parse_errors_per_line():
+    lines = [json.dumps({'num_employees': 100}), '{not json', json.dumps({'num_employees': 200}), '{}']
+    
+    async def check(client):
+        response = await client.post('/estimate/batch?mode=manual', data='\n'.join(lines) + '\n',
+                                     headers={'Content-Type': 'application/x-ndjson'})
+        return response.status, [json.loads(line) for line in (await response.text()).splitlines()]
+    
+    status, records = serve(check, stream_chunk=2)
+    assert status == 200
+    assert [record['index'] for record in records] == [0, 1, 2, 3]
+    assert [record['status'] for record in records] == ['ok', 'error', 'ok', 'error']
+    assert records[1]['error'].startswith('Item is not valid JSON')
+    assert records[3]['error'] == 'no estimate produced for this input'
+    assert records[2]['result']['executive_summary']['total_users'] == 200
+
+
+def test_micro_batcher_groups_concurrent_items():
+    calls = []
+    
+    async def evaluate(mode, rate_card, items):
+        calls.append((mode, list(items)))
+        return [('ok', item * 2) for item in items]
+    
+    async def run():
+        batcher = MicroBatcher(evaluate, max_batch=3, window=0.01)
+        results = await asyncio.gather(*(batcher.submit('manual', None, item) for item in range(5)))
+        return batcher, results
+    
+    batcher, results = asyncio.run(run())
+    assert results == [('ok', item * 2) for item in range(5)]
+    assert calls == [('manual', [0, 1, 2]), ('manual', [3, 4])]
+    assert batcher.stats == {'batches': 2, 'items': 5, 'rejected': 0}
+    assert batcher.pending == 0
+
+
+def test_micro_batcher_rejects_beyond_max_pending():
+    async def evaluate(mode, rate_card, items):
+        await asyncio.sleep(0.01)
+        return [('ok', item) for item in items]
+    
+    async def run():
+        batcher = MicroBatcher(evaluate, window=0.001, max_pending=2)
+        return batcher, await asyncio.gather(*(batcher.submit('manual', None, item) for item in range(3)),
+                                             return_exceptions=True)
+    
+    batcher, results = asyncio.run(run())
+    assert results[:2] == [('ok', 0), ('ok', 1)]
+    assert isinstance(results[2], ServiceBusy)
+    assert batcher.stats['rejected'] == 1
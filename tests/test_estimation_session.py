@@ -0,0 +1,52 @@
+"""EstimationSession updates must track manual_input_estimation exactly"""
+
+import random
+
+import pytest
+
+from estimation_modules import EstimationModules, PREDEFINED_SCENARIOS, CALCULATOR_INPUT_FIELDS
+from estimation_session import EstimationSession
+from input_schema import InputValidationError
+
+
+def _strip(result):
+    return {key: value for key, value in result.items() if key != 'calculation_date'}
+
+
+def test_random_updates_match_a_fresh_estimate():
+    generator = random.Random(4)
+    data = dict(PREDEFINED_SCENARIOS['medium']['data'], company_name='Acme')
+    session = EstimationSession(data)
+    for _ in range(200):
+        field = generator.choice(CALCULATOR_INPUT_FIELDS)
+        value = None if generator.random() < 0.1 else generator.randint(0, 3000)
+        session.update({field: value})
+        if value is None:
+            data.pop(field, None)
+        else:
+            data[field] = value
+        assert _strip(session.estimate()) == _strip(EstimationModules.manual_input_estimation(data))
+
+
+def test_update_returns_only_changed_fields_and_recomputes_readers():
+    session = EstimationSession(PREDEFINED_SCENARIOS['small']['data'])
+    assert session.update({'num_employees': PREDEFINED_SCENARIOS['small']['data']['num_employees']}) == {}
+    
+    recomputed = session.stats['recomputed']
+    diff = session.update({'bookmark_apps_count': 40})
+    assert 'executive_summary.total_apps' in diff and 'calculation_date' in diff
+    assert 'cost_breakdown.licensing' not in diff
+    assert session.stats['recomputed'] - recomputed < len(session.values)
+
+
+def test_invalid_update_with_schema_changes_nothing():
+    EstimationModules.enable_input_validation()
+    try:
+        session = EstimationSession({'num_employees': '1,200', 'saml_apps_count': '40'})
+        before = _strip(session.estimate())
+        with pytest.raises(InputValidationError):
+            session.update({'oidc_apps_count': 5, 'saml_apps_count': 'forty'})
+        assert _strip(session.estimate()) == before
+        assert session.update({'saml_apps_count': '1,000'})['executive_summary.total_apps'] == 1000
+    finally:
+        EstimationModules.disable_input_validation()
@@ -0,0 +1,80 @@
+"""Dict and DataFrame validation paths of input_schema must agree"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from input_schema import FORM_SCHEMA, InputSchema, SchemaField
+
+CELLS = [
+    1200, 1200.0, '1,200', '$5,000', ' 7 ', None, float('nan'), '', 'nan', 'abc',
+    -3, '-3', 2.5, '2.5', np.inf, -np.inf, 'inf', 1e30, '1e30', 2.0 ** 63, True, False, 0
+]
+
+
+def _codes(errors):
+    return sorted((error['field'], error['code'], repr(error.get('index'))) for error in errors)
+
+
+@pytest.mark.parametrize('value', CELLS, ids=repr)
+def test_frame_matches_dict_per_cell(value):
+    schema = InputSchema([SchemaField('saml_apps_count', 'count', 0, False),
+                          SchemaField('num_employees', 'count', 0, True)])
+    record = {'saml_apps_count': value, 'num_employees': value}
+    normalized, errors = schema.validate(record)
+    frame, frame_errors = schema.validate_frame(pd.DataFrame({key: pd.Series([value], dtype=object)
+                                                              for key in record}))
+    for error in errors:
+        error['index'] = 0
+    assert _codes(frame_errors) == _codes(errors)
+    assert frame.to_dict('records')[0] == normalized
+
+
+def test_frame_matches_dict_for_mixed_columns():
+    records = [
+        {'num_employees': 100, 'saml_apps_count': '12', 'regulatory_requirements': 'SOX, None, HIPAA'},
+        {'num_employees': '2,500', 'saml_apps_count': np.inf, 'company_name': 'Acme'},
+        {'num_employees': True, 'saml_apps_count': 1e30, 'oidc_apps_count': -1},
+        {'num_employees': None, 'saml_apps_count': 4.0, 'swa_apps_count': 'x'}
+    ]
+    normalized, errors = FORM_SCHEMA.validate_batch(records)
+    frame, frame_errors = FORM_SCHEMA.validate_frame(pd.DataFrame(records))
+    
+    assert _codes(frame_errors) == _codes(errors)
+    for row, expected in zip(frame.to_dict('records'), normalized):
+        assert {key: row[key] for key in expected} == expected
+
+
+def test_bool_column_is_a_type_error():
+    _, errors = FORM_SCHEMA.validate_frame(pd.DataFrame({'num_employees': [True, False]}))
+    assert [error['code'] for error in errors] == ['type', 'type']
+
+
+def test_out_of_range_counts_keep_int64_columns():
+    frame, errors = FORM_SCHEMA.validate_frame(pd.DataFrame({'num_employees': [np.inf, 1e30, 5.0]}))
+    assert frame['num_employees'].dtype == np.int64
+    assert frame['num_employees'].tolist() == [0, 0, 5]
+    assert [error['code'] for error in errors] == ['not_integer', 'not_integer']
+
+
+def test_tenant_profile_estimates_with_validation_enabled():
+    from estimate_records import EstimateResult, TenantProfile
+    from estimation_modules import EstimationModules, PREDEFINED_SCENARIOS
+    
+    data = PREDEFINED_SCENARIOS['small']['data']
+    EstimationModules.enable_input_validation()
+    try:
+        result = TenantProfile.from_dict(data).estimate()
+    finally:
+        EstimationModules.disable_input_validation()
+    expected = EstimateResult.from_dict(EstimationModules.manual_input_estimation(data))
+    assert result.total_cost == expected.total_cost
+    assert result.timeline_weeks == expected.timeline_weeks
+
+
+def test_mappings_validate_like_dicts():
+    from types import MappingProxyType
+    
+    data = {'num_employees': '1,200', 'saml_apps_count': 3}
+    assert FORM_SCHEMA.validate(MappingProxyType(data)) == FORM_SCHEMA.validate(data)
+    assert [error['code'] for error in FORM_SCHEMA.validate([1, 2])[1]] == ['record']
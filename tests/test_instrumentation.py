@@ -0,0 +1,28 @@
+"""StageRegistry timings and their Prometheus export"""
+
+from estimation_modules import EstimationModules, PREDEFINED_SCENARIOS
+
+
+def test_prometheus_counters_only_increase():
+    garbage = [object() for _ in range(10000)]
+    registry = EstimationModules.enable_instrumentation(track_allocations=True)
+    try:
+        for key in PREDEFINED_SCENARIOS:
+            EstimationModules.manual_input_estimation(PREDEFINED_SCENARIOS[key]['data'])
+        with registry.stage('test.release'):
+            # Frees more blocks than it allocates
+            del garbage[:]
+    finally:
+        EstimationModules.disable_instrumentation()
+    
+    snapshot = registry.snapshot()
+    assert snapshot['entry.manual_input_estimation']['calls'] == len(PREDEFINED_SCENARIOS)
+    assert snapshot['test.release']['allocated_blocks'] == 0
+    assert all(entry['allocated_blocks'] >= 0 for entry in snapshot.values())
+    
+    text = registry.prometheus()
+    assert '# TYPE okta_estimator_stage_allocated_blocks_total counter' in text
+    assert '# TYPE okta_estimator_stage_max_seconds gauge' in text
+    for line in text.splitlines():
+        if line.startswith('okta_estimator_stage_allocated_blocks_total'):
+            assert float(line.rsplit(' ', 1)[1]) >= 0
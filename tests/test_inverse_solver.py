@@ -0,0 +1,59 @@
+"""InverseSolver plans must match brute-force enumeration on small cases"""
+
+import random
+import itertools
+
+import pytest
+
+from estimation_modules import EstimationModules, PREDEFINED_SCENARIOS, CALCULATOR_INPUT_FIELDS
+from inverse_solver import InverseSolver
+
+
+def _cases(count, seed=3):
+    """Random (base, adjustable, targets, weights) cases over three fields each"""
+    generator = random.Random(seed)
+    scenarios = [scenario['data'] for scenario in PREDEFINED_SCENARIOS.values()]
+    cases = []
+    for _ in range(count):
+        base = {field: int(value * generator.uniform(0.5, 1.5)) + generator.randint(0, 5)
+                for field, value in generator.choice(scenarios).items()}
+        fields = generator.sample([field for field in CALCULATOR_INPUT_FIELDS if base[field] > 0], 3)
+        adjustable = {field: (max(0, base[field] - generator.randint(2, 12)), base[field]) for field in fields}
+        weights = {field: generator.randint(1, 4) for field in fields}
+        summary = EstimationModules.manual_input_estimation(base)['executive_summary']
+        targets = {'total_cost': summary['total_cost'] * generator.uniform(0.97, 1.0),
+                   'timeline_weeks': summary['timeline_weeks'] - generator.randint(0, 1)}
+        cases.append((base, adjustable, targets, weights))
+    return cases
+
+
+def _brute_force(base, adjustable, targets, weights):
+    """Least change cost over every assignment of the adjustable fields, or None"""
+    fields = list(adjustable)
+    best = None
+    for values in itertools.product(*(range(low, high + 1) for low, high in adjustable.values())):
+        form_data = dict(base, **dict(zip(fields, values)))
+        summary = EstimationModules.manual_input_estimation(form_data)['executive_summary']
+        if summary['total_cost'] <= targets['total_cost'] and summary['timeline_weeks'] <= targets['timeline_weeks']:
+            cost = sum(weights[field] * abs(value - base[field]) for field, value in zip(fields, values))
+            best = cost if best is None else min(best, cost)
+    return best
+
+
+@pytest.mark.parametrize('base, adjustable, targets, weights', _cases(15))
+def test_matches_brute_force(base, adjustable, targets, weights):
+    plan = InverseSolver(base, adjustable, targets, weights).solve()
+    best = _brute_force(base, adjustable, targets, weights)
+    
+    assert plan['feasible'] == (best is not None)
+    if plan['feasible']:
+        assert plan['optimal']
+        assert plan['change_cost'] == best
+        summary = plan['estimate']['executive_summary']
+        assert summary['total_cost'] <= targets['total_cost']
+        assert summary['timeline_weeks'] <= targets['timeline_weeks']
+
+
+def test_rejects_fields_the_calculators_do_not_read():
+    with pytest.raises(ValueError, match='company_name'):
+        InverseSolver(PREDEFINED_SCENARIOS['small']['data'], {'company_name': (0, 1)}, {'total_cost': 1})
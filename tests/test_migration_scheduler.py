@@ -0,0 +1,50 @@
+"""Wave scheduling must refine the rate card timeline, never undercut it"""
+
+import pytest
+
+from estimation_modules import EstimationModules, PREDEFINED_SCENARIOS
+from estimation_session import EstimationSession
+from migration_scheduler import MigrationScheduler
+
+
+@pytest.fixture
+def scheduling():
+    EstimationModules.enable_wave_scheduling()
+    yield
+    EstimationModules.disable_wave_scheduling()
+
+
+@pytest.mark.parametrize('key', sorted(PREDEFINED_SCENARIOS))
+def test_scheduled_timeline_never_shorter_than_rate_card(key, scheduling):
+    data = PREDEFINED_SCENARIOS[key]['data']
+    EstimationModules.disable_wave_scheduling()
+    plain = EstimationModules.manual_input_estimation(data)
+    EstimationModules.enable_wave_scheduling()
+    scheduled = EstimationModules.manual_input_estimation(data)
+    
+    makespan = scheduled['migration_schedule']['weeks']
+    expected = max(plain['executive_summary']['timeline_weeks'], makespan)
+    assert scheduled['executive_summary']['timeline_weeks'] == expected
+    assert scheduled['timeline_estimation']['weeks'] == scheduled['executive_summary']['timeline_weeks']
+    assert scheduled['executive_summary']['total_cost'] == plain['executive_summary']['total_cost']
+
+
+def test_session_timeline_matches_manual_estimate(scheduling):
+    data = dict(PREDEFINED_SCENARIOS['small']['data'], num_it_staff=0)
+    expected = EstimationModules.manual_input_estimation(data)
+    assert EstimationSession(data).estimate()['timeline_estimation'] == expected['timeline_estimation']
+
+
+def test_more_staff_never_lengthens_the_schedule():
+    data = PREDEFINED_SCENARIOS['enterprise']['data']
+    weeks = [MigrationScheduler.schedule(data, capacity=capacity)['weeks'] for capacity in (1, 2, 4, 8, 16)]
+    assert weeks == sorted(weeks, reverse=True)
+
+
+def test_dependencies_are_respected():
+    schedule = MigrationScheduler.schedule(PREDEFINED_SCENARIOS['medium']['data'])
+    phases = {phase['phase']: phase for phase in schedule['phases']}
+    planning = phases['Planning & Assessment']
+    for phase in phases.values():
+        if phase is not planning:
+            assert phase['start_week'] >= planning['end_week']
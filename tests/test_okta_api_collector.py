@@ -0,0 +1,125 @@
+"""OktaApiCollector against a local aiohttp server standing in for the OKTA API"""
+
+import time
+import asyncio
+import contextlib
+
+from aiohttp import web
+
+from okta_api_collector import OktaApiCollector
+from tenant_snapshot_cache import TenantSnapshotCache
+
+
+class MockOkta:
+    """Minimal OKTA management API: limit/after paging with Link headers and lastUpdated filters"""
+    
+    def __init__(self):
+        self.objects = {
+            'users': [{'id': f'u{i}', 'status': 'ACTIVE', 'lastUpdated': '2024-01-01T00:00:00.000Z'}
+                      for i in range(450)],
+            'groups': [{'id': f'g{i}', 'lastUpdated': '2024-01-01T00:00:00.000Z'} for i in range(3)],
+            'apps': [{'id': 'a1', 'signOnMode': 'SAML_2_0', 'features': ['PUSH_NEW_USERS']},
+                     {'id': 'a2', 'signOnMode': 'OPENID_CONNECT'}],
+            'policies': [{'id': 'p1'}],
+            'agentPools': [{'type': 'AD', 'agents': [{}, {}]}, {'type': 'ad', 'agents': [{}]},
+                           {'type': 'Radius', 'agents': [{}]}],
+            'idps': [{'id': 'i1', 'type': 'SAML2', 'status': 'ACTIVE'},
+                     {'id': 'i2', 'type': 'OIDC', 'status': 'INACTIVE'},
+                     {'id': 'i3', 'type': 'GOOGLE', 'status': 'ACTIVE'}],
+            'eventHooks': [{'id': 'e1'}],
+            'inlineHooks': []
+        }
+        self.requests = []
+        self.throttle = {}
+    
+    async def handle(self, request):
+        name = request.match_info['name']
+        self.requests.append((name, dict(request.query)))
+        if self.throttle.get(name):
+            self.throttle[name] -= 1
+            return web.json_response([], status=429, headers={
+                'X-Rate-Limit-Remaining': '0', 'X-Rate-Limit-Reset': str(int(time.time()))})
+        
+        items = self.objects[name]
+        query = request.query.get('filter', '')
+        if 'lastUpdated gt' in query:
+            mark = query.split('"')[1]
+            items = [item for item in items if item['lastUpdated'] > mark]
+        limit = int(request.query.get('limit', 200))
+        after = int(request.query.get('after', 0))
+        headers = {'X-Rate-Limit-Remaining': '100', 'X-Rate-Limit-Reset': str(int(time.time()) + 60)}
+        if after + limit < len(items):
+            headers['Link'] = f'<{request.url.update_query(after=str(after + limit))}>; rel="next"'
+        return web.json_response(items[after:after + limit], headers=headers)
+
+
+@contextlib.asynccontextmanager
+async def okta_server(mock):
+    """Serve mock on a free local port; yields the org URL"""
+    app = web.Application()
+    app.router.add_get('/api/v1/{name}', mock.handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, '127.0.0.1', 0).start()
+    try:
+        yield f'http://127.0.0.1:{runner.addresses[0][1]}'
+    finally:
+        await runner.cleanup()
+
+
+def collect(mock, **kwargs):
+    """One collection against a fresh server for mock; returns (collector, api_data)"""
+    async def run():
+        async with okta_server(mock) as org_url:
+            collector = OktaApiCollector(org_url, 'token', max_backoff=0.01, **kwargs)
+            return collector, await collector.collect()
+    
+    return asyncio.run(run())
+
+
+def test_follows_link_pages_and_normalizes_agent_types():
+    mock = MockOkta()
+    _, api_data = collect(mock, page_limit=200)
+    
+    assert api_data['users_count'] == 450
+    assert [query.get('after') for name, query in mock.requests if name == 'users'] == [None, '200', '400']
+    assert api_data['applications'] == {'saml': 1, 'bookmark': 0, 'swa': 0, 'oidc': 1}
+    assert api_data['provisioning_apps_count'] == 1
+    assert api_data['ad_agents_count'] == 3
+    assert api_data['radius_agents_count'] == 1
+    assert api_data['federated_domains_count'] == 1
+    assert api_data['custom_integrations'] == 1
+
+
+def test_backs_off_on_429_and_low_rate_limit_remaining():
+    mock = MockOkta()
+    mock.throttle['groups'] = 2
+    collector, api_data = collect(mock, rate_limit_floor=100)
+    
+    assert api_data['groups_count'] == 3
+    assert collector.stats['retries'] == 2
+    assert collector.stats['rate_limit_waits'] > 0
+    assert sum(name == 'groups' for name, _ in mock.requests) == 3
+
+
+def test_snapshot_cache_fetches_only_changed_users(tmp_path):
+    mock = MockOkta()
+    cache = TenantSnapshotCache(str(tmp_path / 'snapshots.sqlite'))
+    
+    async def run():
+        async with okta_server(mock) as org_url:
+            await OktaApiCollector(org_url, 'token', snapshot_cache=cache).collect()
+            users = mock.objects['users']
+            users[0] = dict(users[0], status='DEPROVISIONED', lastUpdated='2024-02-01T00:00:00.000Z')
+            users.append({'id': 'u-new', 'status': 'ACTIVE', 'lastUpdated': '2024-02-02T00:00:00.000Z'})
+            mock.requests.clear()
+            return await OktaApiCollector(org_url, 'token', snapshot_cache=cache).collect()
+    
+    api_data = asyncio.run(run())
+    cache.close()
+    
+    assert api_data['users_count'] == 450
+    user_queries = [query for name, query in mock.requests if name == 'users']
+    assert user_queries == [{'filter': 'lastUpdated gt "2024-01-01T00:00:00.000Z"', 'limit': '200'}]
+    assert not any(name == 'apps' for name, _ in mock.requests)
+    assert api_data['snapshot_cache']['incremental'] == 2
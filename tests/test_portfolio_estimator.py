@@ -0,0 +1,51 @@
+"""PortfolioEstimator shared costs, learning curve and allocations"""
+
+import pytest
+
+from estimation_modules import EstimationModules, PREDEFINED_SCENARIOS
+from portfolio_estimator import PortfolioEstimator
+
+
+def _portfolio(keys, **options):
+    portfolio = PortfolioEstimator(**options)
+    for index, key in enumerate(keys):
+        portfolio.add(f'{key}-{index}', PREDEFINED_SCENARIOS[key]['data'])
+    return portfolio
+
+
+@pytest.mark.parametrize('key', sorted(PREDEFINED_SCENARIOS))
+def test_one_tenant_portfolio_equals_its_standalone_estimate(key):
+    estimate = _portfolio([key]).estimate()
+    standalone = EstimationModules.manual_input_estimation(PREDEFINED_SCENARIOS[key]['data'])
+    
+    assert estimate['cost_breakdown'] == pytest.approx(standalone['cost_breakdown'])
+    assert estimate['migration_effort']['hours'] == standalone['migration_effort']['hours']
+    assert estimate['executive_summary']['timeline_weeks'] == standalone['executive_summary']['timeline_weeks']
+    assert estimate['savings'] == 0
+
+
+def test_shared_costs_and_learning_curve_save_money():
+    keys = ['small', 'medium', 'enterprise', 'medium']
+    portfolio = _portfolio(keys)
+    estimate = portfolio.estimate()
+    
+    assert 0 < portfolio.learning_factor() < 1
+    assert estimate['savings'] > 0
+    assert estimate['standalone_total'] == pytest.approx(sum(
+        EstimationModules.manual_input_estimation(PREDEFINED_SCENARIOS[key]['data'])['cost_breakdown']['total']
+        for key in keys))
+    
+    allocations = portfolio.allocations()
+    assert sum(item['share'] for item in allocations.values()) == pytest.approx(1.0)
+    assert sum(item['total'] for item in allocations.values()) == pytest.approx(estimate['cost_breakdown']['total'],
+                                                                                 abs=0.05)
+
+
+def test_remove_restores_the_previous_estimate():
+    portfolio = _portfolio(['small', 'medium'])
+    before = portfolio.estimate()
+    portfolio.add('extra', PREDEFINED_SCENARIOS['enterprise']['data'])
+    portfolio.remove('extra')
+    after = portfolio.estimate()
+    for section in ('executive_summary', 'migration_effort', 'cost_breakdown', 'shared_costs'):
+        assert after[section] == pytest.approx(before[section])
@@ -0,0 +1,27 @@
+"""PortfolioRunner CSV input is coerced like the workbooks and input_schema"""
+
+from estimation_modules import EstimationModules
+from portfolio_runner import PortfolioRunner
+
+CSV = (
+    'company_name,num_employees,saml_apps_count,oidc_apps_count,annual_okta_cost,regulatory_requirements\n'
+    'Acme,"1,200",40,7,"$5,000.50","SOX, HIPAA"\n'
+    'Beta,500,inf,3,inf,\n'
+    'Gamma,300,nan,2,,\n'
+)
+
+
+def test_csv_cells_are_coerced_like_input_schema(tmp_path):
+    path = tmp_path / 'tenants.csv'
+    path.write_text(CSV)
+    items = list(PortfolioRunner._read_csv(str(path)))
+    
+    assert items[0] == {'company_name': 'Acme', 'num_employees': 1200, 'saml_apps_count': 40, 'oidc_apps_count': 7,
+                        'annual_okta_cost': 5000.5, 'regulatory_requirements': ['SOX', 'HIPAA']}
+    assert items[1]['saml_apps_count'] == 'inf' and items[1]['annual_okta_cost'] == 'inf'
+    assert items[2]['saml_apps_count'] == 'nan'
+    
+    records = list(PortfolioRunner.run(items, processes=1))
+    assert [record['status'] for record in records] == ['ok', 'error', 'error']
+    expected = EstimationModules.manual_input_estimation(items[0])
+    assert records[0]['result']['cost_breakdown'] == expected['cost_breakdown']
@@ -0,0 +1,53 @@
+"""RateCalibrator must recover a known rate card from its own estimates"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from estimation_modules import EstimationModules, CALCULATOR_INPUT_FIELDS
+from rate_calibration import RateCalibrator
+from rate_card import RateCards, COEFFICIENT_LAYOUT, EFFORT_COMPONENTS
+
+
+@pytest.fixture(scope='module')
+def actuals():
+    """Historical records priced with a card that charges more per SAML app"""
+    card = RateCards.to_dict(RateCards.get())
+    card['name'] = 'truth'
+    card['effort']['hours_per_item']['saml_apps_count'] = 11
+    card['professional_services']['per_app'] = 900
+    truth = RateCards.compile(card)
+    
+    generator = np.random.default_rng(0)
+    frame = pd.DataFrame({field: generator.integers(0, 60, 2000) for field in CALCULATOR_INPUT_FIELDS})
+    frame['num_employees'] = generator.integers(100, 12000, len(frame))
+    outputs = EstimationModules.estimate_batch(frame, truth)
+    frame['actual_hours'] = outputs['effort_hours'] * generator.lognormal(0, 0.01, len(frame))
+    frame['actual_cost'] = outputs['total_cost'] * generator.lognormal(0, 0.01, len(frame))
+    frame.loc[::10, 'actual_cost'] = np.nan
+    return frame
+
+
+def test_fit_recovers_the_coefficients(actuals):
+    fitted = RateCalibrator.fit(actuals, name='test-fitted')
+    coefficients = fitted['rate_card'].coefficients
+    
+    assert fitted['records'] == {'hours': 2000, 'cost': 1800}
+    assert coefficients.saml_hours == pytest.approx(11, rel=0.05)
+    assert coefficients.app_services == pytest.approx(900, rel=0.05)
+    for model in ('hours', 'cost'):
+        assert fitted['metrics']['calibrated'][model]['mae'] < fitted['metrics']['baseline'][model]['mae']
+
+
+def test_cross_validated_card_beats_the_base_card(actuals):
+    result = RateCalibrator.calibrate(actuals, folds=3, name='test-calibrated')
+    
+    assert RateCards.get('test-calibrated') is result['rate_card']
+    for model in ('hours', 'cost'):
+        assert result['cross_validation']['calibrated'][model]['mape'] < \
+            result['cross_validation']['baseline'][model]['mape']
+
+
+def test_effort_components_name_effort_coefficients():
+    effort = {name for name, section, _ in COEFFICIENT_LAYOUT if section == 'effort'}
+    assert {name for _, _, name in EFFORT_COMPONENTS} <= effort
@@ -0,0 +1,57 @@
+"""Declarative rate cards: compile, round trip and per-request switching"""
+
+import pytest
+
+from estimation_modules import EstimationModules, PREDEFINED_SCENARIOS
+from rate_card import RateCards, RateCardError
+
+
+def _card(name, changes=None):
+    """The default card renamed, with {(section, key): value} changes"""
+    card = RateCards.to_dict(RateCards.get())
+    card['name'] = name
+    for (section, key), value in (changes or {}).items():
+        card[section][key] = value
+    return card
+
+
+def test_to_dict_compiles_back_to_the_same_card():
+    rates = RateCards.get()
+    compiled = RateCards.compile(RateCards.to_dict(rates))
+    assert compiled.coefficients == rates.coefficients
+    assert compiled.effort_multipliers == rates.effort_multipliers
+    assert compiled.complexity_steps == rates.complexity_steps
+    assert compiled.phases == rates.phases
+
+
+def test_loaded_card_changes_only_its_own_estimates():
+    rates = RateCards.load(_card('test-licensing', {('licensing', 'e3_user_month'): 0}))
+    data = PREDEFINED_SCENARIOS['medium']['data']
+    default = EstimationModules.manual_input_estimation(data)
+    custom = EstimationModules.manual_input_estimation(data, 'test-licensing')
+    
+    assert RateCards.get(rates.card_id) is rates
+    assert custom['rate_card'] == rates.card_id
+    assert custom['cost_breakdown']['licensing'] < default['cost_breakdown']['licensing']
+    assert custom['cost_breakdown']['professional_services'] == default['cost_breakdown']['professional_services']
+    assert EstimationModules.manual_input_estimation(data)['cost_breakdown'] == default['cost_breakdown']
+
+
+@pytest.mark.parametrize('section, key, value', [
+    ('effort', 'base_hours', None),
+    ('effort', 'base_hours', 'forty'),
+    ('effort', 'base_hours', True)
+])
+def test_compile_rejects_missing_or_non_numeric_coefficients(section, key, value):
+    card = _card('broken')
+    if value is None:
+        del card[section][key]
+    else:
+        card[section][key] = value
+    with pytest.raises(RateCardError, match=f'{section}.{key}'):
+        RateCards.compile(card)
+
+
+def test_unknown_card_names_raise_key_error():
+    with pytest.raises(KeyError):
+        RateCards.get('no-such-card')
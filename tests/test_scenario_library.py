@@ -0,0 +1,58 @@
+"""ScenarioLibrary nearest-neighbour matching and blended estimates"""
+
+import pytest
+
+from estimation_modules import EstimationModules, PREDEFINED_SCENARIOS
+from scenario_library import ScenarioLibrary, BLEND_FIGURES
+
+
+@pytest.fixture(scope='module')
+def library():
+    return ScenarioLibrary(PREDEFINED_SCENARIOS)
+
+
+@pytest.mark.parametrize('key', sorted(PREDEFINED_SCENARIOS))
+def test_exact_match_returns_the_scenario_estimate(library, key):
+    data = PREDEFINED_SCENARIOS[key]['data']
+    blended = library.blended_estimate(data)
+    expected = EstimationModules.scenario_based_estimation(key)
+    
+    assert library.nearest(data, k=1) == [(key, 0.0)]
+    assert blended['matches'][0] == {'scenario': key, 'name': PREDEFINED_SCENARIOS[key]['name'],
+                                     'distance': 0.0, 'weight': 1.0}
+    for section, figure in BLEND_FIGURES:
+        assert blended[section][figure] == pytest.approx(expected[section][figure])
+    assert blended['timeline_estimation']['critical_path'] == expected['timeline_estimation']['critical_path']
+
+
+def test_partial_input_blends_components_into_the_total(library):
+    blended = library.blended_estimate({'num_employees': '3,000', 'saml_apps_count': 40}, k=3)
+    costs = blended['cost_breakdown']
+    
+    assert len(blended['matches']) == 3
+    assert sum(match['weight'] for match in blended['matches']) == pytest.approx(1.0, abs=1e-3)
+    assert costs['total'] == round(costs['licensing'] + costs['professional_services'] + costs['infrastructure'], 2)
+    assert blended['executive_summary']['total_cost'] == costs['total']
+    totals = [EstimationModules.scenario_based_estimation(key)['cost_breakdown']['total']
+              for key in PREDEFINED_SCENARIOS]
+    assert min(totals) <= costs['total'] <= max(totals)
+
+
+def test_k_larger_than_library_uses_every_scenario(library):
+    matches = library.nearest({'num_employees': 500}, k=len(library) + 5)
+    distances = [distance for _, distance in matches]
+    
+    assert sorted(key for key, _ in matches) == sorted(PREDEFINED_SCENARIOS)
+    assert distances == sorted(distances)
+
+
+def test_query_without_usable_fields_is_rejected(library):
+    with pytest.raises(ValueError):
+        library.nearest({'company_name': 'Acme', 'num_employees': 'many'})
+
+
+def test_empty_library_is_rejected():
+    library = ScenarioLibrary({})
+    assert len(library) == 0
+    with pytest.raises(ValueError, match='empty'):
+        library.blended_estimate({'num_employees': 500})